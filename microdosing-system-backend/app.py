@@ -1,6 +1,6 @@
 from flask import Flask
 from config import Config
-from extensions import db, ma, migrate, jwt
+from extensions import db, ma, migrate, jwt, socketio
 from flask_cors import CORS
 
 def create_app():
@@ -12,16 +12,19 @@ def create_app():
     ma.init_app(app)
     migrate.init_app(app, db)
     jwt.init_app(app)
-    CORS(app, supports_credentials=True, origins=["http://localhost:5173"])
+    CORS(app, supports_credentials=True, origins=["http://localhost:5173"], expose_headers=["X-Next-Cursor"])
+    socketio.init_app(app, cors_allowed_origins=["http://localhost:5173"])
 
     with app.app_context():
         try:
             from models.user import User
             from models.material import Material
-            from models.recipe import Recipe, RecipeMaterial
-            from models.production import ProductionOrder, Batch, BatchMaterialDispensing, MaterialTransaction
+            from models.recipe import Recipe, RecipeMaterial, RecipeComponent, RecipeVersion, RecipeVersionComponent, RecipeDosingPlan
+            from models.production import ProductionOrder, Batch, BatchMaterialDispensing, BatchCycleStat, MaterialTransaction
             from models.weight import WeightEntry
             from models.storage import StorageBucket
+            from models.cache_version import CacheVersion
+            from models.id_sequence import IdSequence
 
             if not app.config["FLASK_ENV"] == "production":
                 db.create_all()
@@ -37,6 +40,7 @@ def create_app():
             from routes.production_routes import production_bp
             from routes.weight_routes import weight_bp  # ✅ Import this
             from routes.storage_routes import storage_bp
+            from routes.barcode_routes import barcode_bp
 
             app.register_blueprint(storage_bp, url_prefix="/api")
             app.register_blueprint(user_bp, url_prefix="/api")
@@ -44,6 +48,35 @@ def create_app():
             app.register_blueprint(recipe_bp, url_prefix="/api")
             app.register_blueprint(production_bp, url_prefix="/api")
             app.register_blueprint(weight_bp, url_prefix="/api")  # ✅ Add this line
+            app.register_blueprint(barcode_bp, url_prefix="/api")
+
+            # ✅ Live weight push channel
+            from routes.weight_socket import weight_namespace
+            from services.weight_stream import weight_broadcaster
+            socketio.on_namespace(weight_namespace)
+            weight_broadcaster.init_app(app, socketio)
+
+            # ✅ Rendered barcode image cache
+            from services.barcode_cache import barcode_cache
+            barcode_cache.init_app(app)
+
+            # ✅ Cached role/status lookups for role_required
+            from services.identity_cache import identity_cache
+            identity_cache.init_app(app)
+            from services.password_pool import password_verifier
+            password_verifier.init_app(app)
+
+            # ✅ Versioned in-process cache for /active-material
+            from services.active_material_cache import active_material_cache
+            active_material_cache.init_app(app)
+
+            # ✅ In-memory barcode resolution index
+            from services.barcode_index import barcode_index
+            barcode_index.init_app(app)
+
+            # ✅ Compiled recipe dosing plans
+            from services.dosing_plan import dosing_plans
+            dosing_plans.init_app(app)
 
         except Exception as e:
             print(f"⚠️ Error registering Blueprints: {e}")
@@ -52,4 +85,4 @@ def create_app():
 
 if __name__ == "__main__":
     app = create_app()
-    app.run(debug=True)
+    socketio.run(app, debug=True, allow_unsafe_werkzeug=True)
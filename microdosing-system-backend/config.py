@@ -23,3 +23,50 @@ class Config:
     JWT_COOKIE_CSRF_PROTECT = False  #  Temporarily set to False for testing
     JWT_CSRF_IN_COOKIES = True
     JWT_ACCESS_CSRF_HEADER_NAME = "X-CSRF-TOKEN"
+
+    # ✅ Scale ingestion
+    WEIGHT_INGEST_CHUNK_SIZE = int(os.getenv("WEIGHT_INGEST_CHUNK_SIZE", 1000))  # rows per multi-row INSERT
+    WEIGHT_PAGE_SIZE = int(os.getenv("WEIGHT_PAGE_SIZE", 500))  # default rows per GET /weights page
+    WEIGHT_PAGE_SIZE_MAX = int(os.getenv("WEIGHT_PAGE_SIZE_MAX", 5000))
+    WEIGHT_PUSH_INTERVAL = float(os.getenv("WEIGHT_PUSH_INTERVAL", 0.2))  # seconds between live socket pushes per station
+
+    # ✅ Barcode exports
+    BARCODE_RENDER_WORKERS = int(os.getenv("BARCODE_RENDER_WORKERS", 0))  # 0 = one per CPU
+    BARCODE_PARALLEL_THRESHOLD = int(os.getenv("BARCODE_PARALLEL_THRESHOLD", 64))  # render inline below this many codes
+    BARCODE_CACHE_DIR = os.getenv("BARCODE_CACHE_DIR")  # defaults to <instance>/barcode_cache
+    BARCODE_CACHE_MAX_BYTES = int(os.getenv("BARCODE_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+    BARCODE_CACHE_MEMORY_ITEMS = int(os.getenv("BARCODE_CACHE_MEMORY_ITEMS", 2048))
+
+    # ✅ Auth
+    IDENTITY_CACHE_TTL = int(os.getenv("IDENTITY_CACHE_TTL", 60))  # seconds a cached role/status is trusted
+    LOGIN_HASH_WORKERS = int(os.getenv("LOGIN_HASH_WORKERS", 4))  # concurrent password hash checks
+    LOGIN_MAX_PENDING = int(os.getenv("LOGIN_MAX_PENDING", 32))  # queued + running logins before 503
+    LOGIN_HASH_TIMEOUT = float(os.getenv("LOGIN_HASH_TIMEOUT", 10))  # seconds
+
+    # ✅ List endpoints (?limit=&cursor=&sort=&fields=)
+    LIST_PAGE_SIZE_DEFAULT = int(os.getenv("LIST_PAGE_SIZE_DEFAULT", 100))  # rows per page when no ?limit is sent
+    LIST_PAGE_SIZE_MAX = int(os.getenv("LIST_PAGE_SIZE_MAX", 1000))
+
+    # ✅ Active material cache
+    ACTIVE_MATERIAL_VERSION_CHECK_INTERVAL = float(os.getenv("ACTIVE_MATERIAL_VERSION_CHECK_INTERVAL", 0.5))  # seconds
+
+    # ✅ Barcode resolution
+    BARCODE_INDEX_CHECK_INTERVAL = float(os.getenv("BARCODE_INDEX_CHECK_INTERVAL", 1.0))  # seconds
+    BARCODE_RESOLVE_MAX_CODES = int(os.getenv("BARCODE_RESOLVE_MAX_CODES", 5000))
+
+    # ✅ Storage buckets
+    BUCKET_BULK_MAX = int(os.getenv("BUCKET_BULK_MAX", 10000))  # buckets per bulk provisioning call
+
+    # ✅ Dispensing
+    DISPENSE_DEFAULT_TOLERANCE_PCT = float(os.getenv("DISPENSE_DEFAULT_TOLERANCE_PCT", 2.0))  # when the recipe material has no margin
+
+    # ✅ Production scheduling
+    SCHEDULER_STATIONS = os.getenv("SCHEDULER_STATIONS", "1")  # comma-separated dosing station ids
+    SCHEDULER_DAY_START = os.getenv("SCHEDULER_DAY_START", "06:00")
+    SCHEDULER_ORDER_MINUTES = int(os.getenv("SCHEDULER_ORDER_MINUTES", 60))  # slot length per order
+
+    # ✅ Batch metrics
+    BATCH_STATS_EWMA_ALPHA = float(os.getenv("BATCH_STATS_EWMA_ALPHA", 0.2))  # weight of the newest batch in rolling figures
+
+    # ✅ Recipe dosing plans
+    DOSING_PLAN_CACHE_ITEMS = int(os.getenv("DOSING_PLAN_CACHE_ITEMS", 512))  # compiled plans kept in memory per worker
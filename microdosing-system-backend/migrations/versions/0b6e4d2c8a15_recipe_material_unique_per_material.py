@@ -0,0 +1,29 @@
+"""Make recipe_material unique per (recipe_id, material_id)
+
+Revision ID: 0b6e4d2c8a15
+Revises: f3a7d91b6c24
+Create Date: 2026-10-18 18:31:52.907364
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0b6e4d2c8a15'
+down_revision = 'f3a7d91b6c24'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The composite key is created first so the recipe_id foreign key keeps an index
+    with op.batch_alter_table('recipe_material', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_recipe_material_recipe_material', ['recipe_id', 'material_id'])
+        batch_op.drop_constraint('recipe_id', type_='unique')
+
+
+def downgrade():
+    with op.batch_alter_table('recipe_material', schema=None) as batch_op:
+        batch_op.create_unique_constraint('recipe_id', ['recipe_id'])
+        batch_op.drop_constraint('uq_recipe_material_recipe_material', type_='unique')
@@ -0,0 +1,63 @@
+"""Add copy-on-write recipe versions and pin production orders to them
+
+Revision ID: 1c9f5e3a7b40
+Revises: 0b6e4d2c8a15
+Create Date: 2026-10-18 19:12:36.581902
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1c9f5e3a7b40'
+down_revision = '0b6e4d2c8a15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('recipe_component',
+    sa.Column('component_id', sa.Integer(), nullable=False),
+    sa.Column('digest', sa.String(length=64), nullable=False),
+    sa.Column('material_id', sa.Integer(), nullable=False),
+    sa.Column('set_point', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('margin', sa.Numeric(precision=5, scale=2), nullable=True),
+    sa.ForeignKeyConstraint(['material_id'], ['material.material_id'], ),
+    sa.PrimaryKeyConstraint('component_id'),
+    sa.UniqueConstraint('digest')
+    )
+    op.create_table('recipe_version',
+    sa.Column('recipe_version_id', sa.Integer(), nullable=False),
+    sa.Column('recipe_id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.String(length=20), nullable=False),
+    sa.Column('parent_version_id', sa.Integer(), nullable=True),
+    sa.Column('digest', sa.String(length=64), nullable=False),
+    sa.Column('created_by', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
+    sa.ForeignKeyConstraint(['recipe_id'], ['recipe.recipe_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['parent_version_id'], ['recipe_version.recipe_version_id'], ),
+    sa.ForeignKeyConstraint(['created_by'], ['user.user_id'], ),
+    sa.PrimaryKeyConstraint('recipe_version_id'),
+    sa.UniqueConstraint('recipe_id', 'version', name='uq_recipe_version_recipe_version')
+    )
+    op.create_table('recipe_version_component',
+    sa.Column('recipe_version_id', sa.Integer(), nullable=False),
+    sa.Column('component_id', sa.Integer(), nullable=False),
+    sa.Column('step', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['recipe_version_id'], ['recipe_version.recipe_version_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['component_id'], ['recipe_component.component_id'], ),
+    sa.PrimaryKeyConstraint('recipe_version_id', 'component_id')
+    )
+    with op.batch_alter_table('production_order', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('recipe_version_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_production_order_recipe_version', 'recipe_version', ['recipe_version_id'], ['recipe_version_id'])
+
+
+def downgrade():
+    with op.batch_alter_table('production_order', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_production_order_recipe_version', type_='foreignkey')
+        batch_op.drop_column('recipe_version_id')
+    op.drop_table('recipe_version_component')
+    op.drop_table('recipe_version')
+    op.drop_table('recipe_component')
@@ -0,0 +1,27 @@
+"""Count only measurable cycles in batch_cycle_stat averages
+
+Revision ID: 2d8a6f0c3e57
+Revises: 1c9f5e3a7b40
+Create Date: 2026-10-19 09:14:05.302718
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2d8a6f0c3e57'
+down_revision = '1c9f5e3a7b40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('batch_cycle_stat', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('timed_completed', sa.Integer(), nullable=False, server_default='0'))
+    op.execute("UPDATE batch_cycle_stat SET timed_completed = completed")
+
+
+def downgrade():
+    with op.batch_alter_table('batch_cycle_stat', schema=None) as batch_op:
+        batch_op.drop_column('timed_completed')
@@ -0,0 +1,26 @@
+"""Index weight_entry on (timestamp, id)
+
+Revision ID: 3b8f0d2a91c4
+Revises: c66e2b1db61f
+Create Date: 2026-10-18 09:12:40.118203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b8f0d2a91c4'
+down_revision = 'c66e2b1db61f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('weight_entry', schema=None) as batch_op:
+        batch_op.create_index('ix_weight_entry_timestamp_id', ['timestamp', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('weight_entry', schema=None) as batch_op:
+        batch_op.drop_index('ix_weight_entry_timestamp_id')
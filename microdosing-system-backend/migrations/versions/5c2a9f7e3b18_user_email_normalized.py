@@ -0,0 +1,57 @@
+"""Add normalized email lookup column to user
+
+Revision ID: 5c2a9f7e3b18
+Revises: 9e41c7b5d2f0
+Create Date: 2026-10-18 11:20:05.730412
+
+"""
+import logging
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c2a9f7e3b18'
+down_revision = '9e41c7b5d2f0'
+branch_labels = None
+depends_on = None
+
+log = logging.getLogger("alembic.runtime.migration")
+
+
+def upgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('email_normalized', sa.String(length=100), nullable=True))
+
+    op.execute("UPDATE user SET email_normalized = LOWER(TRIM(email))")
+
+    # Emails that differ only by case or padding would break the unique index.
+    # The oldest account keeps the login key; the others are reported and can
+    # log in again once their email is changed.
+    bind = op.get_bind()
+    duplicates = bind.execute(sa.text(
+        "SELECT user_id, email, email_normalized FROM user WHERE email_normalized IN "
+        "(SELECT email_normalized FROM user GROUP BY email_normalized HAVING COUNT(*) > 1) "
+        "ORDER BY email_normalized, user_id"
+    )).fetchall()
+    kept = {}
+    for user_id, email, normalized in duplicates:
+        if kept.setdefault(normalized, user_id) != user_id:
+            bind.execute(
+                sa.text("UPDATE user SET email_normalized = NULL WHERE user_id = :user_id"),
+                {"user_id": user_id},
+            )
+            log.warning(
+                "user %s (%s) has the same email as user %s; it cannot log in until its email is changed",
+                user_id, email, kept[normalized],
+            )
+
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.create_index('ix_user_email_normalized', ['email_normalized'], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_index('ix_user_email_normalized')
+        batch_op.drop_column('email_normalized')
@@ -0,0 +1,39 @@
+"""Add material_stock_snapshot
+
+Revision ID: 7d6e1a4c8b92
+Revises: 5c2a9f7e3b18
+Create Date: 2026-10-18 12:41:52.306117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d6e1a4c8b92'
+down_revision = '5c2a9f7e3b18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('material_stock_snapshot',
+    sa.Column('snapshot_id', sa.Integer(), nullable=False),
+    sa.Column('material_id', sa.Integer(), nullable=False),
+    sa.Column('taken_at', sa.DateTime(), nullable=False),
+    sa.Column('last_transaction_id', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('total_additions', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.Column('total_removals', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.ForeignKeyConstraint(['material_id'], ['material.material_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('snapshot_id')
+    )
+    with op.batch_alter_table('material_stock_snapshot', schema=None) as batch_op:
+        batch_op.create_index('ix_material_stock_snapshot_material_taken', ['material_id', 'taken_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('material_stock_snapshot', schema=None) as batch_op:
+        batch_op.drop_index('ix_material_stock_snapshot_material_taken')
+
+    op.drop_table('material_stock_snapshot')
@@ -0,0 +1,26 @@
+"""Add station_id to weight_entry
+
+Revision ID: 9e41c7b5d2f0
+Revises: 3b8f0d2a91c4
+Create Date: 2026-10-18 10:03:17.542961
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e41c7b5d2f0'
+down_revision = '3b8f0d2a91c4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('weight_entry', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('station_id', sa.String(length=50), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('weight_entry', schema=None) as batch_op:
+        batch_op.drop_column('station_id')
@@ -0,0 +1,33 @@
+"""Add material dosing queue sequence
+
+Revision ID: a4f3b6c1e507
+Revises: 7d6e1a4c8b92
+Create Date: 2026-10-18 13:35:28.914076
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4f3b6c1e507'
+down_revision = '7d6e1a4c8b92'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('material', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('dosing_sequence', sa.Integer(), nullable=True))
+
+    # Keep the existing activation order (by id) for rows already in the table
+    op.execute("UPDATE material SET dosing_sequence = material_id WHERE dosing_sequence IS NULL")
+
+    with op.batch_alter_table('material', schema=None) as batch_op:
+        batch_op.create_index('ix_material_status_dosing_sequence', ['status', 'dosing_sequence', 'material_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('material', schema=None) as batch_op:
+        batch_op.drop_index('ix_material_status_dosing_sequence')
+        batch_op.drop_column('dosing_sequence')
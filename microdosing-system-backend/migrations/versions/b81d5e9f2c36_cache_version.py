@@ -0,0 +1,29 @@
+"""Add cache_version counters
+
+Revision ID: b81d5e9f2c36
+Revises: a4f3b6c1e507
+Create Date: 2026-10-18 14:10:44.265390
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b81d5e9f2c36'
+down_revision = 'a4f3b6c1e507'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('cache_version',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.execute("INSERT INTO cache_version (name, version) VALUES ('active_material', 0)")
+
+
+def downgrade():
+    op.drop_table('cache_version')
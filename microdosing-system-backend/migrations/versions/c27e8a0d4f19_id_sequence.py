@@ -0,0 +1,29 @@
+"""Add id_sequence for block-allocated barcodes
+
+Revision ID: c27e8a0d4f19
+Revises: b81d5e9f2c36
+Create Date: 2026-10-18 15:02:11.470825
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c27e8a0d4f19'
+down_revision = 'b81d5e9f2c36'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('id_sequence',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('next_value', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.execute("INSERT INTO id_sequence (name, next_value) VALUES ('storage_bucket_barcode', 1)")
+
+
+def downgrade():
+    op.drop_table('id_sequence')
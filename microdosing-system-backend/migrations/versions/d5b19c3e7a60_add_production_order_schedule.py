@@ -0,0 +1,32 @@
+"""Add station slot columns to production_order
+
+Revision ID: d5b19c3e7a60
+Revises: c27e8a0d4f19
+Create Date: 2026-10-18 16:20:43.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5b19c3e7a60'
+down_revision = 'c27e8a0d4f19'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('production_order', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('station_id', sa.String(length=50), nullable=True))
+        batch_op.add_column(sa.Column('schedule_position', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('scheduled_start', sa.DateTime(), nullable=True))
+        batch_op.create_index('ix_production_order_schedule', ['scheduled_date', 'station_id', 'schedule_position'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('production_order', schema=None) as batch_op:
+        batch_op.drop_index('ix_production_order_schedule')
+        batch_op.drop_column('scheduled_start')
+        batch_op.drop_column('schedule_position')
+        batch_op.drop_column('station_id')
@@ -0,0 +1,34 @@
+"""Add batch_cycle_stat for rolling cycle-time aggregates
+
+Revision ID: e8c4a27f1d93
+Revises: d5b19c3e7a60
+Create Date: 2026-10-18 17:05:27.640381
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8c4a27f1d93'
+down_revision = 'd5b19c3e7a60'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('batch_cycle_stat',
+    sa.Column('scope', sa.String(length=10), nullable=False),
+    sa.Column('scope_key', sa.String(length=50), nullable=False),
+    sa.Column('completed', sa.Integer(), nullable=False),
+    sa.Column('failed', sa.Integer(), nullable=False),
+    sa.Column('total_cycle_seconds', sa.Float(), nullable=False),
+    sa.Column('ewma_cycle_seconds', sa.Float(), nullable=True),
+    sa.Column('ewma_interval_seconds', sa.Float(), nullable=True),
+    sa.Column('last_completed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('scope', 'scope_key')
+    )
+
+
+def downgrade():
+    op.drop_table('batch_cycle_stat')
@@ -0,0 +1,32 @@
+"""Add recipe_dosing_plan for compiled plans per recipe version
+
+Revision ID: f3a7d91b6c24
+Revises: e8c4a27f1d93
+Create Date: 2026-10-18 17:48:09.254117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3a7d91b6c24'
+down_revision = 'e8c4a27f1d93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('recipe_dosing_plan',
+    sa.Column('recipe_id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.String(length=20), nullable=False),
+    sa.Column('etag', sa.String(length=64), nullable=False),
+    sa.Column('plan', sa.Text(), nullable=False),
+    sa.Column('compiled_at', sa.TIMESTAMP(), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
+    sa.ForeignKeyConstraint(['recipe_id'], ['recipe.recipe_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('recipe_id', 'version')
+    )
+
+
+def downgrade():
+    op.drop_table('recipe_dosing_plan')
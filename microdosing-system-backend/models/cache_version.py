@@ -0,0 +1,8 @@
+from extensions import db  # ✅ Import from extensions
+
+class CacheVersion(db.Model):
+    """Shared version counters that tell each worker when its in-process cache is stale."""
+    __tablename__ = "cache_version"
+
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
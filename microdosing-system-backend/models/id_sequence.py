@@ -0,0 +1,8 @@
+from extensions import db  # ✅ Import from extensions
+
+class IdSequence(db.Model):
+    """Named counters handed out in pre-reserved blocks (e.g. storage bucket barcodes)."""
+    __tablename__ = "id_sequence"
+
+    name = db.Column(db.String(50), primary_key=True)
+    next_value = db.Column(db.BigInteger, nullable=False, default=1)
@@ -1,5 +1,9 @@
 from extensions import db, ma  # ✅ Import from extensions
 class Material(db.Model):
+    __table_args__ = (
+        db.Index("ix_material_status_dosing_sequence", "status", "dosing_sequence", "material_id"),  # activation queue
+    )
+
     material_id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text, nullable=True)
@@ -22,6 +26,7 @@ class Material(db.Model):
     notes = db.Column(db.Text, nullable=True)  
     transactions = db.relationship("MaterialTransaction", backref="material", cascade="all, delete", lazy=True)
     margin = db.Column(db.Numeric(5, 2), nullable=True)  # <-- Added for percentage margin storage
+    dosing_sequence = db.Column(db.Integer, nullable=True)  # position in the activation queue (lowest goes next)
     created_at = db.Column(db.TIMESTAMP, server_default=db.func.current_timestamp())
     updated_at = db.Column(db.TIMESTAMP, server_default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
 
@@ -34,6 +39,21 @@ class MaterialTransaction(db.Model):
     transaction_date = db.Column(db.TIMESTAMP, server_default=db.func.current_timestamp())
     description = db.Column(db.Text, nullable=True)
 
+class MaterialStockSnapshot(db.Model):
+    __tablename__ = "material_stock_snapshot"
+    __table_args__ = (
+        db.Index("ix_material_stock_snapshot_material_taken", "material_id", "taken_at"),
+    )
+
+    snapshot_id = db.Column(db.Integer, primary_key=True)
+    material_id = db.Column(db.Integer, db.ForeignKey("material.material_id", ondelete="CASCADE"), nullable=False)
+    taken_at = db.Column(db.DateTime, nullable=False)
+    # Highest material_transaction.transaction_id already folded into this row
+    last_transaction_id = db.Column(db.Integer, nullable=False, default=0)
+    quantity = db.Column(db.Numeric(12, 2), nullable=False)
+    total_additions = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    total_removals = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+
 class MaterialSchema(ma.SQLAlchemyAutoSchema):
     class Meta:
         model = Material
@@ -25,6 +25,18 @@ class ProductionOrder(db.Model):
     # New: Barcode ID field
     barcode_id = db.Column(db.String(100), unique=True, nullable=True)
 
+    # Recipe version the order was planned against; set points come from it
+    recipe_version_id = db.Column(db.Integer, db.ForeignKey("recipe_version.recipe_version_id"), nullable=True)
+
+    # Station slot assigned by the scheduler (services/scheduler.py)
+    station_id = db.Column(db.String(50), nullable=True)
+    schedule_position = db.Column(db.Integer, nullable=True)
+    scheduled_start = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        db.Index("ix_production_order_schedule", "scheduled_date", "station_id", "schedule_position"),
+    )
+
     # Removed the problematic recursive relationship
 
 
@@ -55,6 +67,20 @@ class BatchMaterialDispensing(db.Model):
     status = db.Column(db.Enum("pending", "dispensed", "verified"), nullable=False, default="pending")
     batch = db.relationship('Batch', backref='batch_material_dispensings', passive_deletes=True)
 
+class BatchCycleStat(db.Model):
+    """Running cycle-time/throughput totals per station or recipe, updated as batches finish."""
+    __tablename__ = "batch_cycle_stat"
+
+    scope = db.Column(db.String(10), primary_key=True)  # "station" or "recipe"
+    scope_key = db.Column(db.String(50), primary_key=True)
+    completed = db.Column(db.Integer, nullable=False, default=0)
+    failed = db.Column(db.Integer, nullable=False, default=0)
+    timed_completed = db.Column(db.Integer, nullable=False, default=0)  # completions with a measurable cycle
+    total_cycle_seconds = db.Column(db.Float, nullable=False, default=0)
+    ewma_cycle_seconds = db.Column(db.Float, nullable=True)
+    ewma_interval_seconds = db.Column(db.Float, nullable=True)  # between completions
+    last_completed_at = db.Column(db.DateTime, nullable=True)
+
 # Ensure MaterialTransaction is defined or imported correctly
 try:
     from models.material import MaterialTransaction
@@ -28,8 +28,12 @@ class Recipe(db.Model):
 
 
 class RecipeMaterial(db.Model):
+    __table_args__ = (
+        db.UniqueConstraint("recipe_id", "material_id", name="uq_recipe_material_recipe_material"),
+    )
+
     recipe_material_id = db.Column(db.Integer, primary_key=True)
-    recipe_id = db.Column(db.Integer, db.ForeignKey("recipe.recipe_id"), nullable=False, unique=True)
+    recipe_id = db.Column(db.Integer, db.ForeignKey("recipe.recipe_id"), nullable=False)
     material_id = db.Column(db.Integer, db.ForeignKey("material.material_id"), nullable=False)
 
     set_point = db.Column(db.Numeric(10, 2), nullable=True)
@@ -45,6 +49,54 @@ class RecipeMaterial(db.Model):
     margin = db.Column(db.Numeric(5, 2), nullable=True)  # <-- New margin field
     
 
+class RecipeComponent(db.Model):
+    """Immutable component row shared by every recipe version that uses it (copy-on-write)."""
+    __tablename__ = "recipe_component"
+
+    component_id = db.Column(db.Integer, primary_key=True)
+    digest = db.Column(db.String(64), unique=True, nullable=False)  # sha256 of material, set point, margin
+    material_id = db.Column(db.Integer, db.ForeignKey("material.material_id"), nullable=False)
+    set_point = db.Column(db.Numeric(10, 2), nullable=True)
+    margin = db.Column(db.Numeric(5, 2), nullable=True)
+
+
+class RecipeVersion(db.Model):
+    """A released, immutable version of a recipe (see services/recipe_versions.py)."""
+    __tablename__ = "recipe_version"
+    __table_args__ = (
+        db.UniqueConstraint("recipe_id", "version", name="uq_recipe_version_recipe_version"),
+    )
+
+    recipe_version_id = db.Column(db.Integer, primary_key=True)
+    recipe_id = db.Column(db.Integer, db.ForeignKey("recipe.recipe_id", ondelete="CASCADE"), nullable=False)
+    version = db.Column(db.String(20), nullable=False)
+    parent_version_id = db.Column(db.Integer, db.ForeignKey("recipe_version.recipe_version_id"), nullable=True)
+    digest = db.Column(db.String(64), nullable=False)  # sha256 of the ordered component ids
+    created_by = db.Column(db.Integer, db.ForeignKey("user.user_id"), nullable=False)
+    created_at = db.Column(db.TIMESTAMP, server_default=db.func.current_timestamp())
+
+
+class RecipeVersionComponent(db.Model):
+    __tablename__ = "recipe_version_component"
+
+    recipe_version_id = db.Column(
+        db.Integer, db.ForeignKey("recipe_version.recipe_version_id", ondelete="CASCADE"), primary_key=True
+    )
+    component_id = db.Column(db.Integer, db.ForeignKey("recipe_component.component_id"), primary_key=True)
+    step = db.Column(db.Integer, nullable=False)
+
+
+class RecipeDosingPlan(db.Model):
+    """Immutable compiled dosing plan of one released recipe version (see services/dosing_plan.py)."""
+    __tablename__ = "recipe_dosing_plan"
+
+    recipe_id = db.Column(db.Integer, db.ForeignKey("recipe.recipe_id", ondelete="CASCADE"), primary_key=True)
+    version = db.Column(db.String(20), primary_key=True)
+    etag = db.Column(db.String(64), nullable=False)  # sha256 of plan
+    plan = db.Column(db.Text, nullable=False)  # canonical JSON
+    compiled_at = db.Column(db.TIMESTAMP, server_default=db.func.current_timestamp())
+
+
 class RecipeSchema(ma.SQLAlchemyAutoSchema):
     class Meta:
         model = Recipe
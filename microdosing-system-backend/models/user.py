@@ -1,16 +1,27 @@
 from extensions import db, ma  # ✅ Import from extensions
+from sqlalchemy.orm import validates # type: ignore
+
+
+def normalize_email(email):
+    return email.strip().lower() if email else email
 
 class User(db.Model):
     user_id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(50), unique=True, nullable=False)
     full_name = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(100), unique=True, nullable=False)
+    email_normalized = db.Column(db.String(100), unique=True, nullable=True, index=True)  # login lookup key
     password_hash = db.Column(db.String(255), nullable=False)
     role = db.Column(db.Enum("operator", "admin"), nullable=False)
     status = db.Column(db.Enum("active", "inactive"), default="active")
     created_at = db.Column(db.TIMESTAMP, server_default=db.func.current_timestamp())
     updated_at = db.Column(db.TIMESTAMP, server_default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
 
+    @validates("email")
+    def _sync_email_normalized(self, key, email):
+        self.email_normalized = normalize_email(email)
+        return email
+
 class UserSchema(ma.SQLAlchemyAutoSchema):
     class Meta:
         model = User
@@ -3,8 +3,12 @@ from datetime import datetime
 
 class WeightEntry(db.Model):
     __tablename__ = 'weight_entry'
+    __table_args__ = (
+        db.Index("ix_weight_entry_timestamp_id", "timestamp", "id"),  # history windows + keyset paging
+    )
 
     id = db.Column(db.Integer, primary_key=True)
+    station_id = db.Column(db.String(50), nullable=True)  # dosing station the scale belongs to
     timestamp = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     current_weight = db.Column(db.Float, nullable=False)
     tare_weight = db.Column(db.Float, nullable=False)
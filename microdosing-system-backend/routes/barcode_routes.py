@@ -0,0 +1,44 @@
+# routes/barcode_routes.py
+
+from flask import Blueprint, jsonify, request, current_app, Response
+from services.barcode_sheet import get_barcode_png
+from services.barcode_index import barcode_index
+
+barcode_bp = Blueprint("barcode", __name__)
+
+
+# GET a single scannable barcode image (served from the barcode cache)
+@barcode_bp.route("/barcodes/<string:value>.png", methods=["GET"])
+def get_barcode_image(value):
+    try:
+        png = get_barcode_png(value)
+    except Exception as e:
+        return jsonify({"error": f"Could not render barcode: {e}"}), 400
+
+    response = Response(png, mimetype="image/png")
+    response.headers["Cache-Control"] = "public, max-age=86400"
+    return response, 200
+
+
+# POST resolve a burst of scanned codes across materials, buckets, recipes and orders
+@barcode_bp.route("/barcodes/resolve", methods=["POST"])
+def resolve_barcodes():
+    data = request.get_json(silent=True) or {}
+    codes = data.get("codes")
+    if not isinstance(codes, list) or not all(isinstance(code, str) for code in codes):
+        return jsonify({"error": "'codes' must be a list of strings"}), 400
+    if len(codes) > current_app.config["BARCODE_RESOLVE_MAX_CODES"]:
+        return jsonify({"error": "Too many codes in one request"}), 400
+
+    results = barcode_index.resolve(code.strip() for code in codes)
+    unresolved = [result["code"] for result in results if not result["matches"]]
+    return jsonify({"results": results, "unresolved": unresolved}), 200
+
+
+# GET resolve a single scanned code
+@barcode_bp.route("/barcodes/resolve/<string:code>", methods=["GET"])
+def resolve_barcode(code):
+    result, = barcode_index.resolve([code])
+    if not result["matches"]:
+        return jsonify({"error": "Barcode not found"}), 404
+    return jsonify(result), 200
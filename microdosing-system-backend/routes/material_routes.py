@@ -1,21 +1,23 @@
 from flask import Flask, Blueprint  , request,current_app, jsonify,abort # type: ignore
 from extensions import db
-from models.material import Material, MaterialTransaction, MaterialSchema, MaterialTransactionSchema
+from models.material import Material, MaterialTransaction, MaterialStockSnapshot, MaterialSchema, MaterialTransactionSchema
 from models.recipe import RecipeMaterial , Recipe
 from sqlalchemy.exc import IntegrityError # type: ignore
-from flask import send_file
-import io
-import os
-from openpyxl import Workbook
-from openpyxl.drawing.image import Image as ExcelImage
-import barcode
-from barcode.writer import ImageWriter
-from PIL import Image as PILImage
+from services.barcode_sheet import send_barcode_workbook
+from services.xlsx_stream import stream_query_xlsx
+from services.list_query import list_page, list_response
+from services.pagination import InvalidQueryParam
+from services.inventory_ledger import apply_movements, LedgerError
+from services.stock_snapshots import take_snapshots, stock_as_of
+from services.pagination import parse_datetime
+from services.active_material_cache import active_material_cache
+from services.barcode_index import barcode_index
 import re
-import tempfile
+import hashlib
 from sqlalchemy.exc import SQLAlchemyError
 import logging
 from sqlalchemy.orm import aliased
+from sqlalchemy import update
 
 
 
@@ -36,66 +38,33 @@ transactions_schema = MaterialTransactionSchema(many=True)
 @material_bp.route("/materials/export/barcodes", methods=["GET"])
 def export_materials_excel_with_barcodes():
     try:
-        materials = Material.query.all()
+        materials = Material.query.filter(Material.barcode_id.isnot(None)).yield_per(1000)
+        rows = (
+            ([material.title, material.barcode_id], material.barcode_id)
+            for material in materials
+            if material.barcode_id
+        )
+        return send_barcode_workbook(
+            "materials_with_barcodes.xlsx",
+            "Material Barcodes",
+            ["Title", "Barcode ID", "Scannable Barcode"],
+            rows,
+        )
 
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Material Barcodes"
-        ws.append(["Title", "Barcode ID", "Scannable Barcode"])
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
-        row_number = 2
 
-        for material in materials:
-            if material.barcode_id:
-                barcode_id = material.barcode_id
-
-                try:
-                    # Create a temp directory and save barcode
-                    temp_dir = tempfile.gettempdir()
-                    barcode_filename = f"{barcode_id}"
-                    barcode_path = os.path.join(temp_dir, f"{barcode_filename}.png")
-
-                    code128 = Code128(barcode_id, writer=ImageWriter())
-                    code128.save(os.path.join(temp_dir, barcode_filename))  # Don't include .png here
-
-                    # Resize for Excel
-                    image = PILImage.open(barcode_path)
-                    image = image.resize((200, 60))
-                    image.save(barcode_path)
-
-                    # Fill Excel
-                    ws.cell(row=row_number, column=1, value=material.title)
-                    ws.cell(row=row_number, column=2, value=barcode_id)
-
-                    img = ExcelImage(barcode_path)
-                    img.width = 150
-                    img.height = 50
-                    ws.add_image(img, f"C{row_number}")
-
-                    # Optional: delete temp image after
-                    os.remove(barcode_path)
-
-                    row_number += 1
-
-                except Exception as e:
-                    print(f"Failed to generate barcode for {barcode_id}: {e}")
-                    # Still add text if image fails
-                    ws.cell(row=row_number, column=1, value=material.title)
-                    ws.cell(row=row_number, column=2, value=barcode_id)
-                    row_number += 1
-
-        # Save to bytes
-        stream = io.BytesIO()
-        wb.save(stream)
-        stream.seek(0)
-
-        return send_file(
-            stream,
-            download_name="materials_with_barcodes.xlsx",
-            as_attachment=True,
-            mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+# ➤ Stream all Materials as .xlsx
+@material_bp.route("/materials/export", methods=["GET"])
+def export_materials_excel():
+    try:
+        return stream_query_xlsx(
+            "materials.xlsx",
+            "Materials",
+            Material.query.order_by(Material.material_id),
+            list(Material.__table__.columns),
         )
-
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -130,10 +99,18 @@ def add_material():
             supplier=data.get("supplier"),
             supplier_contact_info=data.get("supplier_contact_info"),
             notes=data.get("notes"),
-            margin=margin  # Set calculated margin
+            margin=margin,  # Set calculated margin
+            dosing_sequence=data.get("dosing_sequence")
         )
 
         db.session.add(new_material)
+        db.session.flush()
+        if new_material.dosing_sequence is None:
+            new_material.dosing_sequence = new_material.material_id  # queue in creation order by default
+        if new_material.status == "active":
+            active_material_cache.invalidate()
+        if new_material.barcode_id:
+            barcode_index.invalidate()
         db.session.commit()
 
         return jsonify({
@@ -151,35 +128,43 @@ def add_material():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+
+def _load_active_material():
+    active_material = Material.query.filter_by(status="active").first()
+    return _material_dosing_data(active_material) if active_material else None
+
+
+def _material_dosing_data(material):
+    """Material fields as shown on the dosing screens."""
+    return {
+        "material_id": material.material_id,
+        "title": material.title,
+        "description": material.description,
+        "unit_of_measure": material.unit_of_measure,
+        "current_quantity": str(material.current_quantity),
+        "minimum_quantity": str(material.minimum_quantity),
+        "maximum_quantity": str(material.maximum_quantity),
+        "plant_area_location": material.plant_area_location,
+        "barcode_id": material.barcode_id,
+        "status": material.status,
+        "supplier": material.supplier,
+        "supplier_contact_info": material.supplier_contact_info,
+        "notes": material.notes,
+        "created_at": material.created_at,
+        "updated_at": material.updated_at,
+        "margin": str(material.margin) if material.margin is not None else None,  # percent; the UI formats it
+    }
+
     
 @material_bp.route('/active-material', methods=['GET'])
 def get_active_material():
     try:
-        active_material = Material.query.filter_by(status="active").first()
+        material_data = active_material_cache.get(_load_active_material)
 
-        if not active_material:
+        if not material_data:
             logging.warning("No active material found.")
             return jsonify({"message": "No active material found."}), 404
 
-        material_data = {
-            "material_id": active_material.material_id,
-            "title": active_material.title,
-            "description": active_material.description,
-            "unit_of_measure": active_material.unit_of_measure,
-            "current_quantity": str(active_material.current_quantity),
-            "minimum_quantity": str(active_material.minimum_quantity),
-            "maximum_quantity": str(active_material.maximum_quantity),
-            "plant_area_location": active_material.plant_area_location,
-            "barcode_id": active_material.barcode_id,
-            "status": active_material.status,
-            "supplier": active_material.supplier,
-            "supplier_contact_info": active_material.supplier_contact_info,
-            "notes": active_material.notes,
-            "created_at": active_material.created_at,
-            "updated_at": active_material.updated_at,
-            "margin": f"{active_material.margin}%"  # Add margin to the response
-        }
-
         return jsonify(material_data), 200
 
     except SQLAlchemyError as e:
@@ -190,30 +175,89 @@ def get_active_material():
         logging.exception(f"Unexpected error occurred: {str(e)}")
         return jsonify({"error": "An unexpected error occurred."}), 500
 
+# ➤ Everything the ActiveOrders screen needs, in one response
+@material_bp.route('/active-dosing', methods=['GET'])
+def get_active_dosing():
+    try:
+        active_material = active_material_cache.get(_load_active_material)
+
+        rows = (
+            db.session.query(RecipeMaterial, Recipe, Material)
+            .join(Recipe, Recipe.recipe_id == RecipeMaterial.recipe_id)
+            .join(Material, Material.material_id == RecipeMaterial.material_id)
+            .order_by(RecipeMaterial.recipe_material_id)
+            .all()
+        )
+
+        recipe_materials = [
+            {
+                "recipe_material_id": mat.recipe_material_id,
+                "recipe_id": mat.recipe_id,
+                "material_id": mat.material_id,
+                "set_point": str(mat.set_point) if mat.set_point is not None else None,
+                "actual": str(mat.actual) if mat.actual is not None else None,
+                "status": mat.status,
+                "margin": str(mat.margin) if mat.margin is not None else None,
+                "recipe": {
+                    "recipe_id": recipe.recipe_id,
+                    "name": recipe.name,
+                    "code": recipe.code,
+                    "version": recipe.version,
+                    "status": recipe.status,
+                },
+                "material": _material_dosing_data(material),
+            }
+            for mat, recipe, material in rows
+        ]
+
+        payload = {
+            "active_material": active_material,
+            "recipe_materials": recipe_materials,
+        }
+
+        response = jsonify(payload)
+        response.set_etag(hashlib.sha1(response.get_data()).hexdigest())
+        return response.make_conditional(request)
+
+    except SQLAlchemyError as e:
+        logging.error(f"Database error while fetching active dosing view: {str(e)}")
+        return jsonify({"error": "Internal server error. Could not fetch active dosing view."}), 500
+
+
 @material_bp.route('/change-status-to-completed/<int:material_id>', methods=['POST'])
 def change_status_to_completed(material_id):
     try:
-        # Fetch the material by ID
-        material = Material.query.get(material_id)
+        # Lock the material being completed so two stations cannot complete it twice
+        material = Material.query.filter_by(material_id=material_id).with_for_update().first()
         if not material:
             logging.warning(f"Material with ID {material_id} not found.")
             return jsonify({"message": f"Material with ID {material_id} not found."}), 404
 
         # Check if already completed
         if material.status == "completed":
+            db.session.rollback()
             logging.info(f"Material {material_id} is already marked as completed.")
             return jsonify({"message": f"Material {material_id} is already completed."}), 400
 
         # Mark the current material as completed
         material.status = "completed"
+
+        # Claim the head of the dosing queue in the same transaction; rows locked
+        # by another station's hand-off are skipped instead of activated twice
+        next_active_material = (
+            Material.query
+            .filter(Material.status == "inactive")
+            .order_by(Material.dosing_sequence, Material.material_id)
+            .with_for_update(skip_locked=True)
+            .first()
+        )
+        if next_active_material:
+            next_active_material.status = "active"
+        active_material_cache.invalidate()
         db.session.commit()
         logging.info(f"Material {material_id} status updated to 'completed'.")
 
-        # Auto-select and activate the next inactive material (if available)
-        next_active_material = Material.query.filter_by(status="inactive").first()
         if next_active_material:
-            next_active_material.status = "active"
-            db.session.commit()
             logging.info(f"Material {next_active_material.material_id} status updated to 'active'.")
             return jsonify({
                 "message": f"Material {material_id} is now completed. "
@@ -235,6 +279,65 @@ def change_status_to_completed(material_id):
         return jsonify({"error": "An unexpected error occurred."}), 500
 
 
+# ➤ Inactive materials in dosing order
+@material_bp.route('/materials/queue', methods=['GET'])
+def get_dosing_queue():
+    queued = (
+        Material.query
+        .filter(Material.status == "inactive")
+        .order_by(Material.dosing_sequence, Material.material_id)
+        .all()
+    )
+    return jsonify([
+        {
+            "material_id": material.material_id,
+            "title": material.title,
+            "barcode_id": material.barcode_id,
+            "dosing_sequence": material.dosing_sequence,
+        }
+        for material in queued
+    ]), 200
+
+
+# ➤ Reorder the dosing queue: body is the list of material_ids to dose first, in order;
+#   the rest of the queue keeps its relative order after them
+@material_bp.route('/materials/queue', methods=['PUT'])
+def reorder_dosing_queue():
+    material_ids = request.get_json(silent=True)
+    if not isinstance(material_ids, list) or not all(isinstance(m, int) for m in material_ids):
+        return jsonify({"error": "Expected a JSON array of material_id integers"}), 400
+    if len(set(material_ids)) != len(material_ids):
+        return jsonify({"error": "material_ids must be unique"}), 400
+
+    try:
+        found = db.session.query(db.func.count(Material.material_id)).filter(Material.material_id.in_(material_ids)).scalar()
+        if found != len(material_ids):
+            return jsonify({"error": "One or more materials not found"}), 404
+
+        rest = [
+            material_id for (material_id,) in (
+                db.session.query(Material.material_id)
+                .filter(Material.status == "inactive", Material.material_id.notin_(material_ids))
+                .order_by(Material.dosing_sequence, Material.material_id)
+                .with_for_update()
+            )
+        ]
+        db.session.execute(
+            update(Material),
+            [
+                {"material_id": material_id, "dosing_sequence": position}
+                for position, material_id in enumerate(material_ids + rest, start=1)
+            ],
+        )
+        db.session.commit()
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logging.error(f"Database error while reordering dosing queue: {str(e)}")
+        return jsonify({"error": "Internal server error. Could not reorder the dosing queue."}), 500
+
+    return jsonify({"message": "Dosing queue updated successfully"}), 200
+
+
 # ➤ Get Material by Barcode
 @material_bp.route("/material/barcode/<string:barcode>", methods=["GET"])
 def get_material_by_barcode(barcode):
@@ -267,8 +370,40 @@ def get_material_by_barcode(barcode):
 # ➤ Get all Materials
 @material_bp.route("/materials", methods=["GET"])
 def get_materials():
-    materials = Material.query.all()
-    return jsonify(materials_schema.dump(materials)), 200
+    try:
+        materials, next_cursor = list_page(
+            Material.query, Material,
+            filterable=["title", "status", "unit_of_measure", "plant_area_location", "barcode_id", "supplier"],
+            sortable=["material_id", "title", "current_quantity", "created_at", "updated_at"],
+        )
+    except InvalidQueryParam as e:
+        return jsonify({"error": str(e)}), 400
+    return list_response(materials_schema.dump(materials), next_cursor), 200
+
+# ➤ Stock per material, now or as of ?as_of=<ISO datetime>
+@material_bp.route("/materials/stock", methods=["GET"])
+def get_material_stock():
+    try:
+        as_of = parse_datetime(request.args.get("as_of"), "as_of")
+    except InvalidQueryParam as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        return jsonify(stock_as_of(as_of)), 200
+    except SQLAlchemyError as e:
+        logger.error(f"Database error while computing stock: {str(e)}")
+        return jsonify({"error": "Database error occurred while computing stock."}), 500
+
+# ➤ Take a stock snapshot for every material (run periodically, e.g. from cron)
+@material_bp.route("/materials/stock/snapshots", methods=["POST"])
+def create_stock_snapshots():
+    try:
+        count = take_snapshots()
+        db.session.commit()
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logger.error(f"Database error while taking stock snapshots: {str(e)}")
+        return jsonify({"error": "Database error occurred while taking stock snapshots."}), 500
+    return jsonify({"message": f"Snapshot taken for {count} materials"}), 201
 
 # ➤ Get a specific Material by ID
 @material_bp.route("/materials/<int:material_id>", methods=["GET"])
@@ -286,6 +421,7 @@ def update_material(material_id):
         return jsonify({"message": "Material not found"}), 404
     
     data = request.get_json()
+    barcode_fields = (material.barcode_id, material.title)
     material.title = data.get("title", material.title)
     material.description = data.get("description", material.description)
     material.unit_of_measure = data.get("unit_of_measure", material.unit_of_measure)
@@ -294,8 +430,13 @@ def update_material(material_id):
     material.maximum_quantity = data.get("maximum_quantity", material.maximum_quantity)
     material.plant_area_location = data.get("plant_area_location", material.plant_area_location)
     material.barcode_id = data.get("barcode_id", material.barcode_id)
+    was_active = material.status == "active"
     material.status = data.get("status", material.status)
 
+    if was_active or material.status == "active":
+        active_material_cache.invalidate()
+    if (material.barcode_id, material.title) != barcode_fields:
+        barcode_index.invalidate()
     db.session.commit()
     return jsonify(material_schema.dump(material)), 200
 
@@ -319,6 +460,7 @@ def delete_material(material_id):
         # Proceed with deletion of transactions and material if no references exist
         try:
             MaterialTransaction.query.filter_by(material_id=material_id).delete()
+            MaterialStockSnapshot.query.filter_by(material_id=material_id).delete()
             db.session.commit()  # Ensure transactions are deleted before deleting material
             logger.info(f"Deleted transactions for Material ID {material_id}")
         except SQLAlchemyError as e:
@@ -327,6 +469,10 @@ def delete_material(material_id):
             return jsonify({"error": "Failed to delete transactions."}), 500
 
         try:
+            if material.status == "active":
+                active_material_cache.invalidate()
+            if material.barcode_id:
+                barcode_index.invalidate()
             db.session.delete(material)
             db.session.commit()
             logger.info(f"Material ID {material_id} and its associated transactions deleted successfully.")
@@ -350,21 +496,50 @@ def delete_material(material_id):
 @material_bp.route("/material-transactions", methods=["POST"])
 def create_material_transaction():
     data = request.get_json()
-    new_transaction = MaterialTransaction(
-        material_id=data["material_id"],
-        transaction_type=data["transaction_type"],
-        quantity=data["quantity"],
-        description=data.get("description")
-    )
-    db.session.add(new_transaction)
-    db.session.commit()
+    try:
+        new_transaction, = apply_movements([data], return_rows=True)
+        active_material_cache.invalidate_for([new_transaction.material_id])  # stock and margin are part of the cached payload
+        db.session.commit()
+    except LedgerError as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 400
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logger.error(f"Database error while recording material transaction: {str(e)}")
+        return jsonify({"error": "Database error occurred while recording the transaction."}), 500
     return jsonify(transaction_schema.dump(new_transaction)), 201
 
+# ➤ Record many Material Transactions atomically
+@material_bp.route("/material-transactions/batch", methods=["POST"])
+def create_material_transactions_batch():
+    data = request.get_json(silent=True)
+    if not isinstance(data, list):
+        return jsonify({"error": "Expected a JSON array of transactions"}), 400
+    try:
+        movements = apply_movements(data)
+        active_material_cache.invalidate_for(m["material_id"] for m in movements)  # stock and margin are part of the cached payload
+        db.session.commit()
+    except LedgerError as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 400
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logger.error(f"Database error while recording material transactions: {str(e)}")
+        return jsonify({"error": "Database error occurred while recording the transactions."}), 500
+    return jsonify({"message": f"{len(movements)} transactions recorded successfully"}), 201
+
 # ➤ Get all Material Transactions
 @material_bp.route("/material-transactions", methods=["GET"])
 def get_material_transactions():
-    transactions = MaterialTransaction.query.all()
-    return jsonify(transactions_schema.dump(transactions)), 200
+    try:
+        transactions, next_cursor = list_page(
+            MaterialTransaction.query, MaterialTransaction,
+            filterable=["material_id", "transaction_type", "transaction_date"],
+            sortable=["transaction_id", "transaction_date", "quantity"],
+        )
+    except InvalidQueryParam as e:
+        return jsonify({"error": str(e)}), 400
+    return list_response(transactions_schema.dump(transactions), next_cursor), 200
 
 # ➤ Get a specific Material Transaction by ID
 @material_bp.route("/material-transactions/<int:transaction_id>", methods=["GET"])
@@ -1,15 +1,20 @@
-from flask import Blueprint, request, jsonify # type: ignore
+from datetime import date, datetime
+from flask import Blueprint, request, jsonify, current_app # type: ignore
 from extensions import db
-from models.production import ProductionOrder, Batch, BatchMaterialDispensing
+from models.production import ProductionOrder, Batch, BatchMaterialDispensing, BatchCycleStat
 from flask_jwt_extended import jwt_required, get_jwt_identity # type: ignore
 from routes.user_routes import role_required  # Adjust path based on your project structure
-from flask import Blueprint, send_file, jsonify
-from openpyxl import Workbook
-from openpyxl.drawing.image import Image as ExcelImage
-from barcode import Code128
-from barcode.writer import ImageWriter
-from PIL import Image as PILImage
-import os, io, tempfile
+from services.barcode_sheet import send_barcode_workbook
+from services.xlsx_stream import stream_query_xlsx
+from services.barcode_index import barcode_index
+from services.dispensing import record_batch_dispensing, DispensingError
+from services.order_release import release_order, ReleaseError
+from services.scheduler import reschedule, schedule_for
+from services.batch_lifecycle import transition, serialize_stat, BatchStateError
+from services.mrp import material_requirements, requirements_window, OPEN_STATUSES
+from services.recipe_versions import current_version, find_version
+from services.list_query import list_page, list_response
+from services.pagination import InvalidQueryParam
 
 
 production_bp = Blueprint("production", __name__)
@@ -17,61 +22,17 @@ production_bp = Blueprint("production", __name__)
 @production_bp.route("/production_orders/export/barcodes", methods=["GET"])
 def export_production_orders_excel_with_barcodes():
     try:
-        orders = ProductionOrder.query.all()
-
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Production Order Barcodes"
-        ws.append(["Order Number", "Barcode ID", "Scannable Barcode"])
-
-        row_number = 2
-
-        for order in orders:
-            if order.barcode_id:
-                barcode_id = order.barcode_id
-                try:
-                    # Save barcode image to temp dir
-                    temp_dir = tempfile.gettempdir()
-                    filename = f"{barcode_id}"
-                    filepath = os.path.join(temp_dir, f"{filename}.png")
-
-                    code128 = Code128(barcode_id, writer=ImageWriter())
-                    code128.save(filepath)
-
-                    # Resize image
-                    image = PILImage.open(filepath)
-                    image = image.resize((200, 60))
-                    image.save(filepath)
-
-                    # Add to Excel
-                    ws.cell(row=row_number, column=1, value=order.order_number)
-                    ws.cell(row=row_number, column=2, value=barcode_id)
-
-                    img = ExcelImage(filepath)
-                    img.width = 150
-                    img.height = 50
-                    ws.add_image(img, f"C{row_number}")
-
-                    # Clean up temp file
-                    os.remove(filepath)
-
-                    row_number += 1
-
-                except Exception as e:
-                    print(f"Failed to generate barcode for {barcode_id}: {e}")
-                    ws.cell(row=row_number, column=1, value=order.order_number)
-                    ws.cell(row=row_number, column=2, value=barcode_id)
-                    row_number += 1
-
-        stream = io.BytesIO()
-        wb.save(stream)
-        stream.seek(0)
-
-        return send_file(
-            stream,
-            download_name="production_orders_with_barcodes.xlsx",
-            as_attachment=True,
-            mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        orders = ProductionOrder.query.filter(ProductionOrder.barcode_id.isnot(None)).yield_per(1000)
+        rows = (
+            ([order.order_number, order.barcode_id], order.barcode_id)
+            for order in orders
+            if order.barcode_id
+        )
+        return send_barcode_workbook(
+            "production_orders_with_barcodes.xlsx",
+            "Production Order Barcodes",
+            ["Order Number", "Barcode ID", "Scannable Barcode"],
+            rows,
         )
 
     except Exception as e:
@@ -81,6 +42,45 @@ def export_production_orders_excel_with_barcodes():
 
 
 
+@production_bp.route("/production_orders/export", methods=["GET"])
+def export_production_orders_excel():
+    try:
+        return stream_query_xlsx(
+            "production_orders.xlsx",
+            "Production Orders",
+            ProductionOrder.query.order_by(ProductionOrder.order_id),
+            list(ProductionOrder.__table__.columns),
+        )
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@production_bp.route("/batches/export", methods=["GET"])
+def export_batches_excel():
+    try:
+        return stream_query_xlsx(
+            "batches.xlsx",
+            "Batches",
+            Batch.query.order_by(Batch.batch_id),
+            list(Batch.__table__.columns),
+        )
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@production_bp.route("/batch_dispensing/export", methods=["GET"])
+def export_batch_dispensing_excel():
+    try:
+        return stream_query_xlsx(
+            "batch_dispensing.xlsx",
+            "Dispensing Records",
+            BatchMaterialDispensing.query.order_by(BatchMaterialDispensing.dispensing_id),
+            list(BatchMaterialDispensing.__table__.columns),
+        )
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
 @production_bp.route("/production_orders", methods=["POST"])
 @jwt_required(locations=["headers"])
 @role_required(["admin", "operator"])  # Only allowed roles can create
@@ -94,10 +94,19 @@ def create_production_order():
 
     current_user_id = get_jwt_identity()
 
+    # Pin the requested version, or the recipe's released one
+    if data.get("recipe_version"):
+        pinned = find_version(data["recipe_id"], str(data["recipe_version"]))
+        if not pinned:
+            return jsonify({"error": f"Recipe {data['recipe_id']} has no version {data['recipe_version']}"}), 400
+    else:
+        pinned = current_version(data["recipe_id"])
+
     try:
         new_order = ProductionOrder(
             order_number=data["order_number"],
             recipe_id=data["recipe_id"],
+            recipe_version_id=pinned.recipe_version_id if pinned else None,
             batch_size=data["batch_size"],
             scheduled_date=data["scheduled_date"],
             status="planned",
@@ -106,6 +115,9 @@ def create_production_order():
             barcode_id=data.get("barcode_id"),
         )
         db.session.add(new_order)
+        if new_order.barcode_id:
+            barcode_index.invalidate()
+        reschedule(new_order.scheduled_date)
         db.session.commit()
         return jsonify({"message": "Production order created successfully!"}), 201
     except Exception as e:
@@ -130,16 +142,41 @@ def update_production_order(order_id):
     if not order:
         return jsonify({"error": "Production order not found"}), 404
 
+    # Re-pin like create does: the requested version, or the new recipe's released one
+    recipe_id = data.get("recipe_id", order.recipe_id)
+    recipe_version_id = order.recipe_version_id
+    if data.get("recipe_version"):
+        pinned = find_version(recipe_id, str(data["recipe_version"]))
+        if not pinned:
+            return jsonify({"error": f"Recipe {recipe_id} has no version {data['recipe_version']}"}), 400
+        recipe_version_id = pinned.recipe_version_id
+    elif recipe_id != order.recipe_id:
+        pinned = current_version(recipe_id)
+        recipe_version_id = pinned.recipe_version_id if pinned else None
+    if (recipe_id, recipe_version_id) != (order.recipe_id, order.recipe_version_id) and order.status != "planned":
+        # Its batches and dispensing lines were built from the pinned version
+        return jsonify({"error": f"Recipe and version can only change while the order is planned (order is {order.status})"}), 400
+
+    status = data.get("status", order.status)
+    if status != order.status and (status == "released" or status == "planned"):
+        return jsonify({"error": f"An order cannot be set to '{status}' here; release it through /production_orders/{order_id}/release"}), 400
+
     try:
         # Update order fields with new data
+        previous_order_number = order.order_number
+        previous_date = order.scheduled_date
         order.order_number = data.get("order_number", order.order_number)
-        order.recipe_id = data.get("recipe_id", order.recipe_id)
+        order.recipe_id = recipe_id
+        order.recipe_version_id = recipe_version_id
         order.batch_size = data.get("batch_size", order.batch_size)
         order.scheduled_date = data.get("scheduled_date", order.scheduled_date)
-        order.status = data.get("status", order.status)
+        order.status = status
         order.created_by = data.get("created_by", order.created_by)
         order.notes = data.get("notes", order.notes)
 
+        if order.barcode_id and order.order_number != previous_order_number:
+            barcode_index.invalidate()
+        reschedule(previous_date, order.scheduled_date)
         db.session.commit()
         return jsonify({"message": "Production order updated successfully!"}), 200
 
@@ -159,6 +196,9 @@ def delete_production_order(order_id):
 
         # Delete the order
         db.session.delete(order)
+        if order.barcode_id:
+            barcode_index.invalidate()
+        reschedule(order.scheduled_date)
         db.session.commit()
 
         return jsonify({"message": f"Production order {order_id} deleted successfully!"}), 200
@@ -171,20 +211,87 @@ def delete_production_order(order_id):
 
 @production_bp.route("/production_orders", methods=["GET"])
 def get_production_orders():
-    orders = ProductionOrder.query.all()
+    try:
+        orders, next_cursor = list_page(
+            ProductionOrder.query, ProductionOrder,
+            filterable=["order_number", "recipe_id", "status", "scheduled_date", "created_by", "barcode_id"],
+            sortable=["order_id", "order_number", "scheduled_date", "created_at"],
+        )
+    except InvalidQueryParam as e:
+        return jsonify({"error": str(e)}), 400
     result = [
         {
             "order_id": order.order_id,
             "order_number": order.order_number,
             "recipe_id": order.recipe_id,
+            "recipe_version_id": order.recipe_version_id,
             "batch_size": str(order.batch_size),
-            "scheduled_date": order.scheduled_date.strftime("%Y-%m-%d"),
+            "scheduled_date": order.scheduled_date.strftime("%Y-%m-%d") if order.scheduled_date else None,
             "status": order.status,
             "created_by": order.created_by,
+            "station_id": order.station_id,
+            "schedule_position": order.schedule_position,
+            "scheduled_start": order.scheduled_start.isoformat() if order.scheduled_start else None,
         }
         for order in orders
     ]
-    return jsonify(result)
+    return list_response(result, next_cursor)
+
+@production_bp.route("/production_orders/schedule", methods=["GET"])
+def get_production_schedule():
+    day = request.args.get("date", date.today().isoformat())
+    try:
+        return jsonify({"date": day, "stations": schedule_for(day)}), 200
+    except ValueError:
+        return jsonify({"error": "date must be YYYY-MM-DD"}), 400
+
+# ➤ Material requirements of the orders in a date range vs. stock: ?from=&to=&status=planned,released
+@production_bp.route("/production_orders/requirements", methods=["GET"])
+def get_material_requirements():
+    statuses = request.args.get("status")
+    statuses = tuple(s.strip() for s in statuses.split(",") if s.strip()) if statuses else OPEN_STATUSES
+    try:
+        start, end = requirements_window(request.args)
+    except InvalidQueryParam as e:
+        return jsonify({"error": str(e)}), 400
+    result = material_requirements(start, end, statuses)
+    return jsonify({"from": start.isoformat(), "to": end.isoformat(), **result}), 200
+
+# ➤ Replan a day from scratch, e.g. after the dosing queue was reordered
+@production_bp.route("/production_orders/schedule", methods=["POST"])
+def recompute_production_schedule():
+    data = request.get_json(silent=True) or {}
+    day = data.get("date", date.today().isoformat())
+    try:
+        changed = reschedule(day)
+        db.session.commit()
+    except ValueError:
+        db.session.rollback()
+        return jsonify({"error": "date must be YYYY-MM-DD"}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": "Failed to recompute schedule", "details": str(e)}), 500
+    return jsonify({"date": day, "updated_orders": changed, "stations": schedule_for(day)}), 200
+
+@production_bp.route("/production_orders/<int:order_id>/release", methods=["POST"])
+def release_production_order(order_id):
+    data = request.get_json(silent=True) or {}
+    try:
+        result = release_order(order_id, data.get("batch_count", 1), data.get("operator_id"))
+        db.session.commit()
+    except LookupError as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 404
+    except ReleaseError as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        if "Duplicate entry" in str(e):
+            return jsonify({"error": "Duplicate batch number"}), 400
+        return jsonify({"error": "Failed to release order", "details": str(e)}), 500
+
+    return jsonify(result), 201
 
 @production_bp.route("/production-orders/<int:order_id>/reject", methods=["PUT"])
 @jwt_required()
@@ -196,6 +303,7 @@ def reject_production_order(order_id):
         return jsonify({"error": "Production order not found"}), 404
 
     order.status = "rejected"
+    reschedule(order.scheduled_date)
     db.session.commit()
 
     return jsonify({"message": "Production order rejected successfully"}), 200
@@ -204,11 +312,14 @@ def reject_production_order(order_id):
 @production_bp.route("/batches", methods=["POST"])
 def create_batch():
     data = request.get_json()
+    if data.get("status", "pending") != "pending":
+        return jsonify({"error": "New batches start as pending; use PUT /batches/<id> to change status"}), 400
     new_batch = Batch(
         batch_number=data["batch_number"],
         order_id=data["order_id"],
-        status=data.get("status", "pending"),
+        status="pending",
         operator_id=data["operator_id"],
+        created_at=datetime.utcnow(),  # same clock as the lifecycle timestamps
         notes=data.get("notes"),
     )
     db.session.add(new_batch)
@@ -217,7 +328,14 @@ def create_batch():
 
 @production_bp.route("/batches", methods=["GET"])
 def get_batches():
-    batches = Batch.query.all()
+    try:
+        batches, next_cursor = list_page(
+            Batch.query, Batch,
+            filterable=["batch_number", "order_id", "status", "operator_id"],
+            sortable=["batch_id", "batch_number", "created_at"],
+        )
+    except InvalidQueryParam as e:
+        return jsonify({"error": str(e)}), 400
     result = [
         {
             "batch_id": batch.batch_id,
@@ -230,9 +348,55 @@ def get_batches():
         }
         for batch in batches
     ]
-    return jsonify(result)
+    return list_response(result, next_cursor)
 
 ### 🚀 BATCH MATERIAL DISPENSING ROUTES ###
+# ➤ Edit a batch; status changes go through the lifecycle (pending → in_progress → completed/failed)
+@production_bp.route("/batches/<int:batch_id>", methods=["PUT"])
+def update_batch(batch_id):
+    data = request.get_json(silent=True) or {}
+    batch = db.session.query(Batch).filter_by(batch_id=batch_id).with_for_update().first()
+    if not batch:
+        return jsonify({"error": "Batch not found"}), 404
+
+    try:
+        batch.batch_number = data.get("batch_number", batch.batch_number)
+        batch.operator_id = data.get("operator_id", batch.operator_id)
+        batch.notes = data.get("notes", batch.notes)
+        if "status" in data:
+            transition(batch, data["status"])
+        db.session.commit()
+    except BatchStateError as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        if "Duplicate entry" in str(e):
+            return jsonify({"error": "Duplicate batch number"}), 400
+        return jsonify({"error": "Failed to update batch", "details": str(e)}), 500
+
+    return jsonify({
+        "message": "Batch updated successfully!",
+        "status": batch.status,
+        "start_time": batch.start_time.isoformat() if batch.start_time else None,
+        "end_time": batch.end_time.isoformat() if batch.end_time else None,
+    }), 200
+
+# ➤ Rolling cycle-time/throughput per station or recipe: /batches/stats?scope=station[&key=S1]
+@production_bp.route("/batches/stats", methods=["GET"])
+def get_batch_stats():
+    scope = request.args.get("scope", "station")
+    if scope not in ("station", "recipe"):
+        return jsonify({"error": "scope must be 'station' or 'recipe'"}), 400
+    key = request.args.get("key")
+    if key is not None:
+        stat = db.session.get(BatchCycleStat, (scope, key))
+        if not stat:
+            return jsonify({"error": f"No finished batches for {scope} {key}"}), 404
+        return jsonify(serialize_stat(stat)), 200
+    stats = BatchCycleStat.query.filter_by(scope=scope).order_by(BatchCycleStat.scope_key).all()
+    return jsonify([serialize_stat(stat) for stat in stats]), 200
+
 @production_bp.route("/batch_dispensing", methods=["POST"])
 def create_batch_dispensing():
     data = request.get_json()
@@ -248,9 +412,42 @@ def create_batch_dispensing():
     db.session.commit()
     return jsonify({"message": "Material dispensing record created successfully!"}), 201
 
+@production_bp.route("/batches/<int:batch_id>/dispensing", methods=["POST"])
+def create_batch_dispensing_bulk(batch_id):
+    data = request.get_json(silent=True) or {}
+    if not data.get("dispensed_by"):
+        return jsonify({"error": "dispensed_by is required"}), 400
+
+    try:
+        result = record_batch_dispensing(
+            batch_id,
+            data["dispensed_by"],
+            data.get("lines"),
+            current_app.config["DISPENSE_DEFAULT_TOLERANCE_PCT"],
+        )
+        db.session.commit()
+    except LookupError as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 404
+    except DispensingError as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+    return jsonify(result), 201
+
 @production_bp.route("/batch_dispensing", methods=["GET"])
 def get_batch_dispensing():
-    dispensing_records = BatchMaterialDispensing.query.all()
+    try:
+        dispensing_records, next_cursor = list_page(
+            BatchMaterialDispensing.query, BatchMaterialDispensing,
+            filterable=["batch_id", "material_id", "status", "dispensed_by"],
+            sortable=["dispensing_id", "batch_id", "dispensed_at"],
+        )
+    except InvalidQueryParam as e:
+        return jsonify({"error": str(e)}), 400
     result = [
         {
             "dispensing_id": record.dispensing_id,
@@ -263,4 +460,4 @@ def get_batch_dispensing():
         }
         for record in dispensing_records
     ]
-    return jsonify(result)
+    return list_response(result, next_cursor)
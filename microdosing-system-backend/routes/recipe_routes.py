@@ -1,16 +1,19 @@
-from flask import Blueprint, request, jsonify # type: ignore
+from flask import Blueprint, request, jsonify, current_app # type: ignore
 from extensions import db
-from models.recipe import Recipe, RecipeMaterial
+from models.recipe import Recipe, RecipeMaterial, RecipeVersion
 from models.production import ProductionOrder
 from models.user import User
 from sqlalchemy.exc import IntegrityError
-from flask import send_file, jsonify
-from openpyxl import Workbook
-from openpyxl.drawing.image import Image as ExcelImage
-from barcode import Code128
-from barcode.writer import ImageWriter
-from PIL import Image as PILImage
-import io, os, tempfile
+from services.barcode_sheet import send_barcode_workbook
+from services.xlsx_stream import stream_query_xlsx
+from services.barcode_index import barcode_index
+from services.dosing_plan import dosing_plans
+from services.recipe_components import replace_components, margin_pct, ComponentError
+from services.recipe_versions import (
+    release_version, find_version, version_components, diff_versions, serialize_version,
+)
+from services.list_query import list_page, list_response
+from services.pagination import InvalidQueryParam
 from werkzeug.exceptions import BadRequest
 import logging
 
@@ -21,68 +24,36 @@ logging.basicConfig(level=logging.DEBUG)
 @recipe_bp.route("/recipes/export/barcodes", methods=["GET"])
 def export_recipes_excel_with_barcodes():
     try:
-        recipes = Recipe.query.all()
-
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Recipes with Barcodes"
-        ws.append(["Name", "Code", "Barcode ID", "Scannable Barcode"])
-
-        row_number = 2
-
-        for recipe in recipes:
-            if recipe.barcode_id:
-                barcode_id = recipe.barcode_id
-                try:
-                    # Create barcode image in temp dir
-                    temp_dir = tempfile.gettempdir()
-                    filename = f"{barcode_id}"
-                    filepath = os.path.join(temp_dir, f"{filename}.png")
-
-                    code128 = Code128(barcode_id, writer=ImageWriter())
-                    code128.save(os.path.join(temp_dir, filename))  # Note: no .png in save()
-
-                    # Resize for Excel
-                    image = PILImage.open(filepath)
-                    image = image.resize((200, 60))
-                    image.save(filepath)
-
-                    # Add data to Excel
-                    ws.cell(row=row_number, column=1, value=recipe.name)
-                    ws.cell(row=row_number, column=2, value=recipe.code)
-                    ws.cell(row=row_number, column=3, value=barcode_id)
-
-                    img = ExcelImage(filepath)
-                    img.width = 150
-                    img.height = 50
-                    ws.add_image(img, f"D{row_number}")
-
-                    os.remove(filepath)
-
-                    row_number += 1
-
-                except Exception as e:
-                    print(f"Failed to generate barcode for {barcode_id}: {e}")
-                    ws.cell(row=row_number, column=1, value=recipe.name)
-                    ws.cell(row=row_number, column=2, value=recipe.code)
-                    ws.cell(row=row_number, column=3, value=barcode_id)
-                    row_number += 1
-
-        stream = io.BytesIO()
-        wb.save(stream)
-        stream.seek(0)
-
-        return send_file(
-            stream,
-            download_name="recipes_with_barcodes.xlsx",
-            as_attachment=True,
-            mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        recipes = Recipe.query.filter(Recipe.barcode_id.isnot(None)).yield_per(1000)
+        rows = (
+            ([recipe.name, recipe.code, recipe.barcode_id], recipe.barcode_id)
+            for recipe in recipes
+            if recipe.barcode_id
+        )
+        return send_barcode_workbook(
+            "recipes_with_barcodes.xlsx",
+            "Recipes with Barcodes",
+            ["Name", "Code", "Barcode ID", "Scannable Barcode"],
+            rows,
         )
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+@recipe_bp.route("/recipes/export", methods=["GET"])
+def export_recipes_excel():
+    try:
+        return stream_query_xlsx(
+            "recipes.xlsx",
+            "Recipes",
+            Recipe.query.order_by(Recipe.recipe_id),
+            list(Recipe.__table__.columns),
+        )
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
 @recipe_bp.route("/recipes", methods=["POST"])
 def create_recipe():
     data = request.get_json()
@@ -128,6 +99,12 @@ def create_recipe():
     db.session.add(new_recipe)
 
     try:
+        if new_recipe.barcode_id:
+            barcode_index.invalidate()
+        if new_recipe.status == "Released":
+            db.session.flush()
+            release_version(new_recipe)
+            dosing_plans.build(new_recipe)
         db.session.commit()
     except IntegrityError as e:
         db.session.rollback()
@@ -162,7 +139,14 @@ def get_recipe(recipe_id):
 
 @recipe_bp.route("/recipes", methods=["GET"])
 def get_recipes():
-    recipes = Recipe.query.all()
+    try:
+        recipes, next_cursor = list_page(
+            Recipe.query, Recipe,
+            filterable=["recipe_id", "name", "code", "version", "status", "created_by", "barcode_id"],
+            sortable=["recipe_id", "name", "code", "created_at"],
+        )
+    except InvalidQueryParam as e:
+        return jsonify({"error": str(e)}), 400
     result = [
         {
             "recipe_id": recipe.recipe_id,
@@ -177,7 +161,86 @@ def get_recipes():
         }
         for recipe in recipes
     ]
-    return jsonify(result)
+    return list_response(result, next_cursor)
+
+# ➤ Release the working components as a new immutable version: {"version": "2", "created_by": 1}
+@recipe_bp.route("/recipes/<int:recipe_id>/versions", methods=["POST"])
+def create_recipe_version(recipe_id):
+    data = request.get_json(silent=True) or {}
+    recipe = Recipe.query.get(recipe_id)
+    if not recipe:
+        return jsonify({"error": "Recipe not found"}), 404
+    version = str(data.get("version") or "").strip()
+    if not version or len(version) > 20:
+        return jsonify({"error": "'version' is required (max 20 characters)."}), 400
+    if find_version(recipe_id, version):
+        return jsonify({"error": f"Version {version} of recipe {recipe_id} already exists"}), 409
+
+    try:
+        recipe.version = version
+        snapshot = release_version(recipe, data.get("created_by"))
+        dosing_plans.build(recipe)
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({"error": f"Version {version} of recipe {recipe_id} already exists"}), 409
+    except Exception as e:
+        db.session.rollback()
+        logging.error(f"Error releasing version {version} of recipe {recipe_id}: {str(e)}")
+        return jsonify({"error": "An unexpected error occurred. Please try again later."}), 500
+
+    return jsonify(serialize_version(snapshot, version_components(snapshot.recipe_version_id))), 201
+
+@recipe_bp.route("/recipes/<int:recipe_id>/versions", methods=["GET"])
+def get_recipe_versions(recipe_id):
+    snapshots = (
+        RecipeVersion.query.filter_by(recipe_id=recipe_id)
+        .order_by(RecipeVersion.recipe_version_id)
+        .all()
+    )
+    return jsonify([serialize_version(snapshot) for snapshot in snapshots])
+
+# ➤ A released version never changes, so clients may cache it forever
+@recipe_bp.route("/recipes/<int:recipe_id>/versions/<version>", methods=["GET"])
+def get_recipe_version(recipe_id, version):
+    snapshot = find_version(recipe_id, version)
+    if not snapshot:
+        return jsonify({"error": f"Recipe {recipe_id} has no version {version}"}), 404
+    response = jsonify(serialize_version(snapshot, version_components(snapshot.recipe_version_id)))
+    response.set_etag(snapshot.digest)
+    response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    return response.make_conditional(request)
+
+@recipe_bp.route("/recipes/<int:recipe_id>/versions/<base>/diff/<target>", methods=["GET"])
+def diff_recipe_versions(recipe_id, base, target):
+    snapshots = {v: find_version(recipe_id, v) for v in (base, target)}
+    missing = [v for v, snapshot in snapshots.items() if snapshot is None]
+    if missing:
+        return jsonify({"error": f"Recipe {recipe_id} has no version {missing[0]}"}), 404
+    return jsonify(diff_versions(snapshots[base], snapshots[target]))
+
+# ➤ Compiled dosing plan of the released version; /<version> URLs never change and may be cached forever
+@recipe_bp.route("/recipes/<int:recipe_id>/dosing-plan", methods=["GET"])
+@recipe_bp.route("/recipes/<int:recipe_id>/dosing-plan/<version>", methods=["GET"])
+def get_recipe_dosing_plan(recipe_id, version=None):
+    pinned = version is not None
+    if not pinned:
+        recipe = Recipe.query.get(recipe_id)
+        if not recipe:
+            return jsonify({"error": "Recipe not found"}), 404
+        if recipe.status != "Released":
+            return jsonify({"error": "Recipe is not released"}), 409
+        version = recipe.version
+
+    entry = dosing_plans.get(recipe_id, version)
+    if entry is None:
+        return jsonify({"error": f"No released plan for recipe {recipe_id} version {version}"}), 404
+
+    etag, body = entry
+    response = current_app.response_class(body, mimetype="application/json")
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "public, max-age=31536000, immutable" if pinned else "no-cache"
+    return response.make_conditional(request)
 
 @recipe_bp.route("/recipes/<int:recipe_id>", methods=["PUT"])
 def update_recipe(recipe_id):
@@ -189,6 +252,8 @@ def update_recipe(recipe_id):
         data = request.get_json()
 
         # Update fields if provided, otherwise leave unchanged
+        previous_name = recipe.name
+        previous_release = (recipe.status, recipe.version)
         recipe.name = data.get("name", recipe.name)
         recipe.code = data.get("code", recipe.code)
         recipe.description = data.get("description", recipe.description)
@@ -200,12 +265,17 @@ def update_recipe(recipe_id):
         if "sequence" in data:
             recipe.sequence = data["sequence"]
 
+        if recipe.barcode_id and recipe.name != previous_name:
+            barcode_index.invalidate()
+        if recipe.status == "Released" and (recipe.status, recipe.version) != previous_release:
+            release_version(recipe, data.get("created_by"))  # frozen once per version
+            dosing_plans.build(recipe)
         db.session.commit()
         return jsonify({"message": "Recipe updated successfully"}), 200
 
     except Exception as e:
         db.session.rollback()  # Rollback in case of any error
-        app.logger.error(f"Error updating recipe {recipe_id}: {str(e)}")
+        current_app.logger.error(f"Error updating recipe {recipe_id}: {str(e)}")
         return jsonify({"message": "An error occurred while updating the recipe."}), 500
 
 
@@ -228,13 +298,15 @@ def delete_recipe(recipe_id):
             return jsonify({"message": "Recipe not found"}), 404
 
         db.session.delete(recipe)
+        barcode_index.invalidate()  # recipe and its production orders may carry barcodes
         db.session.commit()  # Commit the deletions
+        dosing_plans.discard(recipe_id)
         
         return jsonify({"message": "Recipe deleted successfully"}), 200
 
     except Exception as e:
         db.session.rollback()  # Rollback in case of an error
-        app.logger.error(f"Error deleting recipe: {str(e)}")
+        current_app.logger.error(f"Error deleting recipe: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
 
@@ -262,10 +334,7 @@ def create_or_update_recipe_material():
             raise BadRequest("set_point and actual must be numeric values.")
 
         # Calculate margin percentage as number
-        if set_point == 0:
-            margin = 0.0
-        else:
-            margin = round(((float(set_point) - float(actual)) / float(set_point)) * 100, 2)
+        margin = float(margin_pct(set_point, actual))
 
         # Check for existing recipe material
         existing_recipe_material = RecipeMaterial.query.filter_by(recipe_id=recipe_id, material_id=material_id).first()
@@ -312,9 +381,37 @@ def create_or_update_recipe_material():
 
 
         
+# ➤ Save a recipe's full component list in one round-trip: {"components": [{material_id, set_point, actual, status}]}
+#    "replace": false upserts the listed components only and keeps the others
+@recipe_bp.route("/recipes/<int:recipe_id>/materials", methods=["PUT"])
+def replace_recipe_materials(recipe_id):
+    data = request.get_json(silent=True) or {}
+    try:
+        result = replace_components(recipe_id, data.get("components"), prune=data.get("replace", True) is not False)
+        db.session.commit()
+    except LookupError as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 404
+    except ComponentError as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        logging.error(f"Error saving components of recipe {recipe_id}: {str(e)}")
+        return jsonify({"error": "An unexpected error occurred. Please try again later."}), 500
+
+    return jsonify(result), 200
+
 @recipe_bp.route("/recipe_materials", methods=["GET"])
 def get_recipe_materials():
-    materials = RecipeMaterial.query.all()
+    try:
+        materials, next_cursor = list_page(
+            RecipeMaterial.query, RecipeMaterial,
+            filterable=["recipe_id", "material_id", "status"],
+            sortable=["recipe_material_id", "recipe_id", "material_id"],
+        )
+    except InvalidQueryParam as e:
+        return jsonify({"error": str(e)}), 400
     result = [
         {
             "recipe_material_id": mat.recipe_material_id,
@@ -327,7 +424,7 @@ def get_recipe_materials():
         }
         for mat in materials
     ]
-    return jsonify(result)
+    return list_response(result, next_cursor)
 
 
 
@@ -1,9 +1,23 @@
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app, Response
 from models.storage import StorageBucket, StorageBucketSchema
 from models.material import Material
 from extensions import db
-import uuid  # Used for generating unique barcodes
+import csv
+import io
+from sqlalchemy import insert # type: ignore
+from services.list_query import list_page, list_response
+from services.pagination import InvalidQueryParam
+from services.barcode_index import barcode_index
+from services.sequence_allocator import reserve_block
+from services.barcode_sheet import send_barcode_workbook
+
+BUCKET_SEQUENCE = "storage_bucket_barcode"
+
+
+def allocate_bucket_barcodes(count):
+    """Collision-free bucket barcodes from a pre-reserved sequence block."""
+    return [f"BS-{value:010d}" for value in reserve_block(BUCKET_SEQUENCE, count)]
 
 storage_bp = Blueprint("storage_bp", __name__)
 storage_schema = StorageBucketSchema()
@@ -12,8 +26,15 @@ storages_schema = StorageBucketSchema(many=True)
 # GET all storage buckets
 @storage_bp.route("/storage", methods=["GET"])
 def get_all_buckets():
-    buckets = StorageBucket.query.all()
-    return storages_schema.jsonify(buckets), 200
+    try:
+        buckets, next_cursor = list_page(
+            StorageBucket.query, StorageBucket,
+            filterable=["location_id", "material_id", "barcode"],
+            sortable=["bucket_id", "location_id", "created_at"],
+        )
+    except InvalidQueryParam as e:
+        return jsonify({"error": str(e)}), 400
+    return list_response(storages_schema.dump(buckets), next_cursor), 200
 
 
 # GET bucket by barcode
@@ -41,23 +62,85 @@ def create_buckets():
     if not material:
         return jsonify({"error": "Material not found in master"}), 404
 
-    created_buckets = []
-    for location_id in location_list:
-        barcode = f"B-{uuid.uuid4().hex[:10].upper()}"
-
-        new_bucket = StorageBucket(
+    created_buckets = [
+        StorageBucket(
             location_id=location_id,
             material_id=material_id,
             barcode=barcode
         )
-        created_buckets.append(new_bucket)
+        for location_id, barcode in zip(location_list, allocate_bucket_barcodes(len(location_list)))
+    ]
 
     db.session.add_all(created_buckets)
+    barcode_index.invalidate()
     db.session.commit()
 
     return storage_schema.jsonify(created_buckets, many=True), 201
 
 
+# POST bulk-provision buckets for many materials/locations in one statement
+@storage_bp.route("/storage/bulk", methods=["POST"])
+def bulk_create_buckets():
+    data = request.get_json(silent=True) or {}
+    entries = data.get("buckets")
+
+    if not isinstance(entries, list) or not entries:
+        return jsonify({"error": "buckets must be a non-empty list"}), 400
+    if len(entries) > current_app.config["BUCKET_BULK_MAX"]:
+        return jsonify({"error": f"At most {current_app.config['BUCKET_BULK_MAX']} buckets per call"}), 400
+
+    rows = []
+    for index, entry in enumerate(entries):
+        if not isinstance(entry, dict) or not entry.get("location_id") or not isinstance(entry.get("material_id"), int):
+            return jsonify({"error": f"Bucket {index}: material_id (integer) and location_id are required"}), 400
+        rows.append({"material_id": entry["material_id"], "location_id": str(entry["location_id"])})
+
+    # ✅ Validate all materials exist with one query
+    material_ids = {row["material_id"] for row in rows}
+    known = {m for (m,) in db.session.query(Material.material_id).filter(Material.material_id.in_(material_ids))}
+    missing = sorted(material_ids - known)
+    if missing:
+        return jsonify({"error": "Material not found in master", "material_ids": missing}), 404
+
+    for row, barcode in zip(rows, allocate_bucket_barcodes(len(rows))):
+        row["barcode"] = barcode
+
+    try:
+        db.session.execute(insert(StorageBucket), rows)
+        barcode_index.invalidate()
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+    # ✅ Printable labels: ?format=json (default), csv or xlsx (with scannable barcodes)
+    label_format = request.args.get("format", "json")
+    if label_format == "csv":
+        return Response(_label_csv(rows), mimetype="text/csv", headers={
+            "Content-Disposition": 'attachment; filename="bucket_labels.csv"'
+        }), 201
+    if label_format == "xlsx":
+        return send_barcode_workbook(
+            "bucket_labels.xlsx",
+            "Bucket Labels",
+            ["Location", "Material ID", "Barcode", "Scannable Barcode"],
+            (([row["location_id"], row["material_id"], row["barcode"]], row["barcode"]) for row in rows),
+        ), 201
+    return jsonify({"created": len(rows), "buckets": rows}), 201
+
+
+def _label_csv(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["location_id", "material_id", "barcode"])
+    for row in rows:
+        writer.writerow([row["location_id"], row["material_id"], row["barcode"]])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+    yield buffer.getvalue()
+
+
 @storage_bp.route("/storage/update/<int:bucket_id>", methods=["PUT"])
 def update_bucket_by_id(bucket_id):
     data = request.get_json()
@@ -77,6 +160,7 @@ def update_bucket_by_id(bucket_id):
             return jsonify({"error": "Barcode already exists for another bucket"}), 400
         bucket.barcode = data["barcode"]
 
+    barcode_index.invalidate()
     db.session.commit()
     return storage_schema.jsonify(bucket), 200
 
@@ -87,6 +171,7 @@ def delete_bucket_by_id(bucket_id):
         return jsonify({"error": "Bucket not found"}), 404
 
     db.session.delete(bucket)
+    barcode_index.invalidate()
     db.session.commit()
 
     return jsonify({"message": f"Bucket with ID {bucket_id} deleted successfully"}), 200
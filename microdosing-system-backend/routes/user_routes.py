@@ -1,11 +1,15 @@
 from flask import Blueprint, request, jsonify, current_app , make_response # type: ignore
-from models.user import db, User  # ✅ Avoid circular imports
+from models.user import db, User, normalize_email  # ✅ Avoid circular imports
 from werkzeug.security import generate_password_hash, check_password_hash # type: ignore
 import jwt # type: ignore
 import datetime
 from sqlalchemy.exc import SQLAlchemyError # type: ignore
 from functools import wraps
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity , create_access_token, set_access_cookies , get_csrf_token , unset_jwt_cookies # type: ignore
+from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity , get_jwt , create_access_token, set_access_cookies , get_csrf_token , unset_jwt_cookies # type: ignore
+from services.identity_cache import identity_cache
+from services.password_pool import password_verifier, LoginBusy
+from services.list_query import list_page, list_response
+from services.pagination import InvalidQueryParam
 
 user_bp = Blueprint("user", __name__)
 
@@ -17,18 +21,30 @@ def protected():
 
 ### ✅ ROLE-BASED ACCESS DECORATOR ###
 def role_required(allowed_roles):
-    """Restrict access based on user roles stored in the database."""
+    """Restrict access based on the role claim in the JWT.
+
+    The claim is confirmed against the TTL'd identity cache, so role changes,
+    deactivations and deletions still apply without a query per request.
+    """
     def wrapper(fn):
         @wraps(fn)
         def decorated_function(*args, **kwargs):
             try:
-                user_id = get_jwt_identity()
-                user = User.query.get(user_id)
+                user_id = int(get_jwt_identity())
+                claimed_role = get_jwt().get("role")
+
+                # Fast reject straight from the token
+                if claimed_role is not None and claimed_role not in allowed_roles:
+                    return jsonify({"error": "Unauthorized access"}), 403
 
-                if not user:
+                identity = identity_cache.get(user_id)
+                if not identity:
                     return jsonify({"error": "User not found"}), 404
 
-                if user.role not in allowed_roles:
+                if identity["status"] == "inactive":
+                    return jsonify({"error": "User is inactive"}), 403
+
+                if identity["role"] not in allowed_roles:
                     return jsonify({"error": "Unauthorized access"}), 403
 
                 return fn(*args, **kwargs)
@@ -50,15 +66,22 @@ def create_user():
     # Check if username or email already exists
     if User.query.filter_by(username=data["username"]).first():
         return jsonify({"error": "Username already taken"}), 400
-    if User.query.filter_by(email=data["email"]).first():
+    if User.query.filter_by(email_normalized=normalize_email(data["email"])).first():
         return jsonify({"error": "Email already registered"}), 400
 
+    try:
+        password_hash = password_verifier.hash(data["password"])
+    except LoginBusy:
+        response = jsonify({"error": "Too many concurrent sign-ups, please retry shortly"})
+        response.headers["Retry-After"] = "2"
+        return response, 503
+
     # Create a new user with a default role of "operator"
     new_user = User(
         username=data["username"],
         full_name=data.get("full_name", "").strip(),  # Handle optional field safely
         email=data["email"],
-        password_hash=generate_password_hash(data["password"], method="pbkdf2:sha256"),
+        password_hash=password_hash,
         role=data.get("role", "operator"),  # Use 'operator' only if not provided
         status="active"
     )
@@ -73,7 +96,14 @@ def create_user():
 @jwt_required()
 @role_required(["admin"])  # ✅ Only admin can view all users
 def get_users():
-    users = User.query.all()
+    try:
+        users, next_cursor = list_page(
+            User.query, User,
+            filterable=["username", "email", "role", "status"],
+            sortable=["user_id", "username", "full_name", "created_at"],
+        )
+    except InvalidQueryParam as e:
+        return jsonify({"error": str(e)}), 400
     result = [
         {
             "user_id": user.user_id,
@@ -85,7 +115,7 @@ def get_users():
         }
         for user in users
     ]
-    return jsonify(result)
+    return list_response(result, next_cursor)
 
 ### 🚀 GET USER BY ID ###
 @user_bp.route("/users/<int:user_id>", methods=["GET"])
@@ -121,6 +151,7 @@ def update_user(user_id):
     user.status = data.get("status", user.status)
 
     db.session.commit()
+    identity_cache.invalidate(user_id)
     return jsonify({"message": "User updated successfully"}), 200
 
 ### 🚀 DELETE USER ###
@@ -151,6 +182,7 @@ def delete_user(user_id):
 
     db.session.delete(user_to_delete)
     db.session.commit()
+    identity_cache.invalidate(user_id)
 
     return jsonify({"message": "User deleted successfully"}), 200
 
@@ -162,13 +194,21 @@ def login_user():
     if not data or "email" not in data or "password" not in data:
         return jsonify({"message": "Email and password are required"}), 400
 
-    user = User.query.filter(User.email.ilike(data["email"])).first()
-
-    if not user or not check_password_hash(user.password_hash, data["password"]):
-        return jsonify({"message": "Invalid credentials"}), 401
+    user = User.query.filter_by(email_normalized=normalize_email(data["email"])).first()
 
-    # ✅ Store only user_id as identity (string format)
-    access_token = create_access_token(identity=str(user.user_id))
+    try:
+        if not user or not password_verifier.verify(user.password_hash, data["password"]):
+            return jsonify({"message": "Invalid credentials"}), 401
+    except LoginBusy:
+        response = jsonify({"message": "Too many concurrent logins, please retry shortly"})
+        response.headers["Retry-After"] = "2"
+        return response, 503
+
+    # ✅ user_id as identity (string format), role carried as a signed claim
+    access_token = create_access_token(
+        identity=str(user.user_id),
+        additional_claims={"role": user.role}
+    )
 
     # ✅ Create Response and Set Cookie
     response = make_response(jsonify({
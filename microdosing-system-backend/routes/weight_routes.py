@@ -1,8 +1,18 @@
 # routes/weight_routes.py
 
-from flask import Blueprint, request, jsonify
+from datetime import datetime
+from flask import Blueprint, request, jsonify, current_app
+import numpy as np
+from sqlalchemy import func, or_, and_, case, literal_column # type: ignore
 from extensions import db
 from models.weight import WeightEntry, WeightEntrySchema
+from services.weight_ingest import ingest_readings, iter_ndjson
+from services.weight_stream import weight_broadcaster
+from services.xlsx_stream import stream_query_xlsx, stream_rows_xlsx, QUERY_BATCH_SIZE
+from services.units import WEIGHT_ENTRY_UNITS, factor, factors_to, unit_code, UnitError
+from services.pagination import (
+    InvalidQueryParam, encode_cursor, decode_cursor, parse_datetime, parse_limit
+)
 
 weight_bp = Blueprint("weight", __name__)
 
@@ -22,11 +32,13 @@ def create_weight_entry():
             unit=data["unit"],
             status=data["status"],
             filter_level=data["filter_level"],
-            digital_output_status=data["digital_output_status"]
+            digital_output_status=data["digital_output_status"],
+            station_id=data.get("station_id")
         )
 
         db.session.add(new_entry)
         db.session.commit()
+        weight_broadcaster.publish([new_entry])
 
         return weight_schema.jsonify(new_entry), 201
 
@@ -34,8 +46,188 @@ def create_weight_entry():
         db.session.rollback()
         return jsonify({"error": str(e)}), 400
 
-# GET: Fetch all weight entries
+# POST: Bulk-ingest weight readings (JSON array or NDJSON stream)
+@weight_bp.route("/weights/bulk", methods=["POST"])
+def bulk_create_weight_entries():
+    if request.mimetype in ("application/x-ndjson", "application/ndjson"):
+        readings = iter_ndjson(request.stream)
+    else:
+        readings = request.get_json(silent=True)
+        if not isinstance(readings, list):
+            return jsonify({"error": "Expected a JSON array of readings or an NDJSON stream"}), 400
+
+    try:
+        accepted, rejects = ingest_readings(
+            readings, chunk_size=current_app.config["WEIGHT_INGEST_CHUNK_SIZE"]
+        )
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+    weight_broadcaster.publish(accepted)
+    result = {"inserted": len(accepted), "rejected": len(rejects), "rejects": rejects}
+    if not accepted and rejects:
+        return jsonify(result), 400
+    return jsonify(result), 201
+
+def _time_window(query):
+    """Apply the optional ?from=&to= window (inclusive from, exclusive to)."""
+    start = parse_datetime(request.args.get("from"), "from")
+    end = parse_datetime(request.args.get("to"), "to")
+    if start is not None:
+        query = query.filter(WeightEntry.timestamp >= start)
+    if end is not None:
+        query = query.filter(WeightEntry.timestamp < end)
+    return query
+
+
+def _target_unit():
+    """Optional ?unit= to report weights in; None keeps each entry's own unit."""
+    unit = request.args.get("unit")
+    return None if unit is None else unit_code(unit)
+
+
+def _weight_in(column, target):
+    """SQL expression for a weight column converted from each row's unit to ``target``."""
+    factors = {code: float(factor(unit, target)) for code, unit in WEIGHT_ENTRY_UNITS.items()}
+    return column * case(factors, value=WeightEntry.unit)
+
+
+WEIGHT_FIELDS = ("current_weight", "tare_weight", "gross_weight")
+
+
+def _rows_in_unit(query, headers, target):
+    """Export rows with the weight columns converted to ``target``, one array multiply per chunk."""
+    positions = [headers.index(field) for field in WEIGHT_FIELDS]
+    unit_position = headers.index("unit")
+
+    def convert(chunk):
+        factors = factors_to([row[unit_position] for row in chunk], target)
+        weights = np.array([[row[p] for p in positions] for row in chunk], dtype=float) * factors[:, None]
+        for row, converted in zip(chunk, weights.tolist()):
+            for p, value in zip(positions, converted):
+                row[p] = value
+            row[unit_position] = target
+        return chunk
+
+    chunk = []
+    for entry in query.yield_per(QUERY_BATCH_SIZE):
+        chunk.append([getattr(entry, key) for key in headers])
+        if len(chunk) == QUERY_BATCH_SIZE:
+            yield from convert(chunk)
+            chunk = []
+    if chunk:
+        yield from convert(chunk)
+
+
+def _epoch_seconds(column):
+    """Dialect-specific expression for a naive-UTC DATETIME column as Unix seconds.
+
+    MySQL's UNIX_TIMESTAMP() reads its argument in the session time zone, so
+    the offset from the epoch is taken with TIMESTAMPDIFF instead.
+    """
+    if db.engine.dialect.name == "sqlite":
+        return func.cast(func.strftime("%s", column), db.Integer)
+    return func.timestampdiff(literal_column("SECOND"), "1970-01-01 00:00:00", column)
+
+
+# GET: Fetch weight entries, newest first, one keyset page at a time
 @weight_bp.route("/weights", methods=["GET"])
 def get_weight_entries():
-    entries = WeightEntry.query.order_by(WeightEntry.timestamp.desc()).all()
-    return weights_schema.jsonify(entries), 200
+    try:
+        limit = parse_limit(
+            request.args.get("limit"),
+            default=current_app.config["WEIGHT_PAGE_SIZE"],
+            maximum=current_app.config["WEIGHT_PAGE_SIZE_MAX"],
+        )
+        query = _time_window(WeightEntry.query)
+
+        cursor = request.args.get("cursor")
+        if cursor:
+            values = decode_cursor(cursor)
+            if len(values) != 2:
+                raise InvalidQueryParam("Invalid cursor")
+            last_timestamp = parse_datetime(values[0], "cursor")
+            last_id = int(values[1])
+            query = query.filter(or_(
+                WeightEntry.timestamp < last_timestamp,
+                and_(WeightEntry.timestamp == last_timestamp, WeightEntry.id < last_id),
+            ))
+    except (InvalidQueryParam, ValueError, TypeError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    entries = (
+        query.order_by(WeightEntry.timestamp.desc(), WeightEntry.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+
+    next_cursor = None
+    if len(entries) > limit:
+        entries = entries[:limit]
+        next_cursor = encode_cursor([entries[-1].timestamp, entries[-1].id])
+
+    response = weights_schema.jsonify(entries)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response, 200
+
+# GET: Downsampled weight trend (min/max/mean of current_weight per bucket; ?unit= normalises kg/lb scales)
+@weight_bp.route("/weights/downsample", methods=["GET"])
+def get_weight_trend():
+    try:
+        bucket_seconds = int(request.args.get("bucket", 60))
+        if bucket_seconds <= 0:
+            raise ValueError
+    except ValueError:
+        return jsonify({"error": "'bucket' must be a positive number of seconds"}), 400
+
+    try:
+        query = _time_window(db.session.query(WeightEntry))
+        target = _target_unit()
+    except (InvalidQueryParam, UnitError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    weight = WeightEntry.current_weight if target is None else _weight_in(WeightEntry.current_weight, target)
+    bucket = (func.floor(_epoch_seconds(WeightEntry.timestamp) / bucket_seconds) * bucket_seconds).label("bucket")
+    rows = (
+        query.with_entities(
+            bucket,
+            func.count(WeightEntry.id),
+            func.min(weight),
+            func.max(weight),
+            func.avg(weight),
+        )
+        .group_by(bucket)
+        .order_by(bucket)
+        .all()
+    )
+
+    result = [
+        {
+            "bucket_start": datetime.utcfromtimestamp(int(start)).isoformat(),
+            "count": count,
+            "min": minimum,
+            "max": maximum,
+            "mean": float(mean) if mean is not None else None,
+        }
+        for start, count, minimum, maximum, mean in rows
+    ]
+    return jsonify({"bucket_seconds": bucket_seconds, "unit": target, "buckets": result}), 200
+
+# GET: Stream weight entries in the optional ?from=&to= window as .xlsx (?unit= converts the weights)
+@weight_bp.route("/weights/export", methods=["GET"])
+def export_weight_entries_excel():
+    try:
+        query = _time_window(WeightEntry.query)
+        target = _target_unit()
+    except (InvalidQueryParam, UnitError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    query = query.order_by(WeightEntry.timestamp, WeightEntry.id)
+    columns = list(WeightEntry.__table__.columns)
+    if target is None:
+        return stream_query_xlsx("weight_entries.xlsx", "Weight Entries", query, columns)
+    headers = [column.key for column in columns]
+    return stream_rows_xlsx("weight_entries.xlsx", "Weight Entries", headers, _rows_in_unit(query, headers, target))
@@ -0,0 +1,29 @@
+# routes/weight_socket.py
+
+from flask_socketio import Namespace, join_room, leave_room, emit # type: ignore
+from services.weight_stream import NAMESPACE, station_room, weight_broadcaster
+
+
+class WeightNamespace(Namespace):
+    """Socket namespace dosing screens subscribe to for live scale values.
+
+    Clients emit ``subscribe`` / ``unsubscribe`` with ``{"station_id": ...}``
+    and then receive ``weight`` (latest reading, coalesced server-side) and
+    ``status`` (stable/unstable transitions) events for that station.
+    """
+
+    def on_connect(self):
+        weight_broadcaster.ensure_started()
+
+    def on_subscribe(self, data):
+        station_id = (data or {}).get("station_id")
+        join_room(station_room(station_id))
+        emit("subscribed", {"station_id": station_id})
+
+    def on_unsubscribe(self, data):
+        station_id = (data or {}).get("station_id")
+        leave_room(station_room(station_id))
+        emit("unsubscribed", {"station_id": station_id})
+
+
+weight_namespace = WeightNamespace(NAMESPACE)
@@ -0,0 +1,76 @@
+# services/active_material_cache.py
+
+import threading
+import time
+
+from extensions import db
+from models.material import Material
+from services.cache_versions import bump_version, read_version
+
+CACHE_NAME = "active_material"
+
+
+class ActiveMaterialCache:
+    """In-process cache of the active material, shared-versioned across workers.
+
+    Writers that can change which material is active (or its fields) call
+    ``invalidate`` inside their transaction: it bumps a counter row in
+    ``cache_version`` and drops the local copy. Readers serve from memory
+    and re-read only that counter, a primary-key lookup, at most every
+    ``ACTIVE_MATERIAL_VERSION_CHECK_INTERVAL`` seconds. The material is
+    reloaded only when the counter has moved.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entry = None  # (version, payload, checked_at)
+        self._check_interval = 0.5
+
+    def init_app(self, app):
+        self._check_interval = app.config["ACTIVE_MATERIAL_VERSION_CHECK_INTERVAL"]
+
+    def get(self, loader):
+        """Return the cached payload, calling ``loader()`` only when stale.
+
+        ``loader`` returns the serialized active material or None.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entry
+        if entry is not None and now - entry[2] < self._check_interval:
+            return entry[1]
+
+        version = read_version(CACHE_NAME)
+        if entry is not None and entry[0] == version:
+            with self._lock:
+                self._entry = (version, entry[1], now)
+            return entry[1]
+
+        payload = loader()
+        with self._lock:
+            self._entry = (version, payload, now)
+        return payload
+
+    def invalidate(self):
+        """Bump the shared version in the current transaction; the caller commits."""
+        bump_version(CACHE_NAME)
+        with self._lock:
+            self._entry = None
+
+    def invalidate_for(self, material_ids):
+        """``invalidate`` only if one of ``material_ids`` is the active material.
+
+        Stock movements call this so that moving any other material does not
+        take the shared ``cache_version`` row lock for the rest of their
+        transaction.
+        """
+        active = (
+            db.session.query(Material.material_id)
+            .filter(Material.material_id.in_(set(material_ids)), Material.status == "active")
+            .first()
+        )
+        if active is not None:
+            self.invalidate()
+
+
+active_material_cache = ActiveMaterialCache()
@@ -0,0 +1,125 @@
+# services/barcode_cache.py
+
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class BarcodeImageCache:
+    """Content-addressed cache of rendered barcode PNGs.
+
+    Entries are keyed by a hash of (symbology, value, size) so a given label
+    is rendered once and reused by every export and single-image lookup.
+    Hot entries live in a bounded in-memory LRU; everything is also written
+    to a directory capped at ``BARCODE_CACHE_MAX_BYTES``, evicting the
+    least recently used files (by mtime, refreshed on hit) when full.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()
+        self._memory_items = 0
+        self._directory = None
+        self._max_bytes = 0
+        self._disk_bytes = 0
+
+    def init_app(self, app):
+        self._memory_items = app.config["BARCODE_CACHE_MEMORY_ITEMS"]
+        self._max_bytes = app.config["BARCODE_CACHE_MAX_BYTES"]
+        self._directory = app.config["BARCODE_CACHE_DIR"] or os.path.join(app.instance_path, "barcode_cache")
+        os.makedirs(self._directory, exist_ok=True)
+        self._disk_bytes = sum(size for _, _, size in self._scan())
+
+    @staticmethod
+    def key(symbology, value, size):
+        raw = f"{symbology}\x00{value}\x00{size[0]}x{size[1]}".encode("utf-8")
+        return hashlib.sha256(raw).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self._directory, key[:2], f"{key}.png")
+
+    def _remember(self, key, data):
+        with self._lock:
+            self._memory[key] = data
+            self._memory.move_to_end(key)
+            while len(self._memory) > self._memory_items:
+                self._memory.popitem(last=False)
+
+    def get(self, symbology, value, size):
+        key = self.key(symbology, value, size)
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                return data
+
+        if self._directory is None:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)  # mark as recently used for LRU eviction
+        except OSError:
+            return None
+
+        self._remember(key, data)
+        return data
+
+    def put(self, symbology, value, size, data):
+        key = self.key(symbology, value, size)
+        self._remember(key, data)
+        if self._directory is None:
+            return
+
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)  # atomic, so concurrent readers never see partial files
+        except OSError as e:
+            logger.warning(f"Could not write barcode cache entry {key}: {e}")
+            return
+
+        with self._lock:
+            self._disk_bytes += len(data)
+            over_budget = self._disk_bytes > self._max_bytes
+        if over_budget:
+            self._evict()
+
+    def _scan(self):
+        for root, _, files in os.walk(self._directory):
+            for name in files:
+                if not name.endswith(".png"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                yield path, stat.st_mtime, stat.st_size
+
+    def _evict(self):
+        """Delete least recently used files until the cache is at 90% of its budget."""
+        entries = sorted(self._scan(), key=lambda entry: entry[1])
+        total = sum(size for _, _, size in entries)
+        target = int(self._max_bytes * 0.9)
+        for path, _, size in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                continue
+        with self._lock:
+            self._disk_bytes = total
+
+
+barcode_cache = BarcodeImageCache()
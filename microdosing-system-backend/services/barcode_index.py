@@ -0,0 +1,79 @@
+# services/barcode_index.py
+
+import threading
+import time
+
+from extensions import db
+from models.material import Material
+from models.recipe import Recipe
+from models.production import ProductionOrder
+from models.storage import StorageBucket
+from services.cache_versions import bump_version, read_version
+
+CACHE_NAME = "barcode_index"
+
+# entity type -> (barcode column, id column, label column)
+SOURCES = {
+    "material": (Material.barcode_id, Material.material_id, Material.title),
+    "storage_bucket": (StorageBucket.barcode, StorageBucket.bucket_id, StorageBucket.location_id),
+    "recipe": (Recipe.barcode_id, Recipe.recipe_id, Recipe.name),
+    "production_order": (ProductionOrder.barcode_id, ProductionOrder.order_id, ProductionOrder.order_number),
+}
+
+
+class BarcodeIndex:
+    """Warm in-memory map of every scannable code to the entities that carry it.
+
+    Built from four narrow (barcode, id, label) queries and swapped in
+    atomically. Writers that add, change or remove a barcode call
+    ``invalidate`` in their transaction; each worker checks the shared
+    version at most every ``BARCODE_INDEX_CHECK_INTERVAL`` seconds and
+    rebuilds only when it moved.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._index = None
+        self._version = None
+        self._checked_at = 0.0
+        self._check_interval = 1.0
+
+    def init_app(self, app):
+        self._check_interval = app.config["BARCODE_INDEX_CHECK_INTERVAL"]
+
+    @staticmethod
+    def _build():
+        index = {}
+        for entity_type, (barcode_col, id_col, label_col) in SOURCES.items():
+            rows = db.session.query(barcode_col, id_col, label_col).filter(barcode_col.isnot(None))
+            for code, entity_id, label in rows:
+                index.setdefault(code, []).append({"type": entity_type, "id": entity_id, "label": label})
+        return index
+
+    def _current(self):
+        now = time.monotonic()
+        with self._lock:
+            index, version, checked_at = self._index, self._version, self._checked_at
+        if index is not None and now - checked_at < self._check_interval:
+            return index
+
+        latest = read_version(CACHE_NAME)
+        if index is None or latest != version:
+            index = self._build()
+        with self._lock:
+            self._index, self._version, self._checked_at = index, latest, now
+        return index
+
+    def resolve(self, codes):
+        """Resolve scanned codes; returns ``[{"code", "matches": [...]}]`` in input order."""
+        index = self._current()
+        return [{"code": code, "matches": index.get(code, [])} for code in codes]
+
+    def invalidate(self):
+        """Bump the shared version in the current transaction; the caller commits."""
+        bump_version(CACHE_NAME)
+        with self._lock:
+            self._index = None
+
+
+barcode_index = BarcodeIndex()
@@ -0,0 +1,150 @@
+# services/barcode_sheet.py
+
+import io
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from flask import current_app
+from openpyxl.drawing.image import Image as ExcelImage
+from openpyxl.utils import get_column_letter
+from barcode import Code128
+from barcode.writer import ImageWriter
+from PIL import Image as PILImage
+from services.barcode_cache import barcode_cache
+from services.xlsx_stream import write_only_sheet, xlsx_response
+
+logger = logging.getLogger(__name__)
+
+SYMBOLOGY = "code128"
+RENDER_SIZE = (200, 60)   # pixels of the stored PNG
+DISPLAY_SIZE = (150, 50)  # size of the image anchored in the sheet
+
+_pool = None
+
+
+def render_barcode_png(value, size=RENDER_SIZE):
+    """Render a Code128 barcode for ``value`` to PNG bytes, entirely in memory."""
+    raw = io.BytesIO()
+    Code128(value, writer=ImageWriter()).write(raw)
+    raw.seek(0)
+
+    image = PILImage.open(raw).resize(size)
+    out = io.BytesIO()
+    image.save(out, format="PNG")
+    return out.getvalue()
+
+
+def _render_or_none(value):
+    try:
+        return render_barcode_png(value)
+    except Exception as e:
+        logger.warning(f"Failed to generate barcode for {value}: {e}")
+        return None
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        workers = current_app.config["BARCODE_RENDER_WORKERS"] or os.cpu_count() or 1
+        # Forking a threaded server can copy held locks and open DB connections into the workers
+        _pool = ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"))
+    return _pool
+
+
+def get_barcode_png(value):
+    """Return the PNG for a single barcode value, rendering only on a cache miss."""
+    png = barcode_cache.get(SYMBOLOGY, value, RENDER_SIZE)
+    if png is None:
+        png = render_barcode_png(value)
+        barcode_cache.put(SYMBOLOGY, value, RENDER_SIZE, png)
+    return png
+
+
+def render_many(values):
+    """Render PNGs for many barcode values; returns {value: png_bytes or None}.
+
+    Cached images are reused. Of the misses, small sets render inline and
+    larger ones are fanned out across a shared process pool since Code128
+    rendering and resizing are CPU bound.
+    """
+    images = {}
+    missing = []
+    for value in dict.fromkeys(v for v in values if v):
+        png = barcode_cache.get(SYMBOLOGY, value, RENDER_SIZE)
+        if png is None:
+            missing.append(value)
+        else:
+            images[value] = png
+
+    if len(missing) < current_app.config["BARCODE_PARALLEL_THRESHOLD"]:
+        rendered = [_render_or_none(value) for value in missing]
+    else:
+        pool = _get_pool()
+        chunksize = max(1, len(missing) // ((os.cpu_count() or 1) * 4))
+        rendered = pool.map(_render_or_none, missing, chunksize=chunksize)
+
+    for value, png in zip(missing, rendered):
+        images[value] = png
+        if png is not None:
+            barcode_cache.put(SYMBOLOGY, value, RENDER_SIZE, png)
+    return images
+
+
+class BarcodeImage(ExcelImage):
+    """Sheet image that fetches its PNG only when the workbook is saved.
+
+    openpyxl keeps every anchored image on the sheet until save, so holding
+    the bytes here would keep a whole export's images in memory. Only the
+    value is kept; the PNG comes back from the barcode cache (or is rendered
+    again) as each image is written into the archive.
+    """
+
+    def __init__(self, value):
+        self.ref = value
+        self.format = "png"
+        self.width, self.height = DISPLAY_SIZE
+
+    def _data(self):
+        return get_barcode_png(self.ref)
+
+
+def build_barcode_workbook(sheet_title, headers, rows, chunk_size=500):
+    """Build a write-only workbook with one barcode image per row.
+
+    ``rows`` is an iterable of ``(cells, barcode_value)``; the image goes in
+    the last header column. Rows are consumed ``chunk_size`` at a time so
+    only one chunk of rendered images is in memory at once; the sheet keeps
+    just a ``BarcodeImage`` per row. Rows whose barcode fails to render keep
+    their text cells.
+    """
+    wb, ws = write_only_sheet(sheet_title, headers)
+    image_column = get_column_letter(len(headers))
+
+    row_number = 2
+    for chunk in _chunks(rows, chunk_size):
+        images = render_many(value for _, value in chunk)
+        for cells, value in chunk:
+            ws.append(cells)
+            if images.get(value):
+                ws.add_image(BarcodeImage(value), f"{image_column}{row_number}")
+            row_number += 1
+    return wb
+
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def send_barcode_workbook(download_name, sheet_title, headers, rows):
+    """Build a barcode workbook and stream it back as a Flask download response."""
+    wb = build_barcode_workbook(sheet_title, headers, rows)
+    return xlsx_response(wb, download_name)
@@ -0,0 +1,126 @@
+# services/batch_lifecycle.py
+
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy.exc import IntegrityError # type: ignore
+from extensions import db
+from models.production import BatchCycleStat, ProductionOrder
+
+# Allowed batch status transitions; completed and failed are terminal
+TRANSITIONS = {
+    "pending": ("in_progress",),
+    "in_progress": ("completed", "failed"),
+    "completed": (),
+    "failed": (),
+}
+UNASSIGNED_STATION = "unassigned"
+
+
+class BatchStateError(ValueError):
+    """Raised for a batch status change the lifecycle does not allow."""
+
+
+def transition(batch, new_status, now=None):
+    """Move ``batch`` to ``new_status``, stamping start/end times.
+
+    Entering ``in_progress`` sets ``start_time`` unless one is already
+    recorded; entering a terminal state sets ``end_time`` and folds the
+    batch into the cycle-time aggregates.
+    The caller holds the batch row lock and owns the commit.
+    """
+    if new_status == batch.status:
+        return batch
+    if new_status not in TRANSITIONS:
+        raise BatchStateError(f"Unknown batch status '{new_status}'")
+    if new_status not in TRANSITIONS[batch.status]:
+        raise BatchStateError(f"Batch {batch.batch_id} cannot go from {batch.status} to {new_status}")
+
+    now = now or datetime.utcnow()
+    batch.status = new_status
+    if new_status == "in_progress":
+        batch.start_time = batch.start_time or now
+    else:
+        batch.end_time = now
+        _record_cycle(batch)
+    return batch
+
+
+def advance(batch, new_status, now=None):
+    """Like ``transition`` but walks a pending batch through ``in_progress`` first.
+
+    A batch closed without ever being started is taken to have started
+    when it was created (released), not at the instant it closed.
+    """
+    now = now or datetime.utcnow()
+    if batch.status == "pending" and new_status in ("completed", "failed"):
+        started = batch.created_at if batch.created_at is not None and batch.created_at < now else now
+        transition(batch, "in_progress", started)
+    return transition(batch, new_status, now)
+
+
+def _locked_stat(scope, scope_key):
+    query = db.session.query(BatchCycleStat).filter_by(scope=scope, scope_key=scope_key).with_for_update()
+    stat = query.first()
+    if stat is None:
+        try:
+            with db.session.begin_nested():
+                db.session.add(BatchCycleStat(
+                    scope=scope, scope_key=scope_key, completed=0, failed=0, timed_completed=0,
+                    total_cycle_seconds=0,
+                ))
+        except IntegrityError:
+            pass  # another worker created it first
+        stat = query.first()
+    return stat
+
+
+def _record_cycle(batch):
+    station_id, recipe_id = (
+        db.session.query(ProductionOrder.station_id, ProductionOrder.recipe_id)
+        .filter_by(order_id=batch.order_id)
+        .one()
+    )
+    alpha = current_app.config["BATCH_STATS_EWMA_ALPHA"]
+    cycle = (batch.end_time - batch.start_time).total_seconds()
+
+    for scope, scope_key in (("station", station_id or UNASSIGNED_STATION), ("recipe", str(recipe_id))):
+        stat = _locked_stat(scope, scope_key)
+        if batch.status == "failed":
+            stat.failed += 1
+            continue
+        stat.completed += 1
+        if cycle > 0:  # a batch without a real start says nothing about cycle time
+            stat.timed_completed = (stat.timed_completed or 0) + 1
+            stat.total_cycle_seconds += cycle
+            if stat.ewma_cycle_seconds is None:
+                stat.ewma_cycle_seconds = cycle
+            else:
+                stat.ewma_cycle_seconds += alpha * (cycle - stat.ewma_cycle_seconds)
+        if stat.last_completed_at is not None:
+            interval = max((batch.end_time - stat.last_completed_at).total_seconds(), 0.0)
+            if stat.ewma_interval_seconds is None:
+                stat.ewma_interval_seconds = interval
+            else:
+                stat.ewma_interval_seconds += alpha * (interval - stat.ewma_interval_seconds)
+        if stat.last_completed_at is None or batch.end_time > stat.last_completed_at:
+            stat.last_completed_at = batch.end_time
+
+
+def serialize_stat(stat):
+    finished = stat.completed + stat.failed
+    return {
+        "scope": stat.scope,
+        "key": stat.scope_key,
+        "completed": stat.completed,
+        "failed": stat.failed,
+        "yield_pct": round(100.0 * stat.completed / finished, 2) if finished else None,
+        "mean_cycle_seconds": (
+            round(stat.total_cycle_seconds / stat.timed_completed, 2) if stat.timed_completed else None
+        ),
+        "rolling_cycle_seconds": round(stat.ewma_cycle_seconds, 2) if stat.ewma_cycle_seconds is not None else None,
+        "rolling_batches_per_hour": (
+            round(3600.0 / stat.ewma_interval_seconds, 2) if stat.ewma_interval_seconds else None
+        ),
+        "last_completed_at": stat.last_completed_at.isoformat() if stat.last_completed_at else None,
+    }
@@ -0,0 +1,29 @@
+# services/cache_versions.py
+
+from sqlalchemy import insert, update # type: ignore
+from sqlalchemy.exc import IntegrityError # type: ignore
+from extensions import db
+from models.cache_version import CacheVersion
+
+
+def read_version(name):
+    """Current shared version for cache ``name`` (0 if never bumped)."""
+    version = db.session.query(CacheVersion.version).filter_by(name=name).scalar()
+    return version or 0
+
+
+def bump_version(name):
+    """Increment the shared version for ``name`` in the current transaction; the caller commits."""
+    bump = (
+        update(CacheVersion)
+        .where(CacheVersion.name == name)
+        .values(version=CacheVersion.version + 1)
+    )
+    if db.session.execute(bump).rowcount:
+        return
+    try:
+        with db.session.begin_nested():
+            db.session.execute(insert(CacheVersion).values(name=name, version=1))
+    except IntegrityError:
+        # Another worker created the row first; bump it instead
+        db.session.execute(bump)
@@ -0,0 +1,202 @@
+# services/dispensing.py
+
+from collections import Counter
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+import numpy as np
+from sqlalchemy import insert, update # type: ignore
+from extensions import db
+from models.production import Batch, BatchMaterialDispensing, ProductionOrder
+from models.material import Material
+from services.batch_lifecycle import advance
+from services.recipe_versions import component_rows
+from services.units import convert, convert_array, unit_code, UnitError
+
+CENT = Decimal("0.01")
+
+
+class DispensingError(ValueError):
+    """Raised when a batch dispensing request is invalid."""
+
+
+def evaluate_tolerances(planned, actual, tolerance_pct):
+    """Vectorized tolerance check over whole batches of lines.
+
+    ``planned``/``actual``/``tolerance_pct`` are equal-length float arrays;
+    NaN in ``actual`` means not dispensed yet. Returns
+    ``(deviation_pct, within_tolerance, dispensed)`` arrays.
+    """
+    planned = np.asarray(planned, dtype=float)
+    actual = np.asarray(actual, dtype=float)
+    tolerance_pct = np.abs(np.asarray(tolerance_pct, dtype=float))
+
+    dispensed = ~np.isnan(actual)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        deviation_pct = np.where(planned != 0, (actual - planned) / planned * 100.0, np.where(actual == 0, 0.0, np.inf))
+    within = dispensed & (np.abs(deviation_pct) <= tolerance_pct + 1e-9)
+    return np.round(deviation_pct, 2), within, dispensed
+
+
+def _parse_line(index, raw):
+    if not isinstance(raw, dict):
+        raise DispensingError(f"Line {index}: must be a JSON object")
+    try:
+        material_id = int(raw["material_id"])
+        planned = raw.get("planned_quantity")
+        planned = None if planned is None else Decimal(str(planned))
+        actual = raw.get("actual_quantity")
+        actual = None if actual is None else Decimal(str(actual))
+    except (KeyError, TypeError, ValueError, InvalidOperation):
+        raise DispensingError(f"Line {index}: material_id and numeric quantities are required")
+    if (planned is not None and planned < 0) or (actual is not None and actual < 0):
+        raise DispensingError(f"Line {index}: quantities cannot be negative")
+    actual_unit = raw.get("actual_unit")
+    if actual_unit is not None:
+        try:
+            actual_unit = unit_code(actual_unit)
+        except UnitError as e:
+            raise DispensingError(f"Line {index}: {e}")
+    return material_id, planned, actual, actual_unit
+
+
+def record_batch_dispensing(batch_id, dispensed_by, raw_lines, default_tolerance_pct):
+    """Record all dispensing lines of a batch and roll its status forward.
+
+    A line fills in the batch's planned line for its material (created by
+    order release) and is only inserted when the batch has none;
+    ``planned_quantity`` may then be omitted.
+    Quantities are in the material's unit; an ``actual_unit`` on a line
+    (e.g. a scale reading in lb) is converted before storing. Each actual
+    is compared to its planned quantity against the recipe material's
+    margin, or ``default_tolerance_pct`` when no margin is set (None or 0).
+    Within tolerance becomes ``verified``, outside it ``dispensed``, and no
+    actual stays ``pending``.
+
+    The batch becomes ``completed`` once every one of its lines is
+    verified and ``in_progress`` otherwise; an out-of-tolerance line is
+    re-dosed by posting its material again. Failing a batch is an explicit
+    status change. The caller owns the commit.
+    """
+    batch = db.session.query(Batch).filter_by(batch_id=batch_id).with_for_update().first()
+    if batch is None:
+        raise LookupError(f"Batch {batch_id} not found")
+    if batch.status in ("completed", "failed"):
+        raise DispensingError(f"Batch {batch_id} is already {batch.status}")
+    if not isinstance(raw_lines, list) or not raw_lines:
+        raise DispensingError("lines must be a non-empty list")
+
+    parsed = [_parse_line(index, raw) for index, raw in enumerate(raw_lines)]
+    repeated = sorted(m for m, count in Counter(m for m, _, _, _ in parsed).items() if count > 1)
+    if repeated:
+        raise DispensingError(f"Each material may appear only once per call; repeated: {repeated}")
+
+    planned_lines = {}  # material_id -> (dispensing_id, planned_quantity)
+    for line_id, material_id, planned in (
+        db.session.query(
+            BatchMaterialDispensing.dispensing_id,
+            BatchMaterialDispensing.material_id,
+            BatchMaterialDispensing.planned_quantity,
+        )
+        .filter(BatchMaterialDispensing.batch_id == batch_id)
+        .order_by(BatchMaterialDispensing.dispensing_id)
+    ):
+        planned_lines.setdefault(material_id, (line_id, planned))
+    for index, (material_id, planned, actual, unit) in enumerate(parsed):
+        if planned is None:
+            if material_id not in planned_lines:
+                raise DispensingError(f"Line {index}: planned_quantity is required for an unplanned material")
+            parsed[index] = (material_id, planned_lines[material_id][1], actual, unit)
+
+    material_ids = {material_id for material_id, _, _, _ in parsed}
+    material_units = dict(
+        db.session.query(Material.material_id, Material.unit_of_measure)
+        .filter(Material.material_id.in_(material_ids))
+    )
+    unknown = sorted(material_ids - set(material_units))
+    if unknown:
+        raise DispensingError(f"Unknown material_id(s): {unknown}")
+    planned_units = [material_units[m] for m, _, _, _ in parsed]
+    actual_units = [unit or material_units[m] for m, _, _, unit in parsed]
+
+    lines = [
+        (
+            material_id,
+            planned,
+            actual if unit is None or actual is None
+            else convert(actual, unit, material_units[material_id]).quantize(CENT),
+        )
+        for material_id, planned, actual, unit in parsed
+    ]
+
+    order = (
+        db.session.query(ProductionOrder.recipe_id, ProductionOrder.recipe_version_id)
+        .filter_by(order_id=batch.order_id)
+        .one()
+    )
+    margins = {material_id: margin for material_id, _, margin in component_rows(*order)}
+
+    # margin is the recorded deviation of the recipe's trial actual, 0 when it hit the set point
+    tolerance = [float(margins[m]) if margins.get(m) else default_tolerance_pct for m, _, _ in lines]
+    # Compared in grams so lines in different units need no per-row branching
+    deviation, within, dispensed = evaluate_tolerances(
+        convert_array([float(p) for _, p, _, _ in parsed], planned_units, "g"),
+        convert_array([np.nan if a is None else float(a) for _, _, a, _ in parsed], actual_units, "g"),
+        tolerance,
+    )
+    statuses = np.where(within, "verified", np.where(dispensed, "dispensed", "pending"))
+
+    now = datetime.utcnow()
+    rows = [
+        {
+            "batch_id": batch_id,
+            "material_id": material_id,
+            "planned_quantity": planned,
+            "actual_quantity": actual,
+            "dispensed_by": dispensed_by,
+            "dispensed_at": now,
+            "status": str(status),
+        }
+        for (material_id, planned, actual), status in zip(lines, statuses)
+    ]
+    updates = [
+        {**row, "dispensing_id": planned_lines[row["material_id"]][0]}
+        for row in rows if row["material_id"] in planned_lines
+    ]
+    inserts = [row for row in rows if row["material_id"] not in planned_lines]
+    if updates:
+        db.session.execute(update(BatchMaterialDispensing), updates)
+    if inserts:
+        db.session.execute(insert(BatchMaterialDispensing), inserts)
+
+    # Completion is decided over every line of the batch, not just this call's
+    db.session.flush()
+    line_statuses = [
+        status for (status,) in
+        db.session.query(BatchMaterialDispensing.status).filter(BatchMaterialDispensing.batch_id == batch_id)
+    ]
+    if all(status == "verified" for status in line_statuses):
+        new_status = "completed"
+    elif dispensed.any() or batch.status == "in_progress":
+        new_status = "in_progress"
+    else:
+        new_status = batch.status
+    advance(batch, new_status)
+
+    return {
+        "batch_id": batch_id,
+        "batch_status": new_status,
+        "lines": [
+            {
+                "material_id": material_id,
+                "planned_quantity": str(planned),
+                "actual_quantity": str(actual) if actual is not None else None,
+                "tolerance_pct": tol,
+                "deviation_pct": float(dev) if np.isfinite(dev) and is_dispensed else None,
+                "within_tolerance": bool(ok),
+                "status": str(status),
+            }
+            for (material_id, planned, actual), tol, dev, ok, is_dispensed, status
+            in zip(lines, tolerance, deviation, within, dispensed, statuses)
+        ],
+    }
@@ -0,0 +1,148 @@
+# services/dosing_plan.py
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from decimal import Decimal
+
+from flask import current_app
+from sqlalchemy.exc import IntegrityError # type: ignore
+from extensions import db
+from models.material import Material
+from models.recipe import Recipe, RecipeDosingPlan
+from services.recipe_versions import component_rows
+from services.units import convert
+
+PLAN_UNIT = "kg"
+CENT = Decimal("0.01")
+
+
+def _kg(value, unit):
+    return format(convert(value, unit, PLAN_UNIT).normalize(), "f")
+
+
+def compile_plan(recipe):
+    """Build the dosing plan of a released recipe as canonical JSON.
+
+    Components come from the version's snapshot, in recipe order, with
+    their set point and tolerance band in the material's own unit and
+    normalised to kilograms. The band is ``margin`` percent, or
+    DISPENSE_DEFAULT_TOLERANCE_PCT when no margin is set (None or 0),
+    the same rule dispensing checks against.
+    """
+    default_pct = Decimal(str(current_app.config["DISPENSE_DEFAULT_TOLERANCE_PCT"]))
+    rows = component_rows(recipe.recipe_id, version=recipe.version)
+    materials = {
+        material.material_id: material
+        for material in Material.query.filter(Material.material_id.in_([row[0] for row in rows])).all()
+    }
+    components = []
+    for step, (material_id, set_point, margin) in enumerate(rows, start=1):
+        material = materials[material_id]
+        set_point = (set_point or Decimal("0")).quantize(CENT)
+        tolerance_pct = abs(margin) if margin else default_pct
+        tolerance = (set_point * tolerance_pct / 100).quantize(CENT)
+        unit = material.unit_of_measure
+        components.append({
+            "step": step,
+            "material_id": material.material_id,
+            "title": material.title,
+            "barcode_id": material.barcode_id,
+            "unit_of_measure": unit,
+            "set_point": str(set_point),
+            "tolerance_pct": str(Decimal(tolerance_pct).quantize(CENT)),
+            "min_quantity": str(set_point - tolerance),
+            "max_quantity": str(set_point + tolerance),
+            "set_point_kg": _kg(set_point, unit),
+            "min_quantity_kg": _kg(set_point - tolerance, unit),
+            "max_quantity_kg": _kg(set_point + tolerance, unit),
+        })
+    plan = {
+        "recipe_id": recipe.recipe_id,
+        "code": recipe.code,
+        "name": recipe.name,
+        "version": recipe.version,
+        "unit": PLAN_UNIT,
+        "total_kg": _kg(sum((Decimal(c["set_point_kg"]) for c in components), Decimal("0")), "Kilogram (kg)"),
+        "components": components,
+    }
+    return json.dumps(plan, sort_keys=True, separators=(",", ":"))
+
+
+class DosingPlanCache:
+    """Compiled plans keyed by (recipe_id, version).
+
+    A plan never changes once compiled, so entries need no invalidation
+    across workers: memory (bounded LRU) in front of the
+    ``recipe_dosing_plan`` table, compiled into it on release.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._plans = OrderedDict()  # (recipe_id, version) -> (etag, body)
+        self._max_items = 512
+
+    def init_app(self, app):
+        self._max_items = app.config["DOSING_PLAN_CACHE_ITEMS"]
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._plans[key] = entry
+            self._plans.move_to_end(key)
+            while len(self._plans) > self._max_items:
+                self._plans.popitem(last=False)
+        return entry
+
+    def build(self, recipe):
+        """Compile and store the plan of a released recipe version if it does not exist yet.
+
+        Runs in the caller's transaction; the caller commits.
+        """
+        key = (recipe.recipe_id, recipe.version)
+        stored = db.session.get(RecipeDosingPlan, key)
+        if stored is None:
+            body = compile_plan(recipe)
+            stored = RecipeDosingPlan(
+                recipe_id=recipe.recipe_id,
+                version=recipe.version,
+                etag=hashlib.sha256(body.encode()).hexdigest(),
+                plan=body,
+            )
+            try:
+                with db.session.begin_nested():
+                    db.session.add(stored)
+            except IntegrityError:
+                stored = db.session.get(RecipeDosingPlan, key)  # compiled concurrently
+        return self._remember(key, (stored.etag, stored.plan))
+
+    def get(self, recipe_id, version):
+        """Return ``(etag, body)`` of a compiled plan, or None if that version was never released.
+
+        Read-only: never writes to the database.
+        """
+        key = (recipe_id, version)
+        with self._lock:
+            entry = self._plans.get(key)
+            if entry is not None:
+                self._plans.move_to_end(key)
+                return entry
+        stored = db.session.get(RecipeDosingPlan, key)
+        if stored is not None:
+            return self._remember(key, (stored.etag, stored.plan))
+
+        # Released before plans were compiled on release: serve a fresh
+        # compilation without storing or caching it; the next release stores one
+        recipe = db.session.get(Recipe, recipe_id)
+        if recipe is None or recipe.status != "Released" or recipe.version != version:
+            return None
+        body = compile_plan(recipe)
+        return hashlib.sha256(body.encode()).hexdigest(), body
+
+    def discard(self, recipe_id):
+        with self._lock:
+            for key in [key for key in self._plans if key[0] == recipe_id]:
+                del self._plans[key]
+
+
+dosing_plans = DosingPlanCache()
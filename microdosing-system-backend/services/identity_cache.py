@@ -0,0 +1,47 @@
+# services/identity_cache.py
+
+import threading
+import time
+
+from extensions import db
+
+
+class IdentityCache:
+    """Short-lived per-process cache of (role, status) keyed by user_id.
+
+    Roles travel in the JWT, but a token outlives changes made by an admin.
+    Protected endpoints confirm the token against this cache, which reloads
+    a user from the database at most once per ``IDENTITY_CACHE_TTL`` seconds.
+    Writes in this process call ``invalidate`` so they take effect at once;
+    other workers pick them up when their entry expires.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._ttl = 60
+
+    def init_app(self, app):
+        self._ttl = app.config["IDENTITY_CACHE_TTL"]
+
+    def get(self, user_id):
+        """Return ``{"role", "status"}`` for a user, or None if the user no longer exists."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+        if entry and entry[0] > now:
+            return entry[1]
+
+        from models.user import User
+        user = db.session.get(User, user_id)
+        identity = {"role": user.role, "status": user.status} if user else None
+        with self._lock:
+            self._entries[user_id] = (now + self._ttl, identity)
+        return identity
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+
+identity_cache = IdentityCache()
@@ -0,0 +1,104 @@
+# services/inventory_ledger.py
+
+from collections import defaultdict
+from decimal import Decimal, InvalidOperation
+
+from sqlalchemy import case, func, insert, update # type: ignore
+from extensions import db
+from models.material import Material, MaterialTransaction
+
+TRANSACTION_TYPES = ("addition", "removal")
+
+
+class LedgerError(ValueError):
+    """Raised when a stock movement is invalid or cannot be applied."""
+
+
+def parse_movement(raw):
+    """Validate one movement and return the MaterialTransaction column dict."""
+    if not isinstance(raw, dict):
+        raise LedgerError("Each transaction must be a JSON object")
+
+    transaction_type = raw.get("transaction_type")
+    if transaction_type not in TRANSACTION_TYPES:
+        raise LedgerError("transaction_type must be 'addition' or 'removal'")
+
+    try:
+        material_id = int(raw["material_id"])
+        quantity = Decimal(str(raw["quantity"]))
+    except (KeyError, TypeError, ValueError, InvalidOperation):
+        raise LedgerError("material_id and a numeric quantity are required")
+    if not quantity.is_finite() or quantity <= 0:
+        raise LedgerError("quantity must be a positive number")
+
+    return {
+        "material_id": material_id,
+        "transaction_type": transaction_type,
+        "quantity": quantity.quantize(Decimal("0.01")),
+        "description": raw.get("description"),
+    }
+
+
+def _stock_delta_statement(material_id, delta):
+    """Atomic ``current_quantity += delta`` with margin recomputed in the same UPDATE.
+
+    margin is assigned first and computed from ``current_quantity + delta``:
+    MySQL evaluates SET clauses left to right, other databases against the
+    old row, and this ordering gives the same result on both.
+    """
+    new_quantity = Material.current_quantity + delta
+    new_margin = case(
+        (Material.maximum_quantity == 0, 0),
+        else_=func.round((Material.maximum_quantity - new_quantity) / Material.maximum_quantity * 100, 2),
+    )
+    return (
+        update(Material)
+        .where(Material.material_id == material_id)
+        .where(new_quantity >= 0)
+        .ordered_values(
+            (Material.margin, new_margin),
+            (Material.current_quantity, new_quantity),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def apply_movements(raw_movements, return_rows=False):
+    """Record stock movements and adjust Material stock in the current transaction.
+
+    Movements are netted per material and applied with one conditional
+    UPDATE each, in material_id order so concurrent batches lock rows in a
+    consistent order. A removal that would take stock below zero, or an
+    unknown material, raises LedgerError and the caller must roll back.
+    Transactions are inserted in one multi-row INSERT unless ``return_rows``
+    asks for flushed MaterialTransaction objects. The caller owns the commit.
+    """
+    movements = []
+    for index, raw in enumerate(raw_movements):
+        try:
+            movements.append(parse_movement(raw))
+        except LedgerError as e:
+            raise LedgerError(f"Transaction {index}: {e}")
+    if not movements:
+        raise LedgerError("No transactions provided")
+
+    deltas = defaultdict(Decimal)
+    for movement in movements:
+        sign = 1 if movement["transaction_type"] == "addition" else -1
+        deltas[movement["material_id"]] += sign * movement["quantity"]
+
+    for material_id in sorted(deltas):
+        result = db.session.execute(_stock_delta_statement(material_id, deltas[material_id]))
+        if result.rowcount == 0:
+            if db.session.get(Material, material_id) is None:
+                raise LedgerError(f"Material {material_id} not found")
+            raise LedgerError(f"Insufficient stock for material {material_id}")
+
+    if return_rows:
+        rows = [MaterialTransaction(**movement) for movement in movements]
+        db.session.add_all(rows)
+        db.session.flush()
+        return rows
+
+    db.session.execute(insert(MaterialTransaction), movements)
+    return movements
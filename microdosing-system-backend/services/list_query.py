@@ -0,0 +1,156 @@
+# services/list_query.py
+
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from types import SimpleNamespace
+
+from flask import current_app, jsonify, request
+from sqlalchemy import and_, or_ # type: ignore
+
+from services.pagination import InvalidQueryParam, decode_cursor, encode_cursor, parse_limit
+
+RESERVED_PARAMS = {"sort", "fields", "limit", "cursor"}
+FILTER_OPS = {
+    "eq": lambda column, value: column == value,
+    "gt": lambda column, value: column > value,
+    "gte": lambda column, value: column >= value,
+    "lt": lambda column, value: column < value,
+    "lte": lambda column, value: column <= value,
+}
+
+
+def _coerce(column, raw):
+    """Convert a query-string value to the Python type of ``column``."""
+    if raw is None:
+        return None
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return raw
+    try:
+        if python_type is datetime:
+            return datetime.fromisoformat(raw)
+        if python_type is date:
+            return date.fromisoformat(raw)
+        if python_type is Decimal:
+            return Decimal(raw)
+        if python_type in (int, float):
+            return python_type(raw)
+    except (ValueError, InvalidOperation):
+        raise InvalidQueryParam(f"Invalid value for '{column.key}': {raw}")
+    return raw
+
+
+def _apply_filters(query, model, filterable):
+    """``?field=v``, ``?field=a,b`` (IN) and ``?field__gte=v`` style filters."""
+    for param, raw in request.args.items():
+        if param in RESERVED_PARAMS:
+            continue
+        name, _, op = param.partition("__")
+        if name not in filterable:
+            continue
+        op = op or "eq"
+        if op not in FILTER_OPS:
+            raise InvalidQueryParam(f"Unsupported filter operator '{op}'")
+
+        column = getattr(model, name)
+        if op == "eq" and "," in raw:
+            query = query.filter(column.in_([_coerce(column, v) for v in raw.split(",")]))
+        else:
+            query = query.filter(FILTER_OPS[op](column, _coerce(column, raw)))
+    return query
+
+
+def _sort_keys(model, sortable, default_sort):
+    """Parse ``?sort=-created_at,title`` into [(column, descending)], pk last as tie-breaker."""
+    spec = request.args.get("sort") or default_sort or ""
+    keys = []
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        descending = part.startswith("-")
+        name = part.lstrip("-+")
+        if name not in sortable:
+            raise InvalidQueryParam(f"Cannot sort by '{name}'")
+        keys.append((getattr(model, name), descending))
+
+    pk = model.__mapper__.primary_key[0]
+    if not any(column.key == pk.key for column, _ in keys):
+        keys.append((getattr(model, pk.key), keys[-1][1] if keys else False))
+    return keys
+
+
+def _requested_fields():
+    fields = request.args.get("fields")
+    return {f.strip() for f in fields.split(",") if f.strip()} if fields else None
+
+
+def _project(query, model, keys):
+    """Select only the ``?fields=`` columns (plus sort keys); returns ``(query, columns)``.
+
+    ``columns`` is every column key of ``model``, or None when no projection applies.
+    """
+    wanted = _requested_fields()
+    if not wanted:
+        return query, None
+    columns = [attr.key for attr in model.__mapper__.column_attrs]
+    selected = {key for key in columns if key in wanted} | {column.key for column, _ in keys}
+    return query.with_entities(*[getattr(model, key) for key in columns if key in selected]), columns
+
+
+def _after_cursor(keys, values):
+    """WHERE clause selecting rows strictly after ``values`` in ``keys`` order."""
+    if len(values) != len(keys):
+        raise InvalidQueryParam("Invalid cursor")
+    values = [_coerce(column, v) if isinstance(v, str) else v for (column, _), v in zip(keys, values)]
+
+    clauses = []
+    for i, (column, descending) in enumerate(keys):
+        equal_prefix = [keys[j][0] == values[j] for j in range(i)]
+        step = column < values[i] if descending else column > values[i]
+        clauses.append(and_(*equal_prefix, step))
+    return or_(*clauses)
+
+
+def list_page(query, model, filterable=(), sortable=(), default_sort=None):
+    """Apply the shared list parameters to ``query`` and return ``(rows, next_cursor)``.
+
+    Filters, ``sort`` and keyset paging via ``limit``/``cursor`` all run in
+    SQL. Without ``limit`` the page size is ``LIST_PAGE_SIZE_DEFAULT``.
+    With ``?fields=`` only those columns are selected and the rows are plain
+    namespaces rather than session instances; the columns left out read as
+    None and are dropped again by ``list_response``. Keyset paging expects
+    non-null sort columns.
+    """
+    query = _apply_filters(query, model, set(filterable))
+    keys = _sort_keys(model, set(sortable), default_sort)
+
+    cursor = request.args.get("cursor")
+    if cursor:
+        query = query.filter(_after_cursor(keys, decode_cursor(cursor)))
+
+    query = query.order_by(*[column.desc() if descending else column.asc() for column, descending in keys])
+    query, columns = _project(query, model, keys)
+
+    limit = parse_limit(
+        request.args.get("limit"),
+        default=current_app.config["LIST_PAGE_SIZE_DEFAULT"] or current_app.config["LIST_PAGE_SIZE_MAX"],
+        maximum=current_app.config["LIST_PAGE_SIZE_MAX"],
+    )
+    rows = query.limit(limit + 1).all()
+    if columns is not None:
+        rows = [SimpleNamespace(**{**dict.fromkeys(columns), **row._asdict()}) for row in rows]
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor([getattr(rows[-1], column.key) for column, _ in keys])
+
+
+def list_response(items, next_cursor=None):
+    """JSON list response honouring ``?fields=a,b`` and exposing the next cursor."""
+    wanted = _requested_fields()
+    if wanted:
+        items = [{k: v for k, v in item.items() if k in wanted} for item in items]
+
+    response = jsonify(items)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response
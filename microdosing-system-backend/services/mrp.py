@@ -0,0 +1,142 @@
+# services/mrp.py
+
+from datetime import date, timedelta
+
+import numpy as np
+from sqlalchemy import func # type: ignore
+from extensions import db
+from models.material import Material
+from models.production import Batch, ProductionOrder
+from services.pagination import InvalidQueryParam
+from services.recipe_versions import component_sets
+from services.units import factors_to
+
+# Orders whose materials have not been consumed yet
+OPEN_STATUSES = ("planned", "released", "in_progress")
+
+
+def parse_date(value, name, default):
+    if value is None or value == "":
+        return default
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise InvalidQueryParam(f"'{name}' must be a YYYY-MM-DD date")
+
+
+def recipe_matrix(keys):
+    """Sparse bill-of-materials x material matrix in COO form.
+
+    ``keys`` are ``(recipe_id, recipe_version_id)`` pairs, read through
+    ``component_sets`` exactly as order release reads them: the pinned
+    version's snapshot, else the working rows, skipping components
+    without a set point. Each entry is a material's share of one unit
+    of that bill, the proportions release scales set points by. Returns
+    ``(rows, cols, values, key_index, material_ids)``.
+    """
+    key_index = {key: i for i, key in enumerate(sorted(keys, key=lambda k: (k[0], k[1] or 0)))}
+    entries = [
+        (key_index[key], material_id, set_point)
+        for key, components in component_sets(keys).items()
+        for material_id, set_point, _ in components
+        if set_point is not None
+    ]
+    material_ids = sorted({material_id for _, material_id, _ in entries})
+    material_index = {material_id: i for i, material_id in enumerate(material_ids)}
+
+    rows = np.fromiter((k for k, _, _ in entries), dtype=np.int64, count=len(entries))
+    cols = np.fromiter((material_index[m] for _, m, _ in entries), dtype=np.int64, count=len(entries))
+    values = np.fromiter((float(s) for _, _, s in entries), dtype=np.float64, count=len(entries))
+    totals = np.bincount(rows, weights=values, minlength=len(key_index))
+    # A bill whose set points do not add up to anything cannot be released; it needs nothing
+    values = np.divide(values, totals[rows], out=np.zeros_like(values), where=totals[rows] > 0)
+    return rows, cols, values, key_index, material_ids
+
+
+def material_requirements(start, end, statuses=OPEN_STATUSES):
+    """Material needed by orders scheduled in ``[start, end]`` against stock on hand.
+
+    An order needs ``batch_size`` per batch: its released batch count, or
+    one batch while it is still planned.
+    """
+    batch_counts = (
+        db.session.query(Batch.order_id, func.count(Batch.batch_id).label("batches"))
+        .group_by(Batch.order_id)
+        .subquery()
+    )
+    orders = (
+        db.session.query(
+            ProductionOrder.recipe_id, ProductionOrder.recipe_version_id,
+            ProductionOrder.batch_size, batch_counts.c.batches,
+        )
+        .outerjoin(batch_counts, batch_counts.c.order_id == ProductionOrder.order_id)
+        .filter(
+            ProductionOrder.scheduled_date >= start,
+            ProductionOrder.scheduled_date <= end,
+            ProductionOrder.status.in_(statuses),
+        )
+        .all()
+    )
+    if not orders:
+        return {"orders": 0, "materials": [], "shortages": 0, "total_required_kg": 0.0, "total_shortage_kg": 0.0}
+
+    rows, cols, values, key_index, material_ids = recipe_matrix({(r, v) for r, v, _, _ in orders})
+
+    # Order quantities summed per bill of materials, then one sparse matrix-vector product
+    recipe_quantity = np.zeros(len(key_index))
+    np.add.at(
+        recipe_quantity,
+        [key_index[r, v] for r, v, _, _ in orders],
+        [float(batch_size) * (batches or 1) for _, _, batch_size, batches in orders],
+    )
+    required = np.bincount(cols, weights=values * recipe_quantity[rows], minlength=len(material_ids))
+
+    stock = {
+        m.material_id: m
+        for m in Material.query.filter(Material.material_id.in_(material_ids)).all()
+    }
+    on_hand = np.array([float(stock[m].current_quantity) if m in stock else 0.0 for m in material_ids])
+    minimum = np.array([float(stock[m].minimum_quantity) if m in stock else 0.0 for m in material_ids])
+    projected = on_hand - required
+    shortage = np.maximum(required - on_hand, 0.0)
+    to_minimum = np.maximum(minimum - projected, 0.0)
+    # Per-material units differ; kg figures make the totals comparable
+    to_kg = factors_to([stock[m].unit_of_measure if m in stock else "kg" for m in material_ids], "kg")
+    required_kg = required * to_kg
+    shortage_kg = shortage * to_kg
+
+    materials = [
+        {
+            "material_id": material_id,
+            "title": stock[material_id].title if material_id in stock else None,
+            "unit_of_measure": stock[material_id].unit_of_measure if material_id in stock else None,
+            "required": round(float(required[i]), 2),
+            "required_kg": round(float(required_kg[i]), 6),
+            "current_quantity": round(float(on_hand[i]), 2),
+            "minimum_quantity": round(float(minimum[i]), 2),
+            "projected_quantity": round(float(projected[i]), 2),
+            "shortage": round(float(shortage[i]), 2),
+            "shortage_kg": round(float(shortage_kg[i]), 6),
+            "below_minimum": bool(projected[i] < minimum[i]),
+            "reorder_quantity": round(float(to_minimum[i]), 2),
+        }
+        for i, material_id in enumerate(material_ids)
+    ]
+    materials.sort(key=lambda m: (-m["shortage"], -m["reorder_quantity"], m["material_id"]))
+    return {
+        "orders": len(orders),
+        "materials": materials,
+        "shortages": int(np.count_nonzero(shortage)),
+        "total_required_kg": round(float(required_kg.sum()), 6),
+        "total_shortage_kg": round(float(shortage_kg.sum()), 6),
+    }
+
+
+def requirements_window(args):
+    """``from``/``to`` query dates; defaults to the current Monday-to-Sunday week."""
+    today = date.today()
+    start = parse_date(args.get("from"), "from", today - timedelta(days=today.weekday()))
+    end = parse_date(args.get("to"), "to", start + timedelta(days=6))
+    if end < start:
+        raise InvalidQueryParam("'to' must not be before 'from'")
+    return start, end
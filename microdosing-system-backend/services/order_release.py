@@ -0,0 +1,96 @@
+# services/order_release.py
+
+from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
+
+from sqlalchemy import insert # type: ignore
+from extensions import db
+from models.production import Batch, BatchMaterialDispensing, ProductionOrder
+from services.recipe_versions import component_rows
+
+CENT = Decimal("0.01")
+
+
+class ReleaseError(ValueError):
+    """Raised when a production order cannot be released."""
+
+
+def scale_set_points(set_points, batch_size):
+    """Scale recipe set points so the components of one batch add up to ``batch_size``.
+
+    Set points are treated as proportions of the recipe; ``set_points`` is a
+    list of ``(material_id, set_point)``.
+    """
+    total = sum(set_point for _, set_point in set_points)
+    if total <= 0:
+        raise ReleaseError("Recipe set points must add up to more than zero")
+    factor = Decimal(batch_size) / total
+    return [
+        (material_id, (set_point * factor).quantize(CENT, rounding=ROUND_HALF_UP))
+        for material_id, set_point in set_points
+    ]
+
+
+def release_order(order_id, batch_count, operator_id=None):
+    """Expand a planned order into ``batch_count`` batches with planned dispensing lines.
+
+    Batches and lines are written with two multi-row INSERTs in the
+    caller's transaction, and the order moves to ``released``.
+    The caller owns the commit.
+    """
+    order = db.session.query(ProductionOrder).filter_by(order_id=order_id).with_for_update().first()
+    if order is None:
+        raise LookupError(f"Production order {order_id} not found")
+    if order.status != "planned":
+        raise ReleaseError(f"Only planned orders can be released (order is {order.status})")
+    if db.session.query(Batch.batch_id).filter_by(order_id=order_id).first() is not None:
+        raise ReleaseError(f"Production order {order_id} already has batches")
+    if not isinstance(batch_count, int) or batch_count <= 0:
+        raise ReleaseError("batch_count must be a positive integer")
+
+    set_points = [
+        (material_id, set_point)
+        for material_id, set_point, _ in component_rows(order.recipe_id, order.recipe_version_id)
+        if set_point is not None
+    ]
+    if not set_points:
+        raise ReleaseError(f"Recipe {order.recipe_id} has no materials with set points")
+    planned = scale_set_points(set_points, order.batch_size)
+
+    operator_id = operator_id or order.created_by
+    released_at = datetime.utcnow()  # same clock as the lifecycle timestamps
+    batch_numbers = [f"{order.order_number}-B{index:03d}" for index in range(1, batch_count + 1)]
+    db.session.execute(insert(Batch), [
+        {
+            "batch_number": number, "order_id": order_id, "operator_id": operator_id,
+            "status": "pending", "created_at": released_at,
+        }
+        for number in batch_numbers
+    ])
+
+    batch_ids = dict(
+        db.session.query(Batch.batch_number, Batch.batch_id).filter(Batch.order_id == order_id)
+    )
+    lines = [
+        {
+            "batch_id": batch_ids[number],
+            "material_id": material_id,
+            "planned_quantity": quantity,
+            "dispensed_by": operator_id,
+            "status": "pending",
+        }
+        for number in batch_numbers
+        for material_id, quantity in planned
+    ]
+    db.session.execute(insert(BatchMaterialDispensing), lines)
+
+    order.status = "released"
+    return {
+        "order_id": order_id,
+        "status": order.status,
+        "batches": [{"batch_id": batch_ids[number], "batch_number": number} for number in batch_numbers],
+        "planned_per_batch": [
+            {"material_id": material_id, "planned_quantity": str(quantity)} for material_id, quantity in planned
+        ],
+        "dispensing_lines": len(lines),
+    }
@@ -0,0 +1,58 @@
+# services/pagination.py
+
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+
+class InvalidQueryParam(ValueError):
+    """Raised when a list/query parameter cannot be parsed."""
+
+
+def encode_cursor(values):
+    """Encode the sort-key values of the last row of a page into an opaque token."""
+    payload = [
+        v.isoformat() if isinstance(v, (date, datetime)) else str(v) if isinstance(v, Decimal) else v
+        for v in values
+    ]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token):
+    """Decode a token produced by encode_cursor back into a list of values."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, TypeError):
+        raise InvalidQueryParam("Invalid cursor")
+    if not isinstance(values, list):
+        raise InvalidQueryParam("Invalid cursor")
+    return values
+
+
+def parse_datetime(value, name):
+    """Parse an ISO-8601 query parameter into a naive UTC datetime."""
+    if value is None or value == "":
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        raise InvalidQueryParam(f"'{name}' must be an ISO-8601 datetime")
+    if parsed.tzinfo is not None:
+        parsed = (parsed - parsed.utcoffset()).replace(tzinfo=None)
+    return parsed
+
+
+def parse_limit(value, default, maximum):
+    """Parse the ``limit`` query parameter, clamped to ``maximum``."""
+    if value is None or value == "":
+        return default
+    try:
+        limit = int(value)
+    except ValueError:
+        raise InvalidQueryParam("'limit' must be an integer")
+    if limit <= 0:
+        raise InvalidQueryParam("'limit' must be positive")
+    return min(limit, maximum)
@@ -0,0 +1,63 @@
+# services/password_pool.py
+
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from werkzeug.security import check_password_hash, generate_password_hash # type: ignore
+
+
+class LoginBusy(Exception):
+    """Raised when the login admission limit is reached or a hash times out."""
+
+
+class PasswordVerifier:
+    """Runs password hash checks on a bounded worker pool.
+
+    pbkdf2 releases the GIL, so ``LOGIN_HASH_WORKERS`` threads verify in
+    parallel while capping how much CPU a login storm can take. At most
+    ``LOGIN_MAX_PENDING`` checks may be queued or running; beyond that,
+    ``verify`` raises LoginBusy right away instead of tying up another
+    request worker that dosing traffic needs. A check that outlives
+    ``LOGIN_HASH_TIMEOUT`` also raises LoginBusy; it keeps its admission
+    slot until the worker actually finishes. ``hash`` runs registration
+    hashing through the same pool and limits.
+    """
+
+    def __init__(self):
+        self._executor = None
+        self._admission = None
+        self._timeout = None
+
+    def init_app(self, app):
+        self._executor = ThreadPoolExecutor(
+            max_workers=app.config["LOGIN_HASH_WORKERS"],
+            thread_name_prefix="login-hash",
+        )
+        self._admission = threading.BoundedSemaphore(app.config["LOGIN_MAX_PENDING"])
+        self._timeout = app.config["LOGIN_HASH_TIMEOUT"]
+
+    def verify(self, password_hash, password):
+        return self._run(check_password_hash, password_hash, password)
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, method="pbkdf2:sha256")
+
+    def _run(self, fn, *args, **kwargs):
+        if self._executor is None:
+            return fn(*args, **kwargs)
+
+        if not self._admission.acquire(blocking=False):
+            raise LoginBusy()
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except BaseException:
+            self._admission.release()
+            raise
+        future.add_done_callback(lambda _: self._admission.release())
+        try:
+            return future.result(timeout=self._timeout)
+        except FutureTimeout:
+            raise LoginBusy()
+
+
+password_verifier = PasswordVerifier()
@@ -0,0 +1,121 @@
+# services/recipe_components.py
+
+from decimal import Decimal, InvalidOperation
+
+from sqlalchemy.dialects.mysql import insert as mysql_insert # type: ignore
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert # type: ignore
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert # type: ignore
+from extensions import db
+from models.material import Material
+from models.recipe import Recipe, RecipeMaterial
+
+UPSERT_COLUMNS = ("set_point", "actual", "margin", "status")
+STATUSES = RecipeMaterial.__table__.c.status.type.enums
+
+
+class ComponentError(ValueError):
+    """Raised for a component list that cannot be applied."""
+
+
+def margin_pct(set_point, actual):
+    """Deviation of ``actual`` from ``set_point`` in percent, as stored in RecipeMaterial.margin."""
+    if not set_point:
+        return Decimal("0.00")
+    return ((Decimal(set_point) - Decimal(actual)) / Decimal(set_point) * 100).quantize(Decimal("0.01"))
+
+
+def _parse_component(index, raw):
+    if not isinstance(raw, dict):
+        raise ComponentError(f"Component {index}: must be an object")
+    material_id = raw.get("material_id")
+    if not isinstance(material_id, int):
+        raise ComponentError(f"Component {index}: material_id must be an integer")
+    try:
+        set_point = Decimal(str(raw["set_point"])).quantize(Decimal("0.01"))
+        actual = Decimal(str(raw.get("actual", 0))).quantize(Decimal("0.01"))
+    except (KeyError, InvalidOperation):
+        raise ComponentError(f"Component {index}: set_point and actual must be numeric")
+    status = raw.get("status", "pending")
+    if status not in STATUSES:
+        raise ComponentError(f"Component {index}: invalid status '{status}'")
+    return {
+        "material_id": material_id,
+        "set_point": set_point,
+        "actual": actual,
+        "margin": margin_pct(set_point, actual),
+        "status": status,
+    }
+
+
+def _upsert_statement():
+    """Multi-row insert that updates the component when (recipe_id, material_id) exists."""
+    table = RecipeMaterial.__table__
+    dialect = db.engine.dialect.name
+    if dialect in ("mysql", "mariadb"):
+        stmt = mysql_insert(table)
+        return stmt.on_duplicate_key_update({column: stmt.inserted[column] for column in UPSERT_COLUMNS})
+    insert = postgresql_insert if dialect == "postgresql" else sqlite_insert
+    stmt = insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=["recipe_id", "material_id"],
+        set_={column: stmt.excluded[column] for column in UPSERT_COLUMNS},
+    )
+
+
+def replace_components(recipe_id, raw_components, prune=True):
+    """Make the recipe's components exactly ``raw_components``.
+
+    The list is diffed against the stored rows: missing materials are
+    deleted in one statement, and new or changed ones are written with a
+    single multi-row upsert. Unchanged rows are not touched. With
+    ``prune=False`` the list is a partial edit and nothing is deleted.
+    The caller owns the commit.
+    """
+    if db.session.get(Recipe, recipe_id) is None:
+        raise LookupError(f"Recipe {recipe_id} not found")
+    if not isinstance(raw_components, list):
+        raise ComponentError("components must be a list")
+
+    components = [_parse_component(index, raw) for index, raw in enumerate(raw_components)]
+    submitted = {component["material_id"]: component for component in components}
+    if len(submitted) != len(components):
+        raise ComponentError("Each material may appear only once in a recipe")
+    if submitted:
+        known = {
+            material_id for (material_id,) in
+            db.session.query(Material.material_id).filter(Material.material_id.in_(submitted))
+        }
+        unknown = sorted(set(submitted) - known)
+        if unknown:
+            raise ComponentError(f"Unknown material_id(s): {unknown}")
+
+    stored = {
+        row.material_id: row
+        for row in db.session.query(
+            RecipeMaterial.material_id, *(getattr(RecipeMaterial, column) for column in UPSERT_COLUMNS)
+        ).filter(RecipeMaterial.recipe_id == recipe_id)
+    }
+
+    removed = sorted(set(stored) - set(submitted)) if prune else []
+    changed = [
+        {"recipe_id": recipe_id, **component}
+        for material_id, component in submitted.items()
+        if material_id not in stored
+        or any(getattr(stored[material_id], column) != component[column] for column in UPSERT_COLUMNS)
+    ]
+
+    if removed:
+        db.session.query(RecipeMaterial).filter(
+            RecipeMaterial.recipe_id == recipe_id, RecipeMaterial.material_id.in_(removed)
+        ).delete(synchronize_session=False)
+    if changed:
+        db.session.execute(_upsert_statement(), changed)
+
+    inserted = sum(1 for row in changed if row["material_id"] not in stored)
+    return {
+        "recipe_id": recipe_id,
+        "inserted": inserted,
+        "updated": len(changed) - inserted,
+        "deleted": len(removed),
+        "unchanged": len(submitted) - len(changed),
+    }
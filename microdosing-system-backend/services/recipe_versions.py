@@ -0,0 +1,238 @@
+# services/recipe_versions.py
+
+import hashlib
+from decimal import Decimal
+
+from sqlalchemy import insert # type: ignore
+from sqlalchemy.exc import IntegrityError # type: ignore
+from extensions import db
+from models.recipe import Recipe, RecipeComponent, RecipeMaterial, RecipeVersion, RecipeVersionComponent
+
+CENT = Decimal("0.01")
+
+
+class VersionError(ValueError):
+    """Raised for a recipe version operation that cannot be applied."""
+
+
+def _cents(value):
+    return None if value is None else Decimal(value).quantize(CENT)
+
+
+def component_digest(material_id, set_point, margin):
+    """Content key of an immutable component row; equal components share one row."""
+    key = f"{material_id}|{_cents(set_point)}|{_cents(margin)}"
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def _component_ids(components):
+    """Map each component's digest to a ``recipe_component`` id, inserting only unseen ones."""
+    by_digest = {}
+    for material_id, set_point, margin in components:
+        digest = component_digest(material_id, set_point, margin)
+        by_digest.setdefault(digest, {
+            "digest": digest, "material_id": material_id,
+            "set_point": _cents(set_point), "margin": _cents(margin),
+        })
+
+    def known():
+        return dict(
+            db.session.query(RecipeComponent.digest, RecipeComponent.component_id)
+            .filter(RecipeComponent.digest.in_(by_digest))
+        )
+
+    ids = known()
+    missing = [row for digest, row in by_digest.items() if digest not in ids]
+    if missing:
+        try:
+            with db.session.begin_nested():
+                db.session.execute(insert(RecipeComponent), missing)
+        except IntegrityError:
+            # Another release inserted some of them first; add the rest
+            ids = known()
+            missing = [row for digest, row in by_digest.items() if digest not in ids]
+            if missing:
+                db.session.execute(insert(RecipeComponent), missing)
+        ids = known()
+    return ids
+
+
+def find_version(recipe_id, version):
+    return RecipeVersion.query.filter_by(recipe_id=recipe_id, version=version).first()
+
+
+def release_version(recipe, created_by=None):
+    """Freeze the recipe's working components as ``recipe.version``.
+
+    Components identical to ones already stored (in this or any earlier
+    version) are linked rather than copied, so a version that changes one
+    set point adds one component row. Releasing a version that exists
+    returns it unchanged. The caller owns the commit.
+    """
+    existing = find_version(recipe.recipe_id, recipe.version)
+    if existing is not None:
+        return existing
+
+    working = [
+        (material_id, set_point, margin)
+        for material_id, set_point, margin in
+        db.session.query(RecipeMaterial.material_id, RecipeMaterial.set_point, RecipeMaterial.margin)
+        .filter(RecipeMaterial.recipe_id == recipe.recipe_id)
+        .order_by(RecipeMaterial.recipe_material_id)
+    ]
+    ids = _component_ids(working) if working else {}
+    component_ids = [ids[component_digest(*component)] for component in working]
+
+    parent = (
+        RecipeVersion.query.filter_by(recipe_id=recipe.recipe_id)
+        .order_by(RecipeVersion.recipe_version_id.desc())
+        .first()
+    )
+    released = RecipeVersion(
+        recipe_id=recipe.recipe_id,
+        version=recipe.version,
+        parent_version_id=parent.recipe_version_id if parent else None,
+        created_by=created_by or recipe.created_by,
+        digest=hashlib.sha256(",".join(map(str, component_ids)).encode()).hexdigest(),
+    )
+    db.session.add(released)
+    db.session.flush()
+    if component_ids:
+        db.session.execute(insert(RecipeVersionComponent), [
+            {"recipe_version_id": released.recipe_version_id, "component_id": component_id, "step": step}
+            for step, component_id in enumerate(component_ids, start=1)
+        ])
+    recipe.status = "Released"
+    return released
+
+
+def current_version(recipe_id):
+    """The snapshot of the recipe's released version, or None while it is unreleased."""
+    recipe = db.session.get(Recipe, recipe_id)
+    if recipe is None or recipe.status != "Released":
+        return None
+    return find_version(recipe_id, recipe.version)
+
+
+def version_components(recipe_version_id):
+    """``(material_id, set_point, margin, component_id)`` of a version in dosing order."""
+    return (
+        db.session.query(
+            RecipeComponent.material_id, RecipeComponent.set_point,
+            RecipeComponent.margin, RecipeComponent.component_id,
+        )
+        .join(RecipeVersionComponent, RecipeVersionComponent.component_id == RecipeComponent.component_id)
+        .filter(RecipeVersionComponent.recipe_version_id == recipe_version_id)
+        .order_by(RecipeVersionComponent.step)
+        .all()
+    )
+
+
+def component_rows(recipe_id, recipe_version_id=None, version=None):
+    """``(material_id, set_point, margin)`` of a pinned version, else the working rows."""
+    if recipe_version_id is None and version is not None:
+        snapshot = find_version(recipe_id, version)
+        recipe_version_id = snapshot.recipe_version_id if snapshot else None
+    if recipe_version_id is not None:
+        return [row[:3] for row in version_components(recipe_version_id)]
+    return (
+        db.session.query(RecipeMaterial.material_id, RecipeMaterial.set_point, RecipeMaterial.margin)
+        .filter(RecipeMaterial.recipe_id == recipe_id)
+        .order_by(RecipeMaterial.recipe_material_id)
+        .all()
+    )
+
+
+def component_sets(keys):
+    """Batched ``component_rows`` for many ``(recipe_id, recipe_version_id)`` keys.
+
+    Pinned versions come from their snapshots and unpinned recipes from
+    the working rows, two queries in all. Returns
+    ``{key: [(material_id, set_point, margin), ...]}`` in dosing order.
+    """
+    keys = set(keys)
+    pinned, working = {}, {}
+    version_ids = {version_id for _, version_id in keys if version_id is not None}
+    recipe_ids = {recipe_id for recipe_id, version_id in keys if version_id is None}
+    if version_ids:
+        rows = (
+            db.session.query(
+                RecipeVersionComponent.recipe_version_id, RecipeComponent.material_id,
+                RecipeComponent.set_point, RecipeComponent.margin,
+            )
+            .join(RecipeComponent, RecipeComponent.component_id == RecipeVersionComponent.component_id)
+            .filter(RecipeVersionComponent.recipe_version_id.in_(version_ids))
+            .order_by(RecipeVersionComponent.recipe_version_id, RecipeVersionComponent.step)
+        )
+        for version_id, material_id, set_point, margin in rows:
+            pinned.setdefault(version_id, []).append((material_id, set_point, margin))
+    if recipe_ids:
+        rows = (
+            db.session.query(
+                RecipeMaterial.recipe_id, RecipeMaterial.material_id, RecipeMaterial.set_point, RecipeMaterial.margin,
+            )
+            .filter(RecipeMaterial.recipe_id.in_(recipe_ids))
+            .order_by(RecipeMaterial.recipe_id, RecipeMaterial.recipe_material_id)
+        )
+        for recipe_id, material_id, set_point, margin in rows:
+            working.setdefault(recipe_id, []).append((material_id, set_point, margin))
+    return {
+        (recipe_id, version_id): pinned.get(version_id, []) if version_id is not None else working.get(recipe_id, [])
+        for recipe_id, version_id in keys
+    }
+
+
+def diff_versions(base, target):
+    """Component changes from ``base`` to ``target`` (both RecipeVersion).
+
+    Shared components have the same id, so the comparison is set
+    arithmetic on ids without looking at values.
+    """
+    before = {row.material_id: row for row in version_components(base.recipe_version_id)}
+    after = {row.material_id: row for row in version_components(target.recipe_version_id)}
+
+    def describe(row):
+        return {
+            "material_id": row.material_id,
+            "set_point": str(row.set_point) if row.set_point is not None else None,
+            "margin": str(row.margin) if row.margin is not None else None,
+        }
+
+    return {
+        "from": base.version,
+        "to": target.version,
+        "identical": base.digest == target.digest,
+        "added": [describe(after[m]) for m in sorted(after.keys() - before.keys())],
+        "removed": [describe(before[m]) for m in sorted(before.keys() - after.keys())],
+        "changed": [
+            {"material_id": m, "from": describe(before[m]), "to": describe(after[m])}
+            for m in sorted(before.keys() & after.keys())
+            if before[m].component_id != after[m].component_id
+        ],
+        "unchanged": sum(
+            1 for m in before.keys() & after.keys() if before[m].component_id == after[m].component_id
+        ),
+    }
+
+
+def serialize_version(snapshot, components=None):
+    data = {
+        "recipe_version_id": snapshot.recipe_version_id,
+        "recipe_id": snapshot.recipe_id,
+        "version": snapshot.version,
+        "parent_version_id": snapshot.parent_version_id,
+        "digest": snapshot.digest,
+        "created_by": snapshot.created_by,
+        "created_at": snapshot.created_at.isoformat() if snapshot.created_at else None,
+    }
+    if components is not None:
+        data["components"] = [
+            {
+                "step": step,
+                "material_id": row.material_id,
+                "set_point": str(row.set_point) if row.set_point is not None else None,
+                "margin": str(row.margin) if row.margin is not None else None,
+            }
+            for step, row in enumerate(components, start=1)
+        ]
+    return data
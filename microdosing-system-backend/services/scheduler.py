@@ -0,0 +1,185 @@
+# services/scheduler.py
+
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+
+from flask import current_app
+from sqlalchemy import update # type: ignore
+from extensions import db
+from models.material import Material
+from models.production import ProductionOrder
+from services.recipe_versions import component_sets
+
+# Orders in these states keep the station and slot they were given; planned
+# orders are sequenced after them
+LOCKED_STATUSES = ("released", "in_progress")
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def _settings():
+    config = current_app.config
+    stations = [s.strip() for s in str(config["SCHEDULER_STATIONS"]).split(",") if s.strip()]
+    return (
+        stations,
+        time.fromisoformat(config["SCHEDULER_DAY_START"]),
+        timedelta(minutes=config["SCHEDULER_ORDER_MINUTES"]),
+    )
+
+
+def _recipe_materials(keys):
+    """Material ids per ``(recipe_id, recipe_version_id)``, from the pinned version when there is one."""
+    return {
+        key: {material_id for material_id, _, _ in components}
+        for key, components in component_sets(keys).items()
+    }
+
+
+def _queue_state():
+    """Materials loaded right now, and each queued material's position in the dosing queue."""
+    rows = (
+        db.session.query(Material.material_id, Material.status)
+        .filter(Material.status.in_(("active", "inactive")))
+        .order_by(Material.dosing_sequence, Material.material_id)
+    )
+    loaded, rank = set(), {}
+    for material_id, status in rows:
+        if status == "active":
+            loaded.add(material_id)
+        else:
+            rank[material_id] = len(rank)
+    return loaded, rank
+
+
+def plan_day(orders, recipe_materials, stations, loaded, rank):
+    """Greedy changeover-minimising sequence for one day's orders.
+
+    ``orders`` are (order_id, bill, station_id, position, locked) tuples, where
+    ``bill`` is the ``(recipe_id, recipe_version_id)`` key of ``recipe_materials``.
+    Locked orders keep their station and position (one without a position
+    gets the station's next free slot). Every planned order is then placed,
+    one at a time, after them where it loads the fewest materials the
+    station does not already have. Ties go to the station with the earliest
+    free slot, then to the order whose materials come earliest in the
+    dosing queue. With no stations configured, planned orders stay
+    unassigned. Returns ``{order_id: (station_id, position)}``.
+    """
+    next_slot = defaultdict(int)
+    current = {station: set(loaded) for station in stations}
+    assignment = {}
+
+    locked = sorted(
+        (o for o in orders if o[4]),
+        key=lambda o: (o[2], o[3] is None, o[3] or 0, o[0]),
+    )
+    for order_id, bill, station, position, _ in locked:
+        if position is None:
+            position = next_slot[station]
+        assignment[order_id] = (station, position)
+        next_slot[station] = max(next_slot[station], position + 1)
+        if station in current:
+            current[station] = recipe_materials.get(bill, set())
+
+    if not stations:
+        return assignment
+    load = {station: next_slot[station] for station in stations}
+
+    pending = {o[0]: recipe_materials.get(o[1], set()) for o in orders if not o[4]}
+    first_in_queue = {
+        order_id: min((rank.get(m, len(rank)) for m in materials), default=len(rank))
+        for order_id, materials in pending.items()
+    }
+    while pending:
+        best = None
+        for order_id, materials in pending.items():
+            for station in stations:
+                key = (len(materials - current[station]), load[station], first_in_queue[order_id], order_id, station)
+                if best is None or key < best:
+                    best = key
+        _, _, _, order_id, station = best
+        assignment[order_id] = (station, load[station])
+        load[station] += 1
+        current[station] = pending.pop(order_id)
+    return assignment
+
+
+def reschedule(*days):
+    """Recompute the station schedule for the given scheduled dates.
+
+    Only the touched days are replanned, and only schedulable orders
+    (planned, or released / in progress on a station) whose slot changed
+    are written; completed and other orders keep their history. Locked
+    orders keep their start time. The caller owns the commit.
+    """
+    days = {_as_date(day) for day in days if day}
+    if not days:
+        return 0
+    stations, day_start, slot = _settings()
+    loaded, rank = _queue_state()
+    db.session.flush()
+
+    changes = []
+    for day in sorted(days):
+        rows = db.session.query(
+            ProductionOrder.order_id, ProductionOrder.recipe_id, ProductionOrder.recipe_version_id, ProductionOrder.status,
+            ProductionOrder.station_id, ProductionOrder.schedule_position, ProductionOrder.scheduled_start,
+        ).filter(ProductionOrder.scheduled_date == day).all()
+
+        schedulable = [
+            (r.order_id, (r.recipe_id, r.recipe_version_id), r.station_id, r.schedule_position, r.status in LOCKED_STATUSES)
+            for r in rows
+            if r.status == "planned" or (r.status in LOCKED_STATUSES and r.station_id is not None)
+        ]
+        recipe_materials = _recipe_materials({o[1] for o in schedulable})
+        assignment = plan_day(schedulable, recipe_materials, stations, loaded, rank)
+
+        opens_at = datetime.combine(day, day_start)
+        locked = {o[0]: o[4] for o in schedulable}
+        for r in rows:
+            if r.order_id not in locked:
+                continue
+            station, position = assignment.get(r.order_id, (None, None))
+            if locked[r.order_id] and r.scheduled_start is not None:
+                start = r.scheduled_start
+            else:
+                start = opens_at + slot * position if position is not None else None
+            if (r.station_id, r.schedule_position, r.scheduled_start) != (station, position, start):
+                changes.append({
+                    "order_id": r.order_id,
+                    "station_id": station,
+                    "schedule_position": position,
+                    "scheduled_start": start,
+                })
+
+    if changes:
+        db.session.execute(update(ProductionOrder), changes)
+    return len(changes)
+
+
+def schedule_for(day):
+    """Orders on ``day`` grouped by station, in slot order."""
+    orders = (
+        ProductionOrder.query
+        .filter(ProductionOrder.scheduled_date == _as_date(day), ProductionOrder.station_id.isnot(None))
+        .order_by(ProductionOrder.station_id, ProductionOrder.schedule_position)
+        .all()
+    )
+    stations, _, slot = _settings()
+    schedule = {station: [] for station in stations}
+    for order in orders:
+        schedule.setdefault(order.station_id, []).append({
+            "order_id": order.order_id,
+            "order_number": order.order_number,
+            "recipe_id": order.recipe_id,
+            "status": order.status,
+            "position": order.schedule_position,
+            "start": order.scheduled_start.isoformat() if order.scheduled_start else None,
+            "end": (order.scheduled_start + slot).isoformat() if order.scheduled_start else None,
+        })
+    return schedule
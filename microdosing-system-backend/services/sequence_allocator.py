@@ -0,0 +1,36 @@
+# services/sequence_allocator.py
+
+from sqlalchemy import insert, select, update # type: ignore
+from sqlalchemy.exc import IntegrityError # type: ignore
+from extensions import db
+from models.id_sequence import IdSequence
+
+
+def reserve_block(name, count):
+    """Reserve ``count`` consecutive values of sequence ``name`` and return them as a range.
+
+    Runs on its own connection and commits immediately, so the row lock is
+    held only for one UPDATE and a reserved block is never handed out twice,
+    even if the caller's transaction later rolls back (that just leaves a gap).
+    """
+    if count <= 0:
+        return range(0)
+
+    bump = (
+        update(IdSequence)
+        .where(IdSequence.name == name)
+        .values(next_value=IdSequence.next_value + count)
+    )
+    read = select(IdSequence.next_value).where(IdSequence.name == name)
+
+    for _ in range(2):
+        try:
+            with db.engine.begin() as conn:
+                if conn.execute(bump).rowcount == 0:
+                    conn.execute(insert(IdSequence).values(name=name, next_value=1 + count))
+                end = conn.execute(read).scalar_one()
+            return range(end - count, end)
+        except IntegrityError:
+            # Another worker created the sequence row first; retry with the UPDATE
+            continue
+    raise RuntimeError(f"Could not reserve values from sequence '{name}'")
@@ -0,0 +1,152 @@
+# services/stock_snapshots.py
+
+from decimal import Decimal
+
+from sqlalchemy import case, func, insert # type: ignore
+from extensions import db
+from models.material import Material, MaterialTransaction, MaterialStockSnapshot
+
+ZERO = Decimal("0")
+
+_additions = func.coalesce(func.sum(case(
+    (MaterialTransaction.transaction_type == "addition", MaterialTransaction.quantity), else_=0
+)), 0)
+_removals = func.coalesce(func.sum(case(
+    (MaterialTransaction.transaction_type == "removal", MaterialTransaction.quantity), else_=0
+)), 0)
+
+
+def _movement_totals(*criteria, join=None):
+    """{material_id: (additions, removals)} for transactions matching ``criteria``."""
+    query = db.session.query(MaterialTransaction.material_id, _additions, _removals)
+    if join is not None:
+        query = query.join(*join)
+    rows = query.filter(*criteria).group_by(MaterialTransaction.material_id).all()
+    return {material_id: (Decimal(add), Decimal(rem)) for material_id, add, rem in rows}
+
+
+def _latest_snapshots(as_of=None):
+    """Subquery with the newest snapshot per material (taken at or before ``as_of``)."""
+    newest = db.session.query(
+        MaterialStockSnapshot.material_id,
+        func.max(MaterialStockSnapshot.snapshot_id).label("snapshot_id"),
+    )
+    if as_of is not None:
+        newest = newest.filter(MaterialStockSnapshot.taken_at <= as_of)
+    newest = newest.group_by(MaterialStockSnapshot.material_id).subquery()
+    return (
+        db.session.query(MaterialStockSnapshot)
+        .join(newest, MaterialStockSnapshot.snapshot_id == newest.c.snapshot_id)
+        .subquery()
+    )
+
+
+def take_snapshots():
+    """Write one snapshot row per material, rolled forward from the previous one.
+
+    Only transactions after the previous snapshot's watermark are summed,
+    so the cost is proportional to the movements since the last run.
+    The caller owns the commit. Returns the number of rows written.
+
+    Must be the first statement of its transaction. The ledger updates a
+    material's row before it inserts that movement, so locking every
+    material row first (in the ledger's material_id order) waits out
+    in-flight movements and holds off new ones. No transaction id below
+    the watermark can commit after it is read.
+    """
+    db.session.query(Material.material_id).order_by(Material.material_id).with_for_update().all()
+
+    # Same clock as material_transaction.transaction_date (server CURRENT_TIMESTAMP)
+    taken_at = db.session.query(func.current_timestamp()).scalar()
+    watermark = db.session.query(func.coalesce(func.max(MaterialTransaction.transaction_id), 0)).scalar()
+
+    previous = _latest_snapshots()
+    prev_rows = {
+        row.material_id: row
+        for row in db.session.query(previous).all()
+    }
+    since_previous = _movement_totals(
+        MaterialTransaction.transaction_id > previous.c.last_transaction_id,
+        MaterialTransaction.transaction_id <= watermark,
+        join=(previous, previous.c.material_id == MaterialTransaction.material_id),
+    )
+    never_snapshotted = [m for (m,) in db.session.query(Material.material_id) if m not in prev_rows]
+    full_history = _movement_totals(
+        MaterialTransaction.material_id.in_(never_snapshotted),
+        MaterialTransaction.transaction_id <= watermark,
+    ) if never_snapshotted else {}
+
+    rows = []
+    for material_id, current_quantity in db.session.query(Material.material_id, Material.current_quantity):
+        prev = prev_rows.get(material_id)
+        if prev is not None:
+            add, rem = since_previous.get(material_id, (ZERO, ZERO))
+            add, rem = prev.total_additions + add, prev.total_removals + rem
+        else:
+            add, rem = full_history.get(material_id, (ZERO, ZERO))
+        rows.append({
+            "material_id": material_id,
+            "taken_at": taken_at,
+            "last_transaction_id": watermark,
+            "quantity": current_quantity,
+            "total_additions": add,
+            "total_removals": rem,
+        })
+
+    if rows:
+        db.session.execute(insert(MaterialStockSnapshot), rows)
+    return len(rows)
+
+
+def stock_as_of(as_of=None):
+    """Per-material stock at ``as_of`` (default: now).
+
+    Materials with a snapshot at or before ``as_of`` roll forward from it
+    over later transactions dated up to ``as_of``. Materials without one
+    roll back from their live quantity over transactions dated after
+    ``as_of``.
+    """
+    materials = db.session.query(Material.material_id, Material.title, Material.current_quantity).all()
+    if as_of is None:
+        as_of = db.session.query(func.current_timestamp()).scalar()
+
+    base = _latest_snapshots(as_of)
+    snapshots = {row.material_id: row for row in db.session.query(base).all()}
+    forward = _movement_totals(
+        MaterialTransaction.transaction_id > base.c.last_transaction_id,
+        MaterialTransaction.transaction_date <= as_of,
+        join=(base, base.c.material_id == MaterialTransaction.material_id),
+    )
+
+    unsnapshotted = [m for m, _, _ in materials if m not in snapshots]
+    backward = _movement_totals(
+        MaterialTransaction.material_id.in_(unsnapshotted),
+        MaterialTransaction.transaction_date > as_of,
+    ) if unsnapshotted else {}
+    history = _movement_totals(
+        MaterialTransaction.material_id.in_(unsnapshotted),
+        MaterialTransaction.transaction_date <= as_of,
+    ) if unsnapshotted else {}
+
+    result = []
+    for material_id, title, current_quantity in materials:
+        snapshot = snapshots.get(material_id)
+        if snapshot is not None:
+            add, rem = forward.get(material_id, (ZERO, ZERO))
+            quantity = snapshot.quantity + add - rem
+            total_add, total_rem = snapshot.total_additions + add, snapshot.total_removals + rem
+            snapshot_id = snapshot.snapshot_id
+        else:
+            later_add, later_rem = backward.get(material_id, (ZERO, ZERO))
+            quantity = current_quantity - later_add + later_rem
+            total_add, total_rem = history.get(material_id, (ZERO, ZERO))
+            snapshot_id = None
+        result.append({
+            "material_id": material_id,
+            "title": title,
+            "quantity": str(quantity),
+            "total_additions": str(total_add),
+            "total_removals": str(total_rem),
+            "snapshot_id": snapshot_id,
+        })
+    return result
@@ -0,0 +1,104 @@
+# services/units.py
+
+from decimal import Decimal, localcontext
+from itertools import product
+
+import numpy as np
+
+# Mass units, defined exactly in grams (1 lb = 453.59237 g by definition)
+GRAMS_PER_UNIT = {
+    "kg": Decimal("1000"),
+    "g": Decimal("1"),
+    "mg": Decimal("0.001"),
+    "lb": Decimal("453.59237"),
+}
+UNITS = tuple(GRAMS_PER_UNIT)
+
+# Material.unit_of_measure labels; RecipeMaterial.set_point and dispensing
+# quantities are in the unit of their material
+MATERIAL_UNITS = {
+    "Kilogram (kg)": "kg",
+    "Gram (g)": "g",
+    "Milligram (mg)": "mg",
+}
+# WeightEntry.unit codes
+WEIGHT_ENTRY_UNITS = {0: "kg", 1: "lb"}
+
+_ALIASES = {
+    **{unit: unit for unit in UNITS},
+    **MATERIAL_UNITS,
+    **WEIGHT_ENTRY_UNITS,
+    "lbs": "lb",
+    "kilogram": "kg",
+    "gram": "g",
+    "milligram": "mg",
+    "pound": "lb",
+}
+
+# Every pair computed once. Ratios that do not terminate (anything into lb)
+# are rounded to 34 significant digits, far below any stored precision.
+with localcontext() as _ctx:
+    _ctx.prec = 34
+    FACTORS = {
+        (source, target): (GRAMS_PER_UNIT[source] / GRAMS_PER_UNIT[target]).normalize()
+        for source, target in product(UNITS, UNITS)
+    }
+
+_INDEX = {unit: i for i, unit in enumerate(UNITS)}
+_FACTOR_MATRIX = np.array([[float(FACTORS[s, t]) for t in UNITS] for s in UNITS])
+_ALIAS_INDEX = {alias: _INDEX[unit] for alias, unit in _ALIASES.items()}
+
+
+class UnitError(ValueError):
+    """Raised for a unit the engine does not know."""
+
+
+def unit_code(unit):
+    """Canonical code ("kg", "g", "mg", "lb") for a code, material label or WeightEntry.unit."""
+    try:
+        code = _ALIASES.get(unit)
+        if code is None and isinstance(unit, str):
+            code = _ALIASES.get(unit.strip().lower())
+    except TypeError:  # unhashable
+        code = None
+    if code is None:
+        raise UnitError(f"Unknown unit '{unit}'")
+    return code
+
+
+def factor(source, target):
+    """Exact Decimal multiplier from ``source`` to ``target``."""
+    return FACTORS[unit_code(source), unit_code(target)]
+
+
+def convert(value, source, target):
+    """Convert a single quantity with Decimal arithmetic; None stays None."""
+    if value is None:
+        return None
+    return Decimal(value) * factor(source, target)
+
+
+def factors_to(units, target):
+    """Float multipliers taking each entry of ``units`` to ``target``, as an array.
+
+    Units are read like ``unit_code`` reads them (case and surrounding space
+    do not matter). Known spellings cost one dict lookup; any other spelling
+    goes through ``unit_code`` once per call. The conversion itself is a
+    single gather from the precomputed factor matrix.
+    """
+    column = _INDEX[unit_code(target)]
+    index = dict(_ALIAS_INDEX)
+
+    def row(unit):
+        position = index.get(unit)
+        if position is None:
+            position = index[unit] = _INDEX[unit_code(unit)]
+        return position
+
+    rows = np.fromiter((row(unit) for unit in units), dtype=np.intp)
+    return _FACTOR_MATRIX[rows, column]
+
+
+def convert_array(values, units, target):
+    """Vectorized ``convert``: ``values`` (NaN allowed) times their per-row factor to ``target``."""
+    return np.asarray(values, dtype=float) * factors_to(units, target)
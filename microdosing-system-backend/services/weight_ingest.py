@@ -0,0 +1,126 @@
+# services/weight_ingest.py
+
+import json
+from datetime import datetime
+
+from sqlalchemy import insert # type: ignore
+from extensions import db
+from models.weight import WeightEntry
+from services.units import WEIGHT_ENTRY_UNITS
+
+REQUIRED_FIELDS = (
+    "current_weight",
+    "tare_weight",
+    "gross_weight",
+    "unit",
+    "status",
+    "filter_level",
+    "digital_output_status",
+)
+
+
+class ReadingError(ValueError):
+    """Raised when a single scale reading cannot be accepted."""
+
+
+def parse_reading(raw):
+    """Validate one raw reading and return the column dict for WeightEntry."""
+    if not isinstance(raw, dict):
+        raise ReadingError("Reading must be a JSON object")
+
+    missing = [field for field in REQUIRED_FIELDS if raw.get(field) is None]
+    if missing:
+        raise ReadingError(f"Missing fields: {', '.join(missing)}")
+
+    try:
+        row = {
+            "current_weight": float(raw["current_weight"]),
+            "tare_weight": float(raw["tare_weight"]),
+            "gross_weight": float(raw["gross_weight"]),
+            "unit": int(raw["unit"]),
+            "status": int(raw["status"]),
+            "filter_level": int(raw["filter_level"]),
+            "digital_output_status": str(raw["digital_output_status"]),
+        }
+    except (TypeError, ValueError) as e:
+        raise ReadingError(f"Invalid value: {e}")
+
+    if row["unit"] not in WEIGHT_ENTRY_UNITS:
+        raise ReadingError("unit must be 0 (kg) or 1 (lb)")
+    if row["status"] not in (0, 1):
+        raise ReadingError("status must be 0 (stable) or 1 (unstable)")
+    if len(row["digital_output_status"]) > 10:
+        raise ReadingError("digital_output_status must be at most 10 characters")
+
+    station_id = raw.get("station_id")
+    if station_id is not None:
+        station_id = str(station_id)
+        if len(station_id) > 50:
+            raise ReadingError("station_id must be at most 50 characters")
+    row["station_id"] = station_id
+
+    # Scale terminals may send their own sample time; otherwise stamp it here.
+    timestamp = raw.get("timestamp")
+    if timestamp:
+        try:
+            sampled_at = datetime.fromisoformat(str(timestamp).replace("Z", "+00:00"))
+        except ValueError:
+            raise ReadingError("timestamp must be an ISO-8601 string")
+        if sampled_at.tzinfo is not None:
+            sampled_at = (sampled_at - sampled_at.utcoffset()).replace(tzinfo=None)
+        row["timestamp"] = sampled_at
+    else:
+        row["timestamp"] = datetime.utcnow()
+
+    return row
+
+
+def iter_ndjson(lines):
+    """Yield decoded objects from an NDJSON byte/str stream, one per non-empty line.
+
+    Lines that are not valid JSON are yielded as ReadingError instances so the
+    caller can report them with the right index instead of aborting the stream.
+    """
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8", errors="replace")
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            yield ReadingError(f"Invalid JSON: {e}")
+
+
+def ingest_readings(readings, chunk_size=1000):
+    """Insert an iterable of raw readings in one transaction.
+
+    Valid rows are written with multi-row INSERT statements of up to
+    ``chunk_size`` rows each; invalid rows are skipped and reported.
+    Returns ``(accepted_rows, rejects)`` where ``rejects`` is a list of
+    ``{"index": i, "error": msg}``. The caller owns the commit.
+    """
+    accepted = []
+    rejects = []
+    pending = []
+
+    for index, raw in enumerate(readings):
+        try:
+            if isinstance(raw, ReadingError):
+                raise raw
+            pending.append(parse_reading(raw))
+        except ReadingError as e:
+            rejects.append({"index": index, "error": str(e)})
+            continue
+
+        if len(pending) >= chunk_size:
+            db.session.execute(insert(WeightEntry), pending)
+            accepted.extend(pending)
+            pending = []
+
+    if pending:
+        db.session.execute(insert(WeightEntry), pending)
+        accepted.extend(pending)
+
+    return accepted, rejects
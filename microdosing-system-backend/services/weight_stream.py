@@ -0,0 +1,113 @@
+# services/weight_stream.py
+
+import logging
+import threading
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+NAMESPACE = "/weights"
+STATUS_LABELS = {0: "stable", 1: "unstable"}
+
+
+def station_room(station_id):
+    return f"station:{station_id or 'default'}"
+
+
+def reading_payload(row):
+    """Convert an accepted WeightEntry row (dict or model) into a socket payload.
+
+    Bulk-ingested rows are inserted without fetching their keys, so ``id``
+    is only included when the row has one.
+    """
+    get = row.get if isinstance(row, dict) else lambda key: getattr(row, key, None)
+    timestamp = get("timestamp")
+    payload = {
+        "id": get("id"),
+        "station_id": get("station_id"),
+        "timestamp": timestamp.isoformat() if isinstance(timestamp, datetime) else timestamp,
+        "current_weight": get("current_weight"),
+        "tare_weight": get("tare_weight"),
+        "gross_weight": get("gross_weight"),
+        "unit": get("unit"),
+        "status": get("status"),
+        "filter_level": get("filter_level"),
+        "digital_output_status": get("digital_output_status"),
+    }
+    if payload["id"] is None:
+        del payload["id"]
+    return payload
+
+
+class WeightBroadcaster:
+    """Coalesces accepted readings per station and pushes them on a fixed tick.
+
+    ``publish`` only touches in-memory dicts under a lock, so ingestion never
+    waits on socket I/O. Readings are coalesced to the latest one per station
+    per tick; stable/unstable transitions are queued and always delivered.
+    Until the first client connects and starts the push task nothing would
+    drain the queues, so readings only update the last known status then.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latest = {}
+        self._transitions = []
+        self._last_status = {}
+        self._socketio = None
+        self._interval = 0.2
+        self._started = False
+
+    def init_app(self, app, socketio):
+        self._socketio = socketio
+        self._interval = app.config["WEIGHT_PUSH_INTERVAL"]
+
+    def publish(self, rows):
+        if self._socketio is None:
+            return
+        with self._lock:
+            for row in rows:
+                payload = reading_payload(row)
+                station_id = payload["station_id"]
+                status = payload["status"]
+                previous = self._last_status.get(station_id)
+                self._last_status[station_id] = status
+                if not self._started:
+                    continue
+
+                self._latest[station_id] = payload
+                if previous is not None and previous != status:
+                    self._transitions.append({
+                        "station_id": station_id,
+                        "status": STATUS_LABELS.get(status, status),
+                        "previous": STATUS_LABELS.get(previous, previous),
+                        "timestamp": payload["timestamp"],
+                    })
+
+    def ensure_started(self):
+        with self._lock:
+            if self._started or self._socketio is None:
+                return
+            self._started = True
+        self._socketio.start_background_task(self._run)
+
+    def _drain(self):
+        with self._lock:
+            latest, self._latest = self._latest, {}
+            transitions, self._transitions = self._transitions, []
+        return latest, transitions
+
+    def _run(self):
+        while True:
+            self._socketio.sleep(self._interval)
+            try:
+                latest, transitions = self._drain()
+                for event in transitions:
+                    self._socketio.emit("status", event, to=station_room(event["station_id"]), namespace=NAMESPACE)
+                for station_id, payload in latest.items():
+                    self._socketio.emit("weight", payload, to=station_room(station_id), namespace=NAMESPACE)
+            except Exception as e:
+                logger.error(f"Weight broadcast failed: {e}")
+
+
+weight_broadcaster = WeightBroadcaster()
@@ -0,0 +1,50 @@
+import os
+import sys
+from datetime import date
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """App on a throwaway SQLite database: one user, recipe 1 (Salt 60 / Sugar 40) and order PO-1."""
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'test.db'}")
+    monkeypatch.setenv("BARCODE_CACHE_DIR", str(tmp_path / "barcode_cache"))
+    from app import create_app
+    from extensions import db
+    from models.user import User
+    from models.material import Material
+    from models.recipe import Recipe, RecipeMaterial
+    from models.production import ProductionOrder
+
+    app = create_app()
+    app.config["TESTING"] = True
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(username="op", full_name="Operator", email="op@example.com", password_hash="x", role="operator"))
+        db.session.add(Recipe(name="Premix", code="PMX", version="1", created_by=1))
+        for title in ("Salt", "Sugar"):
+            db.session.add(Material(
+                title=title, unit_of_measure="Gram (g)", current_quantity=1000,
+                minimum_quantity=0, maximum_quantity=5000, status="inactive",
+            ))
+        db.session.commit()
+        db.session.add(RecipeMaterial(recipe_id=1, material_id=1, set_point=60, actual=60))
+        db.session.add(RecipeMaterial(recipe_id=1, material_id=2, set_point=40, actual=40))
+        db.session.add(ProductionOrder(
+            order_number="PO-1", recipe_id=1, batch_size=100, scheduled_date=date(2026, 1, 5), created_by=1,
+        ))
+        db.session.commit()
+    yield app
+    from services.dosing_plan import dosing_plans
+    dosing_plans.discard(1)  # compiled plans are cached per process
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
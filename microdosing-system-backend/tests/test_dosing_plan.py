@@ -0,0 +1,40 @@
+def _save_components(client, sugar_actual):
+    response = client.put("/api/recipes/1/materials", json={"components": [
+        {"material_id": 1, "set_point": 60, "actual": 60},
+        {"material_id": 2, "set_point": 40, "actual": sugar_actual},
+    ]})
+    assert response.status_code == 200
+
+
+def _release(client, version):
+    assert client.post("/api/recipes/1/versions", json={"version": version}).status_code == 201
+
+
+def test_plan_uses_margin_or_default_tolerance(client):
+    assert client.get("/api/recipes/1/dosing-plan").status_code == 409
+    _save_components(client, 38)
+    _release(client, "1")
+
+    plan = client.get("/api/recipes/1/dosing-plan").json
+    assert (plan["version"], plan["unit"], plan["total_kg"]) == ("1", "kg", "0.1")
+    salt, sugar = plan["components"]
+    # Salt has no margin, so the default 2% band applies; Sugar's margin is 5%
+    assert (salt["step"], salt["tolerance_pct"], salt["min_quantity"], salt["max_quantity"]) == (1, "2.00", "58.80", "61.20")
+    assert (sugar["step"], sugar["tolerance_pct"], sugar["min_quantity"], sugar["max_quantity"]) == (2, "5.00", "38.00", "42.00")
+    assert (sugar["set_point_kg"], sugar["max_quantity_kg"]) == ("0.04", "0.042")
+
+
+def test_released_plan_never_changes(client):
+    _save_components(client, 40)
+    _release(client, "1")
+    pinned = client.get("/api/recipes/1/dosing-plan/1")
+    assert pinned.headers["Cache-Control"] == "public, max-age=31536000, immutable"
+    assert client.get("/api/recipes/1/dosing-plan/1", headers={"If-None-Match": pinned.headers["ETag"]}).status_code == 304
+
+    _save_components(client, 39)
+    _release(client, "2")
+    assert client.get("/api/recipes/1/dosing-plan/1").data == pinned.data
+    latest = client.get("/api/recipes/1/dosing-plan")
+    assert (latest.json["version"], latest.headers["Cache-Control"]) == ("2", "no-cache")
+    assert latest.json["components"][1]["tolerance_pct"] == "2.50"
+    assert client.get("/api/recipes/1/dosing-plan/9").status_code == 404
@@ -0,0 +1,32 @@
+def _add_queued(app, *titles):
+    from extensions import db
+    from models.material import Material
+
+    with app.app_context():
+        for title in titles:
+            material = Material(title=title, unit_of_measure="Gram (g)", current_quantity=10,
+                                minimum_quantity=0, maximum_quantity=100, status="inactive")
+            db.session.add(material)
+            db.session.flush()
+            material.dosing_sequence = material.material_id
+        db.session.commit()
+
+
+def _queue(client):
+    return [m["material_id"] for m in client.get("/api/materials/queue").json]
+
+
+def test_partial_reorder_keeps_the_rest_of_the_queue_behind_it(app, client):
+    _add_queued(app, "Pepper", "Starch")
+    assert client.put("/api/materials/queue", json=[4, 2]).status_code == 200
+    assert _queue(client) == [4, 2, 1, 3]
+    assert [m["dosing_sequence"] for m in client.get("/api/materials/queue").json] == [1, 2, 3, 4]
+
+    assert client.put("/api/materials/queue", json=[3]).status_code == 200
+    assert _queue(client) == [3, 4, 2, 1]
+
+
+def test_reorder_rejects_unknown_and_repeated_ids(client):
+    assert client.put("/api/materials/queue", json=[1, 1]).status_code == 400
+    assert client.put("/api/materials/queue", json=[1, 99]).status_code == 404
+    assert client.put("/api/materials/queue", json={"ids": [1]}).status_code == 400
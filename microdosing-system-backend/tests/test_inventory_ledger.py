@@ -0,0 +1,54 @@
+from decimal import Decimal
+
+
+def _movement(material_id, transaction_type, quantity):
+    return {"material_id": material_id, "transaction_type": transaction_type, "quantity": quantity}
+
+
+def _stock(app):
+    from extensions import db
+    from models.material import Material, MaterialTransaction
+
+    with app.app_context():
+        db.session.expire_all()
+        quantities = {m.material_id: (m.current_quantity, m.margin) for m in Material.query.all()}
+        return quantities, MaterialTransaction.query.count()
+
+
+def test_batch_nets_movements_per_material(app, client):
+    response = client.post("/api/material-transactions/batch", json=[
+        _movement(1, "removal", "1000"),
+        _movement(1, "addition", "250.5"),
+        _movement(2, "addition", "4000"),
+    ])
+    assert response.status_code == 201
+
+    # Salt passes through zero within the batch, which is fine once netted
+    quantities, transactions = _stock(app)
+    assert quantities == {1: (Decimal("250.50"), Decimal("94.99")), 2: (Decimal("5000.00"), Decimal("0.00"))}
+    assert transactions == 3
+
+
+def test_insufficient_stock_rolls_back_the_whole_batch(app, client):
+    before = _stock(app)
+    response = client.post("/api/material-transactions/batch", json=[
+        _movement(1, "addition", "5"),
+        _movement(2, "removal", "1000.01"),
+    ])
+    assert response.status_code == 400
+    assert response.json["error"] == "Insufficient stock for material 2"
+    assert _stock(app) == before
+
+
+def test_invalid_movements_are_rejected(app, client):
+    before = _stock(app)
+    response = client.post("/api/material-transactions", json=_movement(99, "addition", "1"))
+    assert (response.status_code, response.json["error"]) == (400, "Material 99 not found")
+
+    response = client.post("/api/material-transactions/batch", json=[
+        _movement(1, "addition", "1"),
+        _movement(1, "addition", "-1"),
+    ])
+    assert (response.status_code, response.json["error"]) == (400, "Transaction 1: quantity must be a positive number")
+    assert client.post("/api/material-transactions/batch", json=[]).status_code == 400
+    assert _stock(app) == before
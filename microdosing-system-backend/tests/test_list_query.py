@@ -0,0 +1,54 @@
+from sqlalchemy import event
+
+
+def _add_materials(app, count):
+    from extensions import db
+    from models.material import Material
+
+    with app.app_context():
+        db.session.add_all([
+            Material(title=f"M{i:03d}", unit_of_measure="Gram (g)", current_quantity=1,
+                     minimum_quantity=0, maximum_quantity=10)
+            for i in range(count)
+        ])
+        db.session.commit()
+
+
+def test_lists_are_paged_by_default(app, client):
+    _add_materials(app, 150)
+    first = client.get("/api/materials")
+    assert len(first.json) == 100
+    second = client.get("/api/materials", query_string={"cursor": first.headers["X-Next-Cursor"]})
+    assert len(second.json) == 52
+    assert "X-Next-Cursor" not in second.headers
+    assert {m["material_id"] for m in first.json}.isdisjoint(m["material_id"] for m in second.json)
+
+
+def test_fields_are_selected_in_sql(app, client):
+    from extensions import db
+
+    statements = []
+    with app.app_context():
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(db.engine, "before_cursor_execute", listener)
+        try:
+            response = client.get("/api/production_orders?fields=order_number&limit=5")
+        finally:
+            event.remove(db.engine, "before_cursor_execute", listener)
+
+    assert response.json == [{"order_number": "PO-1"}]
+    select = next(s for s in statements if s.startswith("SELECT") and "FROM production_order" in s)
+    assert "order_number" in select and "batch_size" not in select
+
+
+def test_projected_rows_do_not_touch_the_session(app, client):
+    from extensions import db
+    from models.production import ProductionOrder
+
+    with app.test_request_context("/api/production_orders?fields=order_number"):
+        from services.list_query import list_page
+
+        rows, _ = list_page(ProductionOrder.query, ProductionOrder)
+        assert rows[0].batch_size is None
+        order = db.session.get(ProductionOrder, 1)
+        assert order.batch_size == 100
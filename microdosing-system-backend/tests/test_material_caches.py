@@ -0,0 +1,35 @@
+from extensions import db
+from models.material import Material
+from services.cache_versions import read_version
+from services.active_material_cache import CACHE_NAME
+
+
+def _movement(material_id, quantity="5"):
+    return {"material_id": material_id, "transaction_type": "addition", "quantity": quantity}
+
+
+def test_moving_an_inactive_material_leaves_the_cache_version_alone(app, client):
+    with app.app_context():
+        db.session.get(Material, 1).status = "active"
+        db.session.commit()
+        before = read_version(CACHE_NAME)
+
+    assert client.post("/api/material-transactions", json=_movement(2)).status_code == 201
+    assert client.post("/api/material-transactions/batch", json=[_movement(2), _movement(2)]).status_code == 201
+    with app.app_context():
+        assert read_version(CACHE_NAME) == before
+
+
+def test_moving_the_active_material_refreshes_its_cached_stock(app, client):
+    with app.app_context():
+        material = db.session.get(Material, 1)
+        material.status, material.margin = "active", 80
+        db.session.commit()
+    app.config["ACTIVE_MATERIAL_VERSION_CHECK_INTERVAL"] = 0
+    from services.active_material_cache import active_material_cache
+    active_material_cache.init_app(app)
+
+    active = client.get("/api/active-material").json
+    assert (active["current_quantity"], active["margin"]) == ("1000.00", "80.00")
+    assert client.post("/api/material-transactions/batch", json=[_movement(2), _movement(1, "7")]).status_code == 201
+    assert client.get("/api/active-material").json["current_quantity"] == "1007.00"
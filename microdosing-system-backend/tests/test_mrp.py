@@ -0,0 +1,38 @@
+from datetime import date
+
+
+def _add_order(app, number, batch_size, scheduled_date, status="planned"):
+    from extensions import db
+    from models.production import ProductionOrder
+
+    with app.app_context():
+        db.session.add(ProductionOrder(
+            order_number=number, recipe_id=1, batch_size=batch_size,
+            scheduled_date=scheduled_date, status=status, created_by=1,
+        ))
+        db.session.commit()
+
+
+def test_requirements_total_open_orders_in_the_window(app, client):
+    assert client.post("/api/production_orders/1/release", json={"batch_count": 2}).status_code == 201
+    _add_order(app, "PO-2", 2300, date(2026, 1, 9))
+    _add_order(app, "PO-3", 5000, date(2026, 1, 9), status="completed")
+    _add_order(app, "PO-4", 5000, date(2026, 1, 12))
+
+    result = client.get("/api/production_orders/requirements?from=2026-01-05&to=2026-01-11").json
+    # PO-1 needs two released batches of 100, PO-2 one planned batch of 2300
+    assert result["orders"] == 2
+    assert [(m["material_id"], m["required"], m["shortage"]) for m in result["materials"]] == [
+        (1, 1500.0, 500.0),
+        (2, 1000.0, 0.0),
+    ]
+    assert result["materials"][0]["projected_quantity"] == -500.0
+    assert result["shortages"] == 1
+    assert (result["total_required_kg"], result["total_shortage_kg"]) == (2.5, 0.5)
+
+
+def test_requirements_filter_by_status_and_window(client):
+    assert client.get("/api/production_orders/requirements?from=2026-01-06&to=2026-01-11").json["orders"] == 0
+    result = client.get("/api/production_orders/requirements?from=2026-01-05&to=2026-01-05&status=released").json
+    assert result == {"from": "2026-01-05", "to": "2026-01-05", "orders": 0, "materials": [], "shortages": 0, "total_required_kg": 0.0, "total_shortage_kg": 0.0}
+    assert client.get("/api/production_orders/requirements?from=2026-01-05&to=2026-01-04").status_code == 400
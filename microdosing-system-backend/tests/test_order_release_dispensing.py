@@ -0,0 +1,58 @@
+def test_dispensing_fills_released_lines(client):
+    response = client.post("/api/production_orders/1/release", json={"batch_count": 1})
+    assert response.status_code == 201
+    batch_id = response.json["batches"][0]["batch_id"]
+
+    response = client.post(f"/api/batches/{batch_id}/dispensing", json={
+        "dispensed_by": 1,
+        "lines": [
+            {"material_id": 1, "actual_quantity": "60.5"},
+            {"material_id": 2, "actual_quantity": "40"},
+        ],
+    })
+    assert response.status_code == 201
+
+    lines = client.get(f"/api/batch_dispensing?batch_id={batch_id}").json
+    assert sorted(line["material_id"] for line in lines) == [1, 2]
+    assert {line["material_id"]: line["actual_quantity"] for line in lines} == {1: "60.50", 2: "40.00"}
+
+
+def test_out_of_tolerance_line_is_redosed(client):
+    batch_id = client.post("/api/production_orders/1/release", json={"batch_count": 1}).json["batches"][0]["batch_id"]
+
+    # Recipe margins are 0, so the default tolerance (2%) applies
+    response = client.post(f"/api/batches/{batch_id}/dispensing", json={
+        "dispensed_by": 1,
+        "lines": [{"material_id": 1, "actual_quantity": "60.5"}, {"material_id": 2, "actual_quantity": "44"}],
+    })
+    assert response.json["batch_status"] == "in_progress"
+    assert [line["status"] for line in response.json["lines"]] == ["verified", "dispensed"]
+
+    response = client.post(f"/api/batches/{batch_id}/dispensing", json={
+        "dispensed_by": 1,
+        "lines": [{"material_id": 2, "actual_quantity": "40.2"}],
+    })
+    assert response.json["batch_status"] == "completed"
+    assert len(client.get(f"/api/batch_dispensing?batch_id={batch_id}").json) == 2
+
+
+def test_repeated_material_is_rejected(client):
+    batch_id = client.post("/api/production_orders/1/release", json={"batch_count": 1}).json["batches"][0]["batch_id"]
+    response = client.post(f"/api/batches/{batch_id}/dispensing", json={
+        "dispensed_by": 1,
+        "lines": [{"material_id": 1, "actual_quantity": "30"}, {"material_id": 1, "actual_quantity": "30"}],
+    })
+    assert response.status_code == 400
+
+
+def test_batch_closed_in_one_call_keeps_its_release_time(client):
+    batch_id = client.post("/api/production_orders/1/release", json={"batch_count": 1}).json["batches"][0]["batch_id"]
+    response = client.post(f"/api/batches/{batch_id}/dispensing", json={
+        "dispensed_by": 1,
+        "lines": [{"material_id": 1, "actual_quantity": "60"}, {"material_id": 2, "actual_quantity": "40"}],
+    })
+    assert response.json["batch_status"] == "completed"
+
+    stats = client.get("/api/batches/stats?scope=recipe&key=1").json
+    assert stats["completed"] == 1
+    assert stats["mean_cycle_seconds"] is not None
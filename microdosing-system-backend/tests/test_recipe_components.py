@@ -0,0 +1,59 @@
+def _component(material_id, set_point, actual=None):
+    return {"material_id": material_id, "set_point": set_point, "actual": set_point if actual is None else actual}
+
+
+def _save(client, components, **extra):
+    return client.put("/api/recipes/1/materials", json={"components": components, **extra})
+
+
+def _counts(response):
+    assert response.status_code == 200
+    return {key: response.json[key] for key in ("inserted", "updated", "deleted", "unchanged")}
+
+
+def _add_water(app):
+    from extensions import db
+    from models.material import Material
+
+    with app.app_context():
+        db.session.add(Material(
+            title="Water", unit_of_measure="Gram (g)", current_quantity=1000,
+            minimum_quantity=0, maximum_quantity=5000, status="inactive",
+        ))
+        db.session.commit()
+
+
+def test_full_list_is_diffed_against_stored_rows(app, client):
+    _add_water(app)
+    base = [_component(1, 60), _component(2, 40)]
+    # The seeded rows have no margin yet, so both are rewritten once
+    assert _counts(_save(client, base)) == {"inserted": 0, "updated": 2, "deleted": 0, "unchanged": 0}
+    assert _counts(_save(client, base)) == {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": 2}
+
+    response = _save(client, [_component(1, 60), _component(2, 30, 29), _component(3, 10)])
+    assert _counts(response) == {"inserted": 1, "updated": 1, "deleted": 0, "unchanged": 1}
+    assert _counts(_save(client, [_component(1, 60)])) == {"inserted": 0, "updated": 0, "deleted": 2, "unchanged": 1}
+
+    rows = client.get("/api/recipe_materials?recipe_id=1").json
+    assert [(row["material_id"], row["set_point"], row["margin"]) for row in rows] == [(1, "60.00", "0.00")]
+
+
+def test_partial_edit_keeps_unlisted_components(client):
+    _save(client, [_component(1, 60), _component(2, 40)])
+    response = _save(client, [_component(2, 50, 49)], replace=False)
+    assert _counts(response) == {"inserted": 0, "updated": 1, "deleted": 0, "unchanged": 0}
+
+    rows = client.get("/api/recipe_materials?recipe_id=1").json
+    assert {row["material_id"]: (row["set_point"], row["margin"]) for row in rows} == {
+        1: ("60.00", "0.00"),
+        2: ("50.00", "2.00"),
+    }
+
+
+def test_invalid_component_lists_change_nothing(client):
+    before = client.get("/api/recipe_materials?recipe_id=1").json
+    assert _save(client, [_component(1, 60), _component(1, 40)]).status_code == 400
+    assert _save(client, [_component(1, 60), _component(99, 40)]).status_code == 400
+    assert _save(client, [{"material_id": 1, "set_point": "a lot"}]).status_code == 400
+    assert client.put("/api/recipes/99/materials", json={"components": []}).status_code == 404
+    assert client.get("/api/recipe_materials?recipe_id=1").json == before
@@ -0,0 +1,66 @@
+def _release(client, version):
+    response = client.post("/api/recipes/1/versions", json={"version": version, "created_by": 1})
+    assert response.status_code == 201
+    return response.json
+
+
+def _save_components(client, sugar):
+    client.put("/api/recipes/1/materials", json={"components": [
+        {"material_id": 1, "set_point": 60, "actual": 60},
+        {"material_id": 2, "set_point": sugar, "actual": sugar},
+    ]})
+
+
+def test_diff_between_versions(client):
+    _save_components(client, 40)
+    first = _release(client, "1")
+    _save_components(client, 45)
+    second = _release(client, "2")
+    assert second["parent_version_id"] == first["recipe_version_id"]
+    assert second["digest"] != first["digest"]
+
+    diff = client.get("/api/recipes/1/versions/1/diff/2").json
+    assert diff["identical"] is False
+    assert diff["added"] == [] and diff["removed"] == []
+    assert [change["material_id"] for change in diff["changed"]] == [2]
+    assert diff["changed"][0]["to"]["set_point"] == "45.00"
+    assert diff["unchanged"] == 1
+
+    assert client.get("/api/recipes/1/versions/1/diff/3").status_code == 404
+    assert client.post("/api/recipes/1/versions", json={"version": "2"}).status_code == 409
+
+
+def test_order_pins_the_requested_version(app, client):
+    from extensions import db
+    from models.production import ProductionOrder
+
+    first = _release(client, "1")
+    second = _release(client, "2")
+
+    response = client.put("/api/production_orders/1", json={"recipe_version": "1"})
+    assert response.status_code == 200
+    with app.app_context():
+        assert db.session.get(ProductionOrder, 1).recipe_version_id == first["recipe_version_id"]
+
+    assert client.put("/api/production_orders/1", json={"recipe_version": "9"}).status_code == 400
+    client.put("/api/production_orders/1", json={"recipe_version": 2})
+    with app.app_context():
+        assert db.session.get(ProductionOrder, 1).recipe_version_id == second["recipe_version_id"]
+
+
+def test_released_order_keeps_its_version(app, client):
+    from extensions import db
+    from models.production import ProductionOrder
+
+    _release(client, "1")
+    _release(client, "2")
+    client.put("/api/production_orders/1", json={"recipe_version": "1"})
+    assert client.post("/api/production_orders/1/release", json={"batch_count": 1}).status_code == 201
+
+    assert client.put("/api/production_orders/1", json={"recipe_version": "2"}).status_code == 400
+    assert client.put("/api/production_orders/1", json={"status": "planned"}).status_code == 400
+    # Re-sending the pinned version or editing other fields is still fine
+    assert client.put("/api/production_orders/1", json={"recipe_version": "1", "notes": "rush"}).status_code == 200
+    with app.app_context():
+        order = db.session.get(ProductionOrder, 1)
+        assert (order.status, order.notes) == ("released", "rush")
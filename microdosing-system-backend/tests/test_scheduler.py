@@ -0,0 +1,64 @@
+from datetime import date, datetime
+
+from services.scheduler import plan_day
+
+DAY = date(2026, 1, 5)
+
+
+def test_orders_sharing_materials_go_to_the_same_station():
+    bills = {"a": {1, 2}, "b": {3}, "c": {1, 2}}
+    orders = [(1, "a", None, None, False), (2, "b", None, None, False), (3, "c", None, None, False)]
+    assignment = plan_day(orders, bills, ["S1", "S2"], loaded=set(), rank={})
+    assert assignment[1][0] == assignment[3][0] != assignment[2][0]
+    assert sorted(position for _, position in assignment.values()) == [0, 0, 1]
+
+
+def test_locked_orders_keep_their_slot_and_planned_ones_follow():
+    bills = {"a": {1}, "b": {1}}
+    orders = [(1, "a", "S1", 3, True), (2, "b", None, None, False)]
+    assignment = plan_day(orders, bills, ["S1"], loaded=set(), rank={})
+    assert assignment == {1: ("S1", 3), 2: ("S1", 4)}
+
+
+def test_without_stations_planned_orders_stay_unassigned():
+    orders = [(1, "a", "S1", 0, True), (2, "a", None, None, False)]
+    assert plan_day(orders, {"a": {1}}, [], loaded=set(), rank={}) == {1: ("S1", 0)}
+
+
+def test_reschedule_keeps_finished_orders_and_locked_start_times(app):
+    from extensions import db
+    from models.production import ProductionOrder
+    from services.scheduler import reschedule
+
+    with app.app_context():
+        reschedule(DAY)
+        db.session.commit()
+        order = db.session.get(ProductionOrder, 1)
+        assert (order.station_id, order.schedule_position) == ("1", 0)
+
+        order.status = "completed"
+        released = ProductionOrder(
+            order_number="PO-2", recipe_id=1, batch_size=100, scheduled_date=DAY, created_by=1,
+            status="released", station_id="1", schedule_position=2, scheduled_start=datetime(2026, 1, 5, 9, 30),
+        )
+        planned = ProductionOrder(order_number="PO-3", recipe_id=1, batch_size=100, scheduled_date=DAY, created_by=1)
+        db.session.add_all([released, planned])
+        reschedule(DAY)
+        db.session.commit()
+
+        assert (order.station_id, order.schedule_position) == ("1", 0)
+        assert (released.schedule_position, released.scheduled_start) == (2, datetime(2026, 1, 5, 9, 30))
+        assert (planned.station_id, planned.schedule_position) == ("1", 3)
+
+
+def test_creating_an_order_without_stations_leaves_it_unassigned(app):
+    from extensions import db
+    from models.production import ProductionOrder
+    from services.scheduler import reschedule
+
+    app.config["SCHEDULER_STATIONS"] = ""
+    with app.app_context():
+        db.session.add(ProductionOrder(order_number="PO-2", recipe_id=1, batch_size=100, scheduled_date=DAY, created_by=1))
+        reschedule(DAY)
+        db.session.commit()
+        assert db.session.query(ProductionOrder.station_id).filter_by(order_number="PO-2").scalar() is None
@@ -0,0 +1,50 @@
+from sqlalchemy import event
+
+from extensions import db
+from services.inventory_ledger import apply_movements
+from services.stock_snapshots import stock_as_of, take_snapshots
+
+
+def _move(material_id, transaction_type, quantity):
+    apply_movements([{"material_id": material_id, "transaction_type": transaction_type, "quantity": quantity}])
+    db.session.commit()
+
+
+def _stock():
+    return {row["material_id"]: row for row in stock_as_of()}
+
+
+def test_snapshots_roll_forward_to_the_live_quantity(app):
+    with app.app_context():
+        _move(1, "addition", "50")
+        _move(1, "removal", "20")
+        take_snapshots()
+        db.session.commit()
+        _move(1, "addition", "5")
+        _move(2, "removal", "10")
+        take_snapshots()
+        db.session.commit()
+        _move(1, "removal", "1")
+
+        stock = _stock()
+        assert stock[1]["quantity"] == "1034.00"
+        assert (stock[1]["total_additions"], stock[1]["total_removals"]) == ("55.00", "21.00")
+        assert stock[2]["quantity"] == "990.00"
+        assert stock[2]["snapshot_id"] is not None
+
+
+def test_material_rows_are_locked_before_the_watermark_is_read(app):
+    with app.app_context():
+        _move(1, "addition", "1")
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(db.engine, "before_cursor_execute", listener)
+        try:
+            take_snapshots()
+        finally:
+            event.remove(db.engine, "before_cursor_execute", listener)
+        db.session.rollback()
+
+        lock = next(i for i, s in enumerate(statements) if s.startswith("SELECT material.material_id") and "ORDER BY" in s)
+        watermark = next(i for i, s in enumerate(statements) if "max(material_transaction.transaction_id)" in s)
+        assert lock < watermark
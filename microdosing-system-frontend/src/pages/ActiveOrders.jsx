@@ -26,10 +26,11 @@ const ActiveOrders = () => {
   useEffect(() => {
     const fetchActiveMaterial = async () => {
       try {
-        // First try to fetch active material from the new endpoint
-        const activeResponse = await axios.get('http://127.0.0.1:5000/api/active-material');
-        if (activeResponse.data) {
-          const rawMaterial = activeResponse.data;
+        // One aggregated request: active material plus recipe materials with their recipe/material data
+        const response = await axios.get('http://127.0.0.1:5000/api/active-dosing');
+        const { active_material: rawMaterial, recipe_materials: recipeMaterials = [] } = response.data || {};
+
+        if (rawMaterial) {
           const transformedMaterial = {
             id: rawMaterial.material_id,
             title: rawMaterial.title,
@@ -48,43 +49,25 @@ const ActiveOrders = () => {
           }));
           return;
         }
-        
+
         // Fallback to recipe materials if no active material
-        const recipeResponse = await axios.get('http://127.0.0.1:5000/api/recipe_materials');
-        const recipeMaterials = recipeResponse.data || [];
-
-        const enrichedMaterials = await Promise.all(
-          recipeMaterials.map(async (mat, idx) => {
-            try {
-              const [recipeRes, materialRes] = await Promise.all([
-                axios.get(`http://127.0.0.1:5000/api/recipes/${mat.recipe_id}`),
-                axios.get(`http://127.0.0.1:5000/api/materials/${mat.material_id}`),
-              ]);
-
-              return {
-                id: mat.recipe_material_id || idx + 1,
-                title: materialRes.data?.title || `Material #${mat.material_id}`,
-                recipeName: recipeRes.data?.name || `Recipe #${mat.recipe_id}`,
-                barcode: materialRes.data?.barcode_id,
-                setPoint: mat.set_point,
-                actual: mat.actual,
-                unit: materialRes.data?.unit_of_measure || '',
-                status: mat.status,
-                dosed: false,
-                margin: materialRes.data?.margin,
-              };
-            } catch (innerErr) {
-              console.error(`Error fetching names for recipe_id ${mat.recipe_id} or material_id ${mat.material_id}`, innerErr);
-              return null;
-            }
-          })
-        );
-
-        const validMaterials = enrichedMaterials.filter(Boolean);
+        const enrichedMaterials = recipeMaterials.map((mat, idx) => ({
+          id: mat.recipe_material_id || idx + 1,
+          title: mat.material?.title || `Material #${mat.material_id}`,
+          recipeName: mat.recipe?.name || `Recipe #${mat.recipe_id}`,
+          barcode: mat.material?.barcode_id,
+          setPoint: mat.set_point,
+          actual: mat.actual,
+          unit: mat.material?.unit_of_measure || '',
+          status: mat.status,
+          dosed: false,
+          margin: mat.material?.margin,
+        }));
+
         setOrder(prev => ({
           ...prev,
-          materials: validMaterials,
-          recipe_name: validMaterials[0]?.recipeName || 'Formula A',
+          materials: enrichedMaterials,
+          recipe_name: enrichedMaterials[0]?.recipeName || 'Formula A',
         }));
 
       } catch (error) {
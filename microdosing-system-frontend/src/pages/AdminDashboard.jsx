@@ -1,39 +1,42 @@
 import React, { useEffect, useState } from "react";
-import axios from "axios";
 import { useAuth } from "../context/AuthContext";
 import { Navigate } from "react-router-dom";
+import { fetchPage } from "../utils/listPages";
 
 const AdminDashboard = () => {
   const { user, isAuthenticated } = useAuth();
   const [users, setUsers] = useState([]);
   const [message, setMessage] = useState("");
   const [loading, setLoading] = useState(true);
+  const [usersCursor, setUsersCursor] = useState(null);
 
-  useEffect(() => {
-    const fetchUsers = async () => {
-      if (!isAuthenticated || user?.role !== "admin") return;
+  // One page of users at a time; "Load more" appends the next one
+  const fetchUsers = async (cursor = null) => {
+    if (!isAuthenticated || user?.role !== "admin") return;
 
-      try {
-        const token = localStorage.getItem("access_token");
-        const res = await axios.get("http://127.0.0.1:5000/api/users", {
-          headers: {
-            Authorization: `Bearer ${token}`,
-          },
-        });
-        setUsers(res.data);
-      } catch (err) {
-        if (err.response?.status === 403) {
-          setMessage("⛔ Access denied: Admins only.");
-        } else if (err.response?.status === 401) {
-          setMessage("❌ Unauthorized: Invalid or expired token.");
-        } else {
-          setMessage("❌ Failed to fetch users.");
-        }
-      } finally {
-        setLoading(false);
+    try {
+      const token = localStorage.getItem("access_token");
+      const { rows, nextCursor } = await fetchPage("http://127.0.0.1:5000/api/users", {}, cursor, {
+        headers: {
+          Authorization: `Bearer ${token}`,
+        },
+      });
+      setUsers((prev) => (cursor ? [...prev, ...rows] : rows));
+      setUsersCursor(nextCursor);
+    } catch (err) {
+      if (err.response?.status === 403) {
+        setMessage("⛔ Access denied: Admins only.");
+      } else if (err.response?.status === 401) {
+        setMessage("❌ Unauthorized: Invalid or expired token.");
+      } else {
+        setMessage("❌ Failed to fetch users.");
       }
-    };
+    } finally {
+      setLoading(false);
+    }
+  };
 
+  useEffect(() => {
     fetchUsers();
   }, [isAuthenticated, user]);
 
@@ -86,6 +89,14 @@ const AdminDashboard = () => {
           </tbody>
         </table>
       )}
+      {usersCursor && (
+        <button
+          onClick={() => fetchUsers(usersCursor)}
+          className="mt-4 bg-gray-200 hover:bg-gray-300 dark:bg-gray-700 px-3 py-1 rounded"
+        >
+          Load more
+        </button>
+      )}
     </div>
   );
 };
@@ -2,12 +2,25 @@ import React, { useState, useEffect } from 'react';
 import axios from 'axios';
 import Swal from 'sweetalert2';
 import { useNavigate } from 'react-router-dom';  // Add this!
+import { fetchPage } from '../utils/listPages';
+
+const filterBatches = (list, filters) => {
+  let updatedBatches = [...list];
+  if (filters.status) {
+    updatedBatches = updatedBatches.filter(batch => batch.status === filters.status);
+  }
+  if (filters.startDate) {
+    updatedBatches = updatedBatches.filter(batch => batch.start_time?.startsWith(filters.startDate));
+  }
+  return updatedBatches;
+};
 
 const Batches = () => {
   const [batches, setBatches] = useState([]);
   const [loading, setLoading] = useState(true);
   const [filters, setFilters] = useState({ status: '', startDate: '' });
   const [filteredBatches, setFilteredBatches] = useState([]);
+  const [batchesCursor, setBatchesCursor] = useState(null);
   const navigate = useNavigate();  // Hook for navigation
 
   const statusStyle = {
@@ -21,11 +34,14 @@ const Batches = () => {
     fetchBatches();
   }, []);
 
-  const fetchBatches = async () => {
+  // One page of batches at a time; "Load more" appends the next one
+  const fetchBatches = async (cursor = null) => {
     try {
-      const response = await axios.get('http://localhost:5000/api/batches');
-      setBatches(response.data);
-      setFilteredBatches(response.data);
+      const { rows, nextCursor } = await fetchPage('http://localhost:5000/api/batches', {}, cursor);
+      const loaded = cursor ? [...batches, ...rows] : rows;
+      setBatches(loaded);
+      setFilteredBatches(filterBatches(loaded, filters));
+      setBatchesCursor(nextCursor);
     } catch (error) {
       console.error('Error fetching batches:', error);
       Swal.fire('Error', 'Could not load batches.', 'error');
@@ -38,15 +54,7 @@ const Batches = () => {
     const { name, value } = e.target;
     const newFilters = { ...filters, [name]: value };
     setFilters(newFilters);
-
-    let updatedBatches = [...batches];
-    if (newFilters.status) {
-      updatedBatches = updatedBatches.filter(batch => batch.status === newFilters.status);
-    }
-    if (newFilters.startDate) {
-      updatedBatches = updatedBatches.filter(batch => batch.start_time?.startsWith(newFilters.startDate));
-    }
-    setFilteredBatches(updatedBatches);
+    setFilteredBatches(filterBatches(batches, newFilters));
   };
 
   const clearFilters = () => {
@@ -252,6 +260,11 @@ const Batches = () => {
               ))}
             </tbody>
           </table>
+          {batchesCursor && (
+            <button onClick={() => fetchBatches(batchesCursor)} className="mt-4 bg-gray-200 px-3 py-1 rounded">
+              Load more
+            </button>
+          )}
         </div>
       )}
     </div>
@@ -7,6 +7,7 @@ import { Tooltip, IconButton, Typography } from "@mui/material";
 import EditIcon from "@mui/icons-material/Edit";
 import DeleteIcon from "@mui/icons-material/Delete";
 import VisibilityIcon from "@mui/icons-material/Visibility";
+import { fetchPage, LoadMoreButton, LOOKUP_LIMIT } from "../utils/listPages";
 
 const Bucket_Batches = () => {
   const [buckets, setBuckets] = useState([]);
@@ -15,12 +16,17 @@ const Bucket_Batches = () => {
   const navigate = useNavigate();
 
   const [materials, setMaterials] = useState([]);
+  const [bucketsCursor, setBucketsCursor] = useState(null);
 
 useEffect(() => {
   const fetchMaterials = async () => {
     try {
-      const response = await axios.get('http://127.0.0.1:5000/api/materials');
-      setMaterials(response.data);
+      // Only the locations are needed here
+      const { rows } = await fetchPage('http://127.0.0.1:5000/api/materials', {
+        limit: LOOKUP_LIMIT,
+        fields: 'material_id,plant_area_location',
+      });
+      setMaterials(rows);
     } catch (error) {
       console.error('Error fetching materials:', error);
     }
@@ -28,34 +34,35 @@ useEffect(() => {
   fetchMaterials();
 }, []);
 
-  useEffect(() => {
-    const fetchBuckets = async () => {
-      try {
-        const response = await axios.get("http://127.0.0.1:5000/api/storage");
-        const bucketData = response.data;
-
-        const enrichedBuckets = await Promise.all(
-          bucketData.map(async (bucket) => {
-            try {
-              const matRes = await axios.get(
-                `http://127.0.0.1:5000/api/materials/${bucket.material_id}`
-              );
-              return { ...bucket, material: matRes.data };
-            } catch (err) {
-              console.error(`Failed to fetch material ${bucket.material_id}`, err);
-              return { ...bucket, material: null };
-            }
-          })
-        );
+  // One page of buckets at a time; "Load more" appends the next one
+  const fetchBuckets = async (cursor = null) => {
+    try {
+      const { rows: bucketData, nextCursor } = await fetchPage("http://127.0.0.1:5000/api/storage", {}, cursor);
+
+      const enrichedBuckets = await Promise.all(
+        bucketData.map(async (bucket) => {
+          try {
+            const matRes = await axios.get(
+              `http://127.0.0.1:5000/api/materials/${bucket.material_id}`
+            );
+            return { ...bucket, material: matRes.data };
+          } catch (err) {
+            console.error(`Failed to fetch material ${bucket.material_id}`, err);
+            return { ...bucket, material: null };
+          }
+        })
+      );
 
-        setBuckets(enrichedBuckets);
-      } catch (error) {
-        console.error("Error fetching buckets:", error);
-      } finally {
-        setLoading(false);
-      }
-    };
+      setBuckets((prev) => (cursor ? [...prev, ...enrichedBuckets] : enrichedBuckets));
+      setBucketsCursor(nextCursor);
+    } catch (error) {
+      console.error("Error fetching buckets:", error);
+    } finally {
+      setLoading(false);
+    }
+  };
 
+  useEffect(() => {
     fetchBuckets();
   }, []);
 
@@ -493,6 +500,7 @@ useEffect(() => {
           </div>
         </div>
       ))}
+      <LoadMoreButton hasMore={Boolean(bucketsCursor)} onClick={() => fetchBuckets(bucketsCursor)} />
     </div>
   );
 };
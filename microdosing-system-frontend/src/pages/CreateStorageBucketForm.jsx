@@ -4,6 +4,7 @@ import Barcode from 'react-barcode';
 import { useNavigate } from 'react-router-dom';
 import IconButton from '@mui/material/IconButton';
 import CloseIcon from '@mui/icons-material/Close';
+import { fetchPage, LOOKUP_LIMIT } from '../utils/listPages';
 
 
 const CreateStorageBucketForm = () => {
@@ -16,11 +17,14 @@ const CreateStorageBucketForm = () => {
 
   const navigate = useNavigate();
 
-  // Fetch all materials on mount
+  // Fetch the materials picker (id, title, location) on mount
   useEffect(() => {
     const fetchMaterials = async () => {
       try {
-        const { data } = await axios.get('http://127.0.0.1:5000/api/materials');
+        const { rows: data } = await fetchPage('http://127.0.0.1:5000/api/materials', {
+          limit: LOOKUP_LIMIT,
+          fields: 'material_id,title,plant_area_location',
+        });
         setMaterials(data);
 
         const uniqueLocations = [...new Set(data.map(item => item.plant_area_location))];
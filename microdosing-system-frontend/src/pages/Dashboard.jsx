@@ -1,6 +1,5 @@
 import React, { useState, useEffect, useRef } from 'react';
 import { Link, useLocation } from 'react-router-dom';
-import axios from 'axios';
 import {
   Chart as ChartJS,
   CategoryScale,
@@ -17,6 +16,7 @@ import { Card, CardContent, Typography, CircularProgress, Box } from '@mui/mater
 import ThemeDropdown from '../components/ThemeDropdown';
 import { useTheme } from '../context/ThemeContext';
 import { generateShades, getContrastColor } from '../utils/colorUtils';
+import { fetchPage, LOOKUP_LIMIT } from '../utils/listPages';
 
 ChartJS.register(CategoryScale, LinearScale, BarElement, ArcElement, Title, Tooltip, Legend);
 
@@ -39,15 +39,17 @@ const Dashboard = () => {
   useEffect(() => {
     const fetchData = async () => {
       try {
-        const [materialRes, recipesRes] = await Promise.all([
-          axios.get('http://localhost:5000/api/materials'),
-          axios.get('http://localhost:5000/api/recipes')
+        // One large page of just the charted columns; counts past it show as "N+"
+        const [materialPage, recipePage] = await Promise.all([
+          fetchPage('http://localhost:5000/api/materials', { limit: LOOKUP_LIMIT, fields: 'material_id,title,current_quantity' }),
+          fetchPage('http://localhost:5000/api/recipes', { limit: LOOKUP_LIMIT, fields: 'recipe_id' })
         ]);
-        const materials = materialRes.data;
+        const materials = materialPage.rows;
+        const countOf = ({ rows, nextCursor }) => (nextCursor ? `${rows.length}+` : rows.length);
         setStats(prev => ({
           ...prev,
-          materials: materials.length,
-          recipes: recipesRes.data.length
+          materials: countOf(materialPage),
+          recipes: countOf(recipePage)
         }));
         const dynamicLabels = materials.map(m => m.title);
         const dynamicData = materials.map(m => m.current_quantity || 0);
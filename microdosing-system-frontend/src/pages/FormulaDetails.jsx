@@ -27,6 +27,7 @@ import { useNavigate } from "react-router-dom";
 import EditIcon from "@mui/icons-material/Edit";
 import DeleteIcon from "@mui/icons-material/Delete";
 import UpdateIcon from '@mui/icons-material/Update';
+import { fetchPage, LoadMoreButton, LOOKUP_LIMIT } from "../utils/listPages";
 
 const FormulaDetails = () => {
   const [recipes, setRecipes] = useState([]);
@@ -39,7 +40,7 @@ const FormulaDetails = () => {
   const [currentIndex, setCurrentIndex] = useState(0);
   const [recipeMaterialStatus, setRecipeMaterialStatus] = useState({});
   const [selectedStorage, setSelectedStorage] = useState({});
-  const [recipeMaterials, setRecipeMaterials ] = useState({})
+  const [recipesCursor, setRecipesCursor] = useState(null);
 
   const navigate = useNavigate();
 
@@ -62,41 +63,32 @@ const FormulaDetails = () => {
     return [...reordered, ...newOnes];
   };
 
+  // One page of recipes at a time; "Load more" appends the next one
+  const fetchRecipes = async (cursor = null) => {
+    try {
+      const { rows, nextCursor } = await fetchPage("http://127.0.0.1:5000/api/recipes", {}, cursor);
+      setRecipes((prev) => reorderRecipesFromLocalStorage(cursor ? [...prev, ...rows] : rows));
+      setRecipesCursor(nextCursor);
+    } catch (error) {
+      console.error("Error fetching recipes:", error);
+    }
+  };
+
   useEffect(() => {
-    const fetchRecipes = async () => {
-      try {
-        const response = await axios.get("http://127.0.0.1:5000/api/recipes");
-        const recipesData = response.data;
-        const reordered = reorderRecipesFromLocalStorage(recipesData);
-        setRecipes(reordered);
-      } catch (error) {
-        console.error("Error fetching recipes:", error);
-      }
-    };
-  
     const fetchMaterials = async () => {
       try {
-        const response = await axios.get("http://127.0.0.1:5000/api/materials");
-        console.log("response :", response);
-        setMaterials(response.data);
+        const { rows } = await fetchPage("http://127.0.0.1:5000/api/materials", {
+          limit: LOOKUP_LIMIT,
+          fields: "material_id,title,plant_area_location",
+        });
+        setMaterials(rows);
       } catch (error) {
         console.error("Error fetching materials:", error);
       }
     };
-  
-    const fetchRecipeMaterials = async () => {
-      try {
-        const response = await axios.get("http://127.0.0.1:5000/api/recipe_materials");
-        console.log("recipe materials response:", response);
-        setRecipeMaterials(response.data);  // Set the recipe materials data in state
-      } catch (error) {
-        console.error("Error fetching recipe materials:", error);
-      }
-    };
-  
+
     fetchRecipes();
     fetchMaterials();
-    fetchRecipeMaterials();  // Fetch recipe materials here
   }, []);
   
 
@@ -163,8 +155,14 @@ const FormulaDetails = () => {
     console.log("🧨 handleDelete triggered");
   
     try {
-      const existingResponse = await axios.get("http://127.0.0.1:5000/api/recipe_materials");
-      const existingMaterials = existingResponse.data;
+      // Only the components of the recipes being edited
+      const recipeIds = Object.keys(selectedMaterials);
+      const { rows: existingMaterials } = recipeIds.length
+        ? await fetchPage("http://127.0.0.1:5000/api/recipe_materials", {
+            recipe_id: recipeIds.join(","),
+            limit: LOOKUP_LIMIT,
+          })
+        : { rows: [] };
       console.log("📦 Existing materials:", existingMaterials);
   
       const deletePromises = Object.keys(selectedMaterials).map(async (recipeId) => {
@@ -224,11 +222,7 @@ const FormulaDetails = () => {
     e.preventDefault();
   
     try {
-      // Get all existing recipe_materials to match against
-      const existingResponse = await axios.get("http://127.0.0.1:5000/api/recipe_materials");
-      const existingMaterials = existingResponse.data;  // Assuming it's an array of recipe materials
-  
-      const postPromises = Object.keys(selectedMaterials).map(async (recipeId) => {
+      const putPromises = Object.keys(selectedMaterials).map(async (recipeId) => {
         const materialName = selectedMaterials[recipeId];
         const setPoint = setPoints[recipeId];
   
@@ -251,27 +245,24 @@ const FormulaDetails = () => {
           return;
         }
   
-        // Check if combination already exists
-        const existingMatch = existingMaterials.find(
-          (item) => item.recipe_id === recipeIdInt && item.material_id === materialIdInt
-        );
-  
         const payload = {
-          recipe_id: recipeIdInt,
-          material_id: materialIdInt,
-          set_point: parseFloat(setPoint),
-          actual: 0,
-          status: "Released",
+          replace: false, // partial edit: keep the recipe's other components
+          components: [
+            {
+              material_id: materialIdInt,
+              set_point: parseFloat(setPoint),
+              actual: 0,
+              status: "Released",
+            },
+          ],
         };
   
-        console.log(existingMatch ? "Updating..." : "Creating...", payload);
-  
-        // Regardless, POST to the same endpoint — the backend handles update if found
-        return axios.post("http://127.0.0.1:5000/api/recipe_materials", payload);
+        // Upserts this component in one transaction; other components are left as they are
+        return axios.put(`http://127.0.0.1:5000/api/recipes/${recipeIdInt}/materials`, payload);
       });
   
-      const validPostPromises = postPromises.filter(Boolean);
-      await Promise.all(validPostPromises);
+      const validPutPromises = putPromises.filter(Boolean);
+      await Promise.all(validPutPromises);
   
       alert("All recipe materials processed successfully!");
       setSetPoints({});
@@ -461,6 +452,7 @@ setSelectedMaterials({});
           </TableBody>
         </Table>
       </TableContainer>
+      <LoadMoreButton hasMore={Boolean(recipesCursor)} onClick={() => fetchRecipes(recipesCursor)} />
     </Box>
   );
 };
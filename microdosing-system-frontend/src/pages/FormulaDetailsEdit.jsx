@@ -21,6 +21,7 @@ import {
 import CloseIcon from '@mui/icons-material/Close';
 import ArrowUpward from '@mui/icons-material/ArrowUpward';
 import ArrowDownward from '@mui/icons-material/ArrowDownward';
+import { fetchPage, LOOKUP_LIMIT } from "../utils/listPages";
 
 
 const FormulaEditForm = () => {
@@ -64,26 +65,15 @@ const FormulaEditForm = () => {
     }
   }, [recipe.materials]); // Depend on materials array
   
-  useEffect(() => {
-    const fetchMaterialNames = async () => {
-      try {
-        const response = await axios.get("http://127.0.0.1:5000/api/materials");
-        setStorageOptions(response.data);  // Store the material names in storageOptions
-      } catch (error) {
-        console.error("Error fetching material names:", error);
-      }
-    };
-    fetchMaterialNames();
-  }, []);
-  
-
-  // Fetch storage options from API
+  // Fetch material and storage options (one picker page of the shown columns)
   useEffect(() => {
     const fetchStorageOptions = async () => {
       try {
-        const response = await axios.get("http://127.0.0.1:5000/api/materials");
-        console.log("response :", response)
-        setStorageOptions(response.data);  // Store the storage options
+        const { rows } = await fetchPage("http://127.0.0.1:5000/api/materials", {
+          limit: LOOKUP_LIMIT,
+          fields: "material_id,title,plant_area_location",
+        });
+        setStorageOptions(rows);  // Store the material names and storage options
       } catch (error) {
         console.error("Error fetching storage options", error);
       }
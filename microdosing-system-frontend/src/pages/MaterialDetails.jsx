@@ -4,6 +4,7 @@ import axios from "axios";
 import JsBarcode from "jsbarcode";
 import Swal from "sweetalert2";
 import { DragDropContext, Droppable, Draggable } from "@hello-pangea/dnd";
+import { fetchPage, LoadMoreButton } from "../utils/listPages";
 
 // Material UI
 import {
@@ -52,32 +53,36 @@ const MaterialDetails = () => {
   };
 
   const navigate = useNavigate();
-  useEffect(() => {
-    const fetchMaterials = async () => {
-      try {
-        const response = await axios.get("http://127.0.0.1:5000/api/materials");
-        let fetchedMaterials = response.data || [];
-
-        // Get saved order (material_id array) from localStorage
-        const savedOrder = JSON.parse(localStorage.getItem("materialOrder"));
-
-        if (savedOrder) {
-          // Sort fetched materials according to saved order
-          fetchedMaterials.sort(
-            (a, b) =>
-              savedOrder.indexOf(a.material_id) -
-              savedOrder.indexOf(b.material_id)
-          );
-        }
-
-        setMaterials(fetchedMaterials);
-      } catch (error) {
-        console.error("Error fetching materials:", error);
-      } finally {
-        setLoading(false);
+  const [materialsCursor, setMaterialsCursor] = useState(null);
+
+  // One page of materials at a time; "Load more" appends the next one
+  const fetchMaterials = async (cursor = null) => {
+    try {
+      const { rows, nextCursor } = await fetchPage("http://127.0.0.1:5000/api/materials", {}, cursor);
+      let fetchedMaterials = cursor ? [...materials, ...rows] : rows;
+      setMaterialsCursor(nextCursor);
+
+      // Get saved order (material_id array) from localStorage
+      const savedOrder = JSON.parse(localStorage.getItem("materialOrder"));
+
+      if (savedOrder) {
+        // Sort fetched materials according to saved order
+        fetchedMaterials.sort(
+          (a, b) =>
+            savedOrder.indexOf(a.material_id) -
+            savedOrder.indexOf(b.material_id)
+        );
       }
-    };
 
+      setMaterials(fetchedMaterials);
+    } catch (error) {
+      console.error("Error fetching materials:", error);
+    } finally {
+      setLoading(false);
+    }
+  };
+
+  useEffect(() => {
     fetchMaterials();
   }, []);
 
@@ -444,6 +449,7 @@ const MaterialDetails = () => {
           </TableBody>
         </Table>
       </TableContainer>
+      <LoadMoreButton hasMore={Boolean(materialsCursor)} onClick={() => fetchMaterials(materialsCursor)} />
     </Box>
   );
 };
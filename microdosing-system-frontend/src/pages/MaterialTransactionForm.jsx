@@ -14,6 +14,7 @@ import {
   IconButton
 } from "@mui/material";
 import CloseIcon from '@mui/icons-material/Close';
+import { fetchPage, LOOKUP_LIMIT } from "../utils/listPages";
 
 
 const MaterialTransactionForm = () => {
@@ -29,8 +30,8 @@ const MaterialTransactionForm = () => {
 
   // Fetch materials for dropdown
   useEffect(() => {
-    axios.get("http://127.0.0.1:5000/api/materials")
-      .then((response) => setMaterials(response.data))
+    fetchPage("http://127.0.0.1:5000/api/materials", { limit: LOOKUP_LIMIT })
+      .then(({ rows }) => setMaterials(rows))
       .catch((error) => console.error("Error fetching materials:", error));
   }, []);
 
@@ -1,10 +1,11 @@
 import React, { useEffect, useState } from 'react';
-import axios from 'axios';
 import { Container, Box, Paper, Typography, Table, TableHead, TableRow, TableCell, TableBody, Chip, IconButton, Tooltip, Button } from '@mui/material';
 import { AddCircleOutline as AddCircleOutlineIcon, Visibility as VisibilityIcon, Edit as EditIcon, Delete as DeleteIcon, ArrowUpward as ArrowUpwardIcon, ArrowDownward as ArrowDownwardIcon } from '@mui/icons-material';
+import { fetchPage, usePagedList, LoadMoreButton, LOOKUP_LIMIT } from '../utils/listPages';
 
 const RecipeMaterialsTable = () => {
-  const [recipeMaterials, setRecipeMaterials] = useState([]);
+  // The table itself is paged; recipes and materials are name lookups
+  const { rows: recipeMaterials, hasMore, loading, loadMore } = usePagedList("http://127.0.0.1:5000/api/recipe_materials");
   const [recipes, setRecipes] = useState([]);
   const [materials, setMaterials] = useState([]);
 
@@ -12,8 +13,8 @@ const RecipeMaterialsTable = () => {
   useEffect(() => {
     const fetchRecipes = async () => {
       try {
-        const response = await axios.get("http://127.0.0.1:5000/api/recipes");
-        setRecipes(response.data);
+        const { rows } = await fetchPage("http://127.0.0.1:5000/api/recipes", { limit: LOOKUP_LIMIT, fields: "recipe_id,name" });
+        setRecipes(rows);
       } catch (error) {
         console.error("Error fetching recipes:", error);
       }
@@ -21,25 +22,15 @@ const RecipeMaterialsTable = () => {
 
     const fetchMaterials = async () => {
       try {
-        const response = await axios.get("http://127.0.0.1:5000/api/materials");
-        setMaterials(response.data);
+        const { rows } = await fetchPage("http://127.0.0.1:5000/api/materials", { limit: LOOKUP_LIMIT, fields: "material_id,title" });
+        setMaterials(rows);
       } catch (error) {
         console.error("Error fetching materials:", error);
       }
     };
 
-    const fetchRecipeMaterials = async () => {
-      try {
-        const response = await axios.get("http://127.0.0.1:5000/api/recipe_materials");
-        setRecipeMaterials(response.data);
-      } catch (error) {
-        console.error("Error fetching recipe materials:", error);
-      }
-    };
-
     fetchRecipes();
     fetchMaterials();
-    fetchRecipeMaterials();
   }, []);
 
   // Get recipe name based on recipe_id
@@ -167,6 +158,7 @@ const RecipeMaterialsTable = () => {
           ))}
         </TableBody>
       </Table>
+      <LoadMoreButton hasMore={hasMore} loading={loading} onClick={loadMore} />
     </Container>
   );
 };
@@ -43,6 +43,7 @@ import ArrowUpwardIcon from "@mui/icons-material/ArrowUpward";
 import ArrowDownwardIcon from "@mui/icons-material/ArrowDownward";
 import Swal from "sweetalert2";
 import withReactContent from "sweetalert2-react-content";
+import { fetchPage, LoadMoreButton } from "../utils/listPages";
 import RecipeMaterialsTable from "./RecipeMaterialsTable";
 import FormulaDetails from "./FormulaDetails";
 
@@ -62,8 +63,9 @@ const Recipes = () => {
   
 
   const [recipes, setRecipes] = useState([]);
+  const [recipesCursor, setRecipesCursor] = useState(null);
+  const [highestRecipeId, setHighestRecipeId] = useState(0);
   const [barcodeImage, setBarcodeImage] = useState(null);
-  const [materials, setMaterials] = useState([]);
   
 const MySwal = withReactContent(Swal);
   const [selectedMaterial, setSelectedMaterial] = useState({
@@ -76,18 +78,28 @@ const MySwal = withReactContent(Swal);
 
   
 
-  // Fetch recipes from API
-  useEffect(() => {
-    const fetchRecipes = async () => {
-      try {
-        const response = await axios.get("http://127.0.0.1:5000/api/recipes");
-        setRecipes(response.data);
-
-      } catch (error) {
-        console.error("Error fetching recipes:", error);
+  // Fetch recipes from API, one page at a time ("Load more" appends the next one)
+  const fetchRecipes = async (cursor = null) => {
+    try {
+      const { rows, nextCursor } = await fetchPage("http://127.0.0.1:5000/api/recipes", {}, cursor);
+      setRecipes((prev) => (cursor ? [...prev, ...rows] : rows));
+      setRecipesCursor(nextCursor);
+
+      if (!cursor) {
+        // The loaded pages may not include the newest recipe, so ask for it directly
+        const { rows: newest } = await fetchPage("http://127.0.0.1:5000/api/recipes", {
+          sort: "-recipe_id",
+          limit: 1,
+          fields: "recipe_id",
+        });
+        setHighestRecipeId(newest.length ? newest[0].recipe_id : 0);
       }
-    };
+    } catch (error) {
+      console.error("Error fetching recipes:", error);
+    }
+  };
 
+  useEffect(() => {
     fetchRecipes();
   }, []);
 
@@ -96,14 +108,6 @@ const MySwal = withReactContent(Swal);
     setFormData({ ...formData, [e.target.name]: e.target.value });
   };
 
-  // Fetch materials from API
-  useEffect(() => {
-    axios
-      .get("http://127.0.0.1:5000/api/materials")
-      .then((response) => setMaterials(response.data))
-      .catch((error) => console.error("Error fetching materials:", error));
-  }, []);
-
   // Handle input change
   const handleChange = (e) => {
     setFormData({ ...formData, [e.target.name]: e.target.value });
@@ -111,9 +115,6 @@ const MySwal = withReactContent(Swal);
 
   // Handle material selection change
   const handleMaterialChange = (e) => {
-    // Find the highest recipe_id in the recipes list
-    const highestRecipeId = Math.max(...recipes.map((recipe) => recipe.recipe_id), 0);
-  
     // Calculate next sequence number by incrementing the highestRecipeId
     const nextSequenceNumber = highestRecipeId + 1;
   
@@ -221,8 +222,7 @@ const MySwal = withReactContent(Swal);
     });
   
       // Fetch updated recipes
-      const recipesResponse = await axios.get("http://127.0.0.1:5000/api/recipes");
-      setRecipes(recipesResponse.data);
+      await fetchRecipes();
   
       // Reset form
       setFormData({
@@ -470,6 +470,7 @@ const MySwal = withReactContent(Swal);
           </TableBody>
         </Table>
       </TableContainer>
+      <LoadMoreButton hasMore={Boolean(recipesCursor)} onClick={() => fetchRecipes(recipesCursor)} />
 
       {/* <RecipeMaterialsTable /> */}
 
@@ -3,6 +3,7 @@ import { useParams, useNavigate } from 'react-router-dom';
 import axios from 'axios';
 import { Box, Typography, IconButton } from '@mui/material';   // Importing IconButton
 import CloseIcon from '@mui/icons-material/Close';
+import { fetchPage } from '../utils/listPages';
 
 const ViewRecipe = () => {
   const { recipe_id } = useParams();
@@ -32,14 +33,14 @@ const ViewRecipe = () => {
   // Fetch recipes and match with current order
   useEffect(() => {
     const fetchRecipes = async () => {
+      if (order.recipe_id === undefined) return;
       try {
-        const response = await axios.get("http://127.0.0.1:5000/api/recipes");
-        const allRecipes = response.data;
-        setRecipes(allRecipes);
-        console.log("recipes :", allRecipes)
+        // Only the order's recipe, filtered on the server
+        const { rows } = await fetchPage("http://127.0.0.1:5000/api/recipes", { recipe_id: order.recipe_id, limit: 1 });
+        setRecipes(rows);
 
         // Match recipe_id from order
-        const matched = allRecipes.find(r => r.recipe_id === Number(order.recipe_id));
+        const matched = rows.find(r => r.recipe_id === Number(order.recipe_id));
         setSelectedRecipe(matched || null);
 
       } catch (error) {
@@ -0,0 +1,61 @@
+import { useCallback, useEffect, useState } from "react";
+import axios from "axios";
+import { Box, Button } from "@mui/material";
+
+// List endpoints return one page at a time (?limit, default 100 on the
+// server) and point to the next one with an X-Next-Cursor header.
+export const PAGE_SIZE = 100;
+// Pickers ask for one large page of just the columns they show
+// (the server caps a page at LIST_PAGE_SIZE_MAX, 1000 by default)
+export const LOOKUP_LIMIT = 1000;
+
+export const fetchPage = async (url, params = {}, cursor = null, config = {}) => {
+  const response = await axios.get(url, {
+    ...config,
+    params: { limit: PAGE_SIZE, ...params, ...(cursor ? { cursor } : {}) },
+  });
+  return { rows: response.data, nextCursor: response.headers["x-next-cursor"] || null };
+};
+
+// Rows of a list endpoint, one page at a time: loadMore() appends the next
+// page, reload() starts again from the first one.
+export const usePagedList = (url, params = {}) => {
+  const [rows, setRows] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loading, setLoading] = useState(false);
+  const paramsKey = JSON.stringify(params);
+
+  const load = useCallback(async (cursor = null) => {
+    setLoading(true);
+    try {
+      const page = await fetchPage(url, JSON.parse(paramsKey), cursor);
+      setRows((prev) => (cursor ? [...prev, ...page.rows] : page.rows));
+      setNextCursor(page.nextCursor);
+      return page;
+    } finally {
+      setLoading(false);
+    }
+  }, [url, paramsKey]);
+
+  useEffect(() => {
+    load().catch((error) => console.error(`Error fetching ${url}:`, error));
+  }, [load, url]);
+
+  return {
+    rows,
+    setRows,
+    hasMore: Boolean(nextCursor),
+    loading,
+    loadMore: () => load(nextCursor),
+    reload: () => load(),
+  };
+};
+
+export const LoadMoreButton = ({ hasMore, loading, onClick }) =>
+  hasMore ? (
+    <Box display="flex" justifyContent="center" mt={2}>
+      <Button variant="outlined" onClick={onClick} disabled={loading}>
+        {loading ? "Loading..." : "Load more"}
+      </Button>
+    </Box>
+  ) : null;